@@ -1,11 +1,22 @@
-from fastapi import Request, APIRouter
-import requests
+from fastapi import Request, Response, APIRouter
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import httpx
+import json
 import logging
-from requests.exceptions import ReadTimeout
-from app.mcp_tools.prompt_builder import build_prompt
+import time
+from app.config import settings
+from app.database import request_session
+from app.mcp_tools.llm_client import ollama_client, run_until_disconnected
+from app.mcp_tools.llm_dispatch import llm_dispatcher
+from app.mcp_tools.prompt_builder import build_prompt_parts
+from app.mcp_tools.policy_index import estimate_tokens
+from app.mcp_tools.session_memory import session_store
+from app.mcp_tools.faq_index import faq_index, answer_faq
 from app.mcp_tools.grounding import detect_policy_topic, get_page_context
 from app.mcp_tools.intent import is_onboarding_related, is_hr_query, extract_search_query
 from app.mcp_tools.task_tracker import (
+    get_employee_info,
     get_onboarding_analytics,
     get_all_employees_summary,
     search_employee_by_name_or_email,
@@ -13,11 +24,30 @@ from app.mcp_tools.task_tracker import (
     get_employees_by_status,
     get_employee_detailed_info
 )
+from app.utils.cache import get_cache, all_cache_stats
+from app.utils.data_version import get_grounding_version, get_global_version
+from app.utils.single_flight import SingleFlight
+from app.utils.timing import StageTimer, StageHistogram
 
 
-response_cache = {}
+response_cache = get_cache(
+    "chat_responses",
+    max_entries=settings.CHAT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CHAT_CACHE_TTL_SECONDS,
+    max_bytes=settings.CHAT_CACHE_MAX_BYTES
+)
+# Identical prompts that arrive while one is still generating share that LLM call
+inflight_llm = SingleFlight("chat_llm")
+# Rolling per-stage latencies of chat requests, served at /chatbot/timings
+chat_timings = StageHistogram("chat", window=500)
 router = APIRouter(prefix="/chatbot", tags=["chatbot"])
+
+CHAT_MODELS = ["mistral", "phi"]
+
+# HR pages are grounded on company-wide data, so they key on the global version
+HR_PAGES = {"hr-dashboard", "hrdashboard", "track-onboarding", "trackonboarding", "employee-details", "employeedetails"}
 logger = logging.getLogger("chat_api")
+timing_logger = logging.getLogger("chat_api.timing")
 
 # 🧠 Utility Functions
 def is_valid_response(text: str) -> bool:
@@ -27,36 +57,163 @@ def is_valid_response(text: str) -> bool:
         return False
     return len(text.strip()) > 20
 
+MAX_RESPONSE_LINES = 4
+
+def is_filler_line(line: str) -> bool:
+    lower = line.lower()
+    if any(kw in lower for kw in ["regarding", "please feel free", "hope this helps", "let me know"]):
+        return True
+    return lower.startswith("dear") or "thank you" in lower
+
 def trim_response(text: str) -> str:
     lines = text.strip().split("\n")
-    filtered = []
-    for line in lines:
-        lower = line.lower()
-        if any(kw in lower for kw in ["regarding", "please feel free", "hope this helps", "let me know"]):
-            continue
-        if lower.startswith("dear") or "thank you" in lower:
-            continue
-        filtered.append(line.strip())
-    return "\n".join(filtered[:4]) if len(filtered) > 4 else "\n".join(filtered)
+    filtered = [line.strip() for line in lines if not is_filler_line(line)]
+    return "\n".join(filtered[:MAX_RESPONSE_LINES])
+
+class StreamTrimmer:
+    """Applies the trim_response rules to a token stream, one completed line at a time.
+
+    The emitted lines are only for the live display; `text` (what gets cached)
+    is trim_response() of the raw stream, so /chat and /chat/stream agree.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.raw = ""
+        self.lines = []
+        self.seen_text = False
+        self.pending_blank = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.lines) >= MAX_RESPONSE_LINES
+
+    def _accept(self, line: str) -> str:
+        if self.full:
+            return ""
+        if line.strip():
+            self.seen_text = True
+        if is_filler_line(line):
+            return ""
+        line = line.strip()
+        if not line:
+            # Blank lines count towards the limit like trim_response's, but leading
+            # ones are stripped and trailing ones only show once more text follows
+            if self.seen_text:
+                self.pending_blank += 1
+            return ""
+        emitted = []
+        while self.pending_blank and not self.full:
+            self.lines.append("")
+            emitted.append("")
+            self.pending_blank -= 1
+        self.pending_blank = 0
+        if not self.full:
+            self.lines.append(line)
+            emitted.append(line)
+        prefix = "\n" if len(self.lines) > len(emitted) else ""
+        return prefix + "\n".join(emitted)
+
+    def feed(self, fragment: str) -> str:
+        """Buffer a fragment and return the text of any lines it completed"""
+        self.raw += fragment
+        self.buffer += fragment
+        out = []
+        while "\n" in self.buffer and not self.full:
+            line, self.buffer = self.buffer.split("\n", 1)
+            out.append(self._accept(line))
+        return "".join(out)
+
+    def finish(self) -> str:
+        tail = self._accept(self.buffer) if self.buffer else ""
+        self.buffer = ""
+        return tail
 
-def generate_llm_response(prompt: str) -> tuple[str, str]:
-    for model in ["mistral", "phi"]:
+    @property
+    def text(self) -> str:
+        # Streams stop once the display is full, which is past everything trim_response keeps
+        return trim_response(self.raw)
+
+async def generate_llm_response(parts: dict) -> tuple[str, str, dict]:
+    logger.info(f"Prompt sent ({llm_dispatcher.strategy}):\n{parts['prompt']}")
+    usage = {}
+    result = await llm_dispatcher.dispatch(
+        parts["prompt"],
+        CHAT_MODELS,
+        accept=lambda text: len(text) >= 20,
+        options={"temperature": 0, "top_p": 1},
+        system=parts["system"],
+        usage=usage
+    )
+    if result:
+        text, model = result
+        return trim_response(text), model, usage
+    return "SUPA Chat encountered an error. Please try again or contact HR.", "none", usage
+
+async def stream_llm_response(parts: dict, usage: dict = None):
+    """
+    Stream a trimmed answer, falling back to the next model only if the
+    current one fails before producing any output. Yields ("token", text)
+    events followed by a single ("done", (text, model)) event, or by
+    ("truncated", (text, model)) if the model failed after some of the answer
+    was sent; the answering model's token counts are copied into `usage`.
+    """
+    for model in CHAT_MODELS:
+        breaker = llm_dispatcher.breaker(model)
+        if not breaker.allow():
+            logger.info(f"⛔ Skipping {model} stream: circuit open")
+            continue
+        trimmer = StreamTrimmer()
+        attempt_usage = {}
+        started = False
+        failed = False
         try:
-            logger.info(f"Prompt sent to {model}:\n{prompt}")
-            response = requests.post("http://localhost:11434/api/generate", json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0, "top_p": 1}
-            }, timeout=30)
-            text = response.json().get("response", "").strip()
-            if len(text) >= 20:
-                return trim_response(text), model
-        except ReadTimeout:
-            logger.warning(f"❌ {model} timed out")
+            logger.info(f"Streaming prompt to {model}:\n{parts['prompt']}")
+            fragments = ollama_client.stream_generate(
+                model,
+                parts["prompt"],
+                options={"temperature": 0, "top_p": 1},
+                system=parts["system"],
+                usage=attempt_usage
+            )
+            try:
+                async for fragment in fragments:
+                    text = trimmer.feed(fragment)
+                    if text:
+                        started = True
+                        yield "token", text
+                    if trimmer.full:
+                        # Everything past the line limit would be dropped anyway
+                        break
+            finally:
+                # Closes the upstream HTTP stream so Ollama stops generating
+                await fragments.aclose()
+            text = trimmer.finish()
+            if text:
+                started = True
+                yield "token", text
+        except httpx.TimeoutException:
+            failed = True
+            logger.warning(f"❌ {model} timed out while streaming")
         except Exception as e:
-            logger.error(f"❌ {model} failed: {e}")
-    return "SUPA Chat encountered an error. Please try again or contact HR.", "none"
+            failed = True
+            logger.error(f"❌ {model} stream failed: {e}")
+        except BaseException:
+            # Client disconnected mid-stream: not a verdict on the model's health
+            breaker.record_cancel()
+            raise
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            llm_dispatcher.model_stats(model).record_usage(attempt_usage, estimate_tokens(parts["system"] + parts["prompt"]))
+        if started:
+            # Part of the answer already reached the client; don't splice in another model
+            if usage is not None:
+                usage.update(attempt_usage)
+            yield ("truncated" if failed else "done"), (trimmer.text, model)
+            return
+    yield "done", ("SUPA Chat encountered an error. Please try again or contact HR.", "none")
 
 def enrich_data_with_query(user_input: str, page_context: dict) -> dict:
     """Enrich page context with specific data based on query intent"""
@@ -95,50 +252,278 @@ def enrich_data_with_query(user_input: str, page_context: dict) -> dict:
     
     return page_context
 
-# 🚀 Main Chat Endpoint
-@router.post("/chat")
-async def chat(request: Request):
-    data = await request.json()
-    logger.info(f"📥 Incoming request: {data}")
+def _memory_key(token: str, session_id, page: str):
+    """Session memory key for one employee's conversation (one browser tab), or None for no memory.
 
+    HR pages and tokens that aren't an employee's ("demo", "hr-dashboard", ...)
+    are shared by many people, so they never get memory.
+    """
+    if not isinstance(session_id, str) or not 0 < len(session_id) <= 64 or page in HR_PAGES:
+        return None
+    try:
+        get_employee_info(token)
+    except ValueError:
+        return None
+    return f"{token}:{session_id}"
+
+def _department_of(token: str):
+    try:
+        return get_employee_info(token)["department"]
+    except ValueError:
+        return None
+
+def _remember(prepared: dict, reply: str):
+    if prepared["memory_key"]:
+        session_store.add_turn(prepared["memory_key"], prepared["user_input"], reply)
+
+def _prepare_chat(data: dict, timer: StageTimer) -> dict:
+    """Resolve cache hits, FAQ answers and off-topic questions, otherwise build the grounded prompt"""
     user_input = data.get("message", "").strip().lower()
     token = data.get("token", "demo")
     page = data.get("page", "").lower()
-    topic = detect_policy_topic(user_input)
+    with timer.stage("intent"):
+        topic = detect_policy_topic(user_input)
+        on_topic = is_onboarding_related(user_input)
+    with timer.stage("session"):
+        memory_key = _memory_key(token, data.get("session_id"), page)
+        history = session_store.history(memory_key) if memory_key else ""
 
-    cache_key = f"{token}:{page}:{user_input}"
-    if cache_key in response_cache:
-        logger.debug(f"Cache hit for {cache_key}")
-        return {
-            "response": response_cache[cache_key],
+    with timer.stage("version"):
+        version = get_global_version() if page in HR_PAGES else get_grounding_version(token, _department_of(token))
+    prepared = {
+        "cache_key": f"{token}:{page}:v{version}:{user_input}",
+        # Follow-ups depend on the conversation: never cached or coalesced with other requests
+        "cacheable": not history,
+        "memory_key": memory_key,
+        "token": token,
+        "page": page,
+        "user_input": user_input,
+        "topic": topic,
+        "reply": None,
+        "prompt_parts": None
+    }
+    cached = None
+    if prepared["cacheable"]:
+        with timer.stage("cache"):
+            cached = response_cache.get(prepared["cache_key"])
+    if cached is not None:
+        logger.debug(f"Cache hit for {prepared['cache_key']}")
+        _remember(prepared, cached)
+        prepared["reply"] = {
+            "response": cached,
             "model_used": "cached",
             "policy_topic": topic
         }
+        return prepared
+
+    # Static facts ("what's the dress code") are answered without the LLM,
+    # before the off-topic gate so they aren't turned away
+    if settings.FAQ_ENABLED:
+        with timer.stage("faq"):
+            hit = answer_faq(user_input, page)
+        if hit is not None:
+            reply = trim_response(hit["answer"])
+            _remember(prepared, reply)
+            prepared["reply"] = {
+                "response": reply,
+                "model_used": "faq",
+                "policy_topic": topic
+            }
+            return prepared
 
-    if not is_onboarding_related(user_input):
-        return {
-        "response": "I'm here to help with onboarding only — tasks, documents, training, and team intros. For other topics, please reach out to your manager or HR.",
-        "model_used": "none",
-        "policy_topic": "none"
+    if not on_topic:
+        prepared["reply"] = {
+            "response": "I'm here to help with onboarding only — tasks, documents, training, and team intros. For other topics, please reach out to your manager or HR.",
+            "model_used": "none",
+            "policy_topic": "none"
         }
+        return prepared
 
     # Get base page context
-    page_context = get_page_context(token, page)
-    
+    with timer.stage("page_context"):
+        page_context = get_page_context(token, page)
+
     # Enrich with specific data based on query
-    page_context = enrich_data_with_query(user_input, page_context)
-    
-    prompt = build_prompt(user_input, token, page_context)
-    response_text, model_used = generate_llm_response(prompt)
+    with timer.stage("enrich"):
+        page_context = enrich_data_with_query(user_input, page_context)
+
+    with timer.stage("prompt"):
+        prepared["prompt_parts"] = build_prompt_parts(user_input, token, page_context, history)
+    return prepared
+
+def _record_timings(timer: StageTimer, prepared: dict, model_used: str, usage: dict = None) -> dict:
+    """Feed the rolling histogram and write one structured log line for this request"""
+    timings = timer.as_dict()
+    metrics = dict(timings)
+    record = {
+        "event": "chat_timing",
+        "page": prepared["page"],
+        "model": model_used,
+        "timings_ms": timings
+    }
+    parts = prepared["prompt_parts"]
+    if parts:
+        record["prompt_chars"] = len(parts["system"]) + len(parts["prompt"])
+        record["prompt_tokens_est"] = metrics["prompt_tokens_est"] = estimate_tokens(parts["system"] + parts["prompt"])
+    if usage and usage.get("eval_count") and usage.get("eval_duration"):
+        record["prompt_eval_count"] = usage.get("prompt_eval_count", 0)
+        record["eval_count"] = usage["eval_count"]
+        record["tokens_per_sec"] = metrics["tokens_per_sec"] = round(usage["eval_count"] / (usage["eval_duration"] / 1e9), 1)
+    chat_timings.observe(metrics)
+    timing_logger.info(json.dumps(record))
+    return timings
 
+def _prepare_chat_in_session(data: dict, timer: StageTimer) -> dict:
+    """_prepare_chat on one DB session for all grounding lookups, released before the LLM call.
+    Its queries are blocking, so the async endpoints run it in the threadpool"""
+    with request_session():
+        return _prepare_chat(data, timer)
+
+def _store_response(prepared: dict, response_text: str):
+    """Cache a good answer (history-independent turns only) and add the exchange to the chat session"""
+    cache_key = prepared["cache_key"]
     if is_valid_response(response_text):
-        response_cache[cache_key] = response_text
+        if prepared["cacheable"]:
+            response_cache.set(cache_key, response_text)
+        _remember(prepared, response_text)
     else:
         logger.warning(f"Invalid response for {cache_key}: {response_text}")
 
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+# 🚀 Main Chat Endpoint
+@router.post("/chat")
+async def chat(request: Request, response: Response):
+    timer = StageTimer()
+    data = await request.json()
+    logger.info(f"📥 Incoming request: {data}")
+
+    prepared = await run_in_threadpool(_prepare_chat_in_session, data, timer)
+    topic = prepared["topic"]
+    if prepared["reply"]:
+        _record_timings(timer, prepared, prepared["reply"]["model_used"])
+        response.headers["Server-Timing"] = timer.server_timing()
+        return prepared["reply"]
+
+    parts = prepared["prompt_parts"]
+    if prepared["cacheable"]:
+        generation = inflight_llm.do(
+            SingleFlight.make_key(parts["system"] + "\n\n" + parts["prompt"]),
+            lambda: generate_llm_response(parts)
+        )
+    else:
+        generation = generate_llm_response(parts)
+    with timer.stage("llm"):
+        result = await run_until_disconnected(request, generation)
+    if result is None:
+        # Client went away; the LLM call has been cancelled and nothing is cached
+        return {"response": "", "model_used": "cancelled", "policy_topic": topic}
+    response_text, model_used, usage = result
+
+    _store_response(prepared, response_text)
+    _record_timings(timer, prepared, model_used, usage)
+    response.headers["Server-Timing"] = timer.server_timing()
+
     logger.info(f"🧭 Detected policy topic: {topic}")
     return {
         "response": response_text,
         "model_used": model_used,
         "policy_topic": topic
-    }
\ No newline at end of file
+    }
+
+# 📡 Streaming Chat Endpoint (Server-Sent Events)
+@router.post("/chat/stream")
+async def chat_stream(request: Request):
+    timer = StageTimer()
+    data = await request.json()
+    logger.info(f"📥 Incoming stream request: {data}")
+
+    prepared = await run_in_threadpool(_prepare_chat_in_session, data, timer)
+    topic = prepared["topic"]
+    # Stages before the LLM are known now; the done event carries the full set
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Server-Timing": timer.server_timing()}
+
+    async def events():
+        if prepared["reply"]:
+            reply = prepared["reply"]
+            timings = _record_timings(timer, prepared, reply["model_used"])
+            yield _sse("token", {"text": reply["response"]})
+            yield _sse("done", {"model_used": reply["model_used"], "policy_topic": reply["policy_topic"], "timings": timings})
+            return
+
+        usage = {}
+        llm_started = time.monotonic()
+        first_token = True
+        async for kind, value in stream_llm_response(prepared["prompt_parts"], usage):
+            if kind == "token":
+                if first_token:
+                    timer.record("first_token", (time.monotonic() - llm_started) * 1000)
+                    first_token = False
+                yield _sse("token", {"text": value})
+            elif kind == "truncated":
+                timer.record("llm", (time.monotonic() - llm_started) * 1000)
+                response_text, model_used = value
+                # The model failed mid-answer: the partial text is neither cached nor remembered
+                timings = _record_timings(timer, prepared, model_used, usage)
+                yield _sse("error", {
+                    "truncated": True,
+                    "model_used": model_used,
+                    "policy_topic": topic,
+                    "response": response_text,
+                    "timings": timings
+                })
+            else:
+                timer.record("llm", (time.monotonic() - llm_started) * 1000)
+                response_text, model_used = value
+                # Stream is complete: cache the full trimmed answer like /chat does
+                _store_response(prepared, response_text)
+                timings = _record_timings(timer, prepared, model_used, usage)
+                yield _sse("done", {
+                    "model_used": model_used,
+                    "policy_topic": topic,
+                    "response": response_text,
+                    "timings": timings
+                })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=headers
+    )
+
+# 📊 Cache statistics
+@router.get("/cache/stats")
+def cache_stats():
+    return all_cache_stats()
+
+@router.get("/llm/stats")
+def llm_stats():
+    return {**llm_dispatcher.stats(), "single_flight": inflight_llm.stats()}
+
+# ⏱️ Per-stage chat latency (rolling window)
+@router.get("/timings")
+def timings():
+    return chat_timings.snapshot()
+
+# 💬 Chat session memory
+@router.get("/session/stats")
+def session_stats():
+    return session_store.stats()
+
+@router.delete("/session/{token}")
+def clear_session(token: str, session_id: str = None):
+    """Forget a user's conversation history (e.g. on logout or "start over"): one session_id, or all of them"""
+    if session_id:
+        return {"cleared": int(session_store.clear(f"{token}:{session_id}"))}
+    return {"cleared": session_store.clear_prefix(f"{token}:")}
+
+# ❓ FAQ fast path hit rate
+@router.get("/faq/stats")
+def faq_stats():
+    return faq_index.stats()
+
+# 🩺 LLM health (circuit breaker state per model)
+@router.get("/health")
+def llm_health():
+    return llm_dispatcher.health(CHAT_MODELS)
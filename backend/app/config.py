@@ -17,6 +17,53 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     GEMINI_API_KEY: Optional[str] = None
 
+    # 🤖 Local LLM (Ollama) used by SUPA chat
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    OLLAMA_TIMEOUT_SECONDS: float = 30.0
+    OLLAMA_MAX_CONNECTIONS: int = 20
+    OLLAMA_MAX_KEEPALIVE: int = 10
+    # How long Ollama keeps a model (and its cached system-prompt prefix) loaded
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    # sequential | hedged | race — see app/mcp_tools/llm_dispatch.py
+    LLM_DISPATCH_STRATEGY: str = "sequential"
+    LLM_HEDGE_DELAY_MS: float = 4000.0
+    # Per-model circuit breaker
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_MIN_CALLS: int = 4
+    LLM_BREAKER_WINDOW: int = 20
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    # Timeouts of calls given a shorter deadline than this don't count against the model
+    LLM_BREAKER_MIN_TIMEOUT_SECONDS: float = 15.0
+
+    # 📚 Policy retrieval for chat prompts
+    POLICY_TOP_K: int = 4
+    POLICY_TOKEN_BUDGET: int = 300
+
+    # 🧠 SUPA chat response cache
+    CHAT_CACHE_MAX_ENTRIES: int = 1000
+    CHAT_CACHE_TTL_SECONDS: float = 300.0
+    CHAT_CACHE_MAX_BYTES: int = 5 * 1024 * 1024
+
+    # 💬 SUPA chat session memory (per token)
+    CHAT_SESSION_MAX_TURNS: int = 4
+    CHAT_SESSION_HISTORY_TOKENS: int = 200
+    CHAT_SESSION_SUMMARY_TOKENS: int = 80
+    CHAT_SESSION_IDLE_SECONDS: float = 1800.0
+    CHAT_SESSION_MAX_SESSIONS: int = 1000
+
+    # ❓ FAQ fast path: canned answers for static onboarding/policy questions
+    FAQ_ENABLED: bool = True
+    # Share of the question's content words an FAQ entry must cover
+    FAQ_MIN_COVERAGE: float = 0.75
+
+    # 📊 HR analytics read from the incrementally maintained onboarding_stats table
+    ONBOARDING_STATS_SNAPSHOT: bool = True
+    # ⏱️ Time-to-complete percentiles cover completions from the last N days
+    ONBOARDING_EVENTS_WINDOW_DAYS: int = 365
+    # 🗓️ Rebuild the daily onboarding rollups every N seconds in this process (0 = off: cron
+    # scripts/refresh_onboarding_rollups.py). Enable on a single worker only; concurrent refreshes double-count
+    ONBOARDING_ROLLUP_INTERVAL_SECONDS: int = 0
+
     class Config:
         env_file = ".env"
         extra = Extra.allow 
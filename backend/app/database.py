@@ -1,6 +1,10 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.config import settings
 from dotenv import load_dotenv
 
@@ -19,4 +23,86 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def create_missing_indexes():
+    """create_all() skips indexes on tables that already exist; add any declared since"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+# 🔁 Session shared by every lookup inside request_session() (opened lazily)
+_request_session: ContextVar[Optional[dict]] = ContextVar("request_session", default=None)
+
+@contextmanager
+def request_session():
+    """One session for all session_scope() users in this block, closed when it ends"""
+    slot = {"session": None, "closed": False}
+    reset_token = _request_session.set(slot)
+    try:
+        yield
+    finally:
+        _request_session.reset(reset_token)
+        slot["closed"] = True
+        if slot["session"] is not None:
+            slot["session"].close()
+
+@contextmanager
+def session_scope(db: Session = None):
+    """The caller's session, else the current request_session(), else a fresh one closed on exit"""
+    if db is not None:
+        yield db
+        return
+    slot = _request_session.get()
+    if slot is not None and not slot["closed"]:
+        if slot["session"] is None:
+            slot["session"] = SessionLocal()
+        yield slot["session"]
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# 📊 Connection pool checkout/checkin counters (a leak shows as checked_out never returning to 0)
+class PoolMetrics:
+    def __init__(self, engine):
+        self.engine = engine
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, *args):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "pool": self.engine.pool.status()
+            }
+
+pool_metrics = PoolMetrics(engine)
@@ -1,14 +1,19 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from typing import Optional
+from sqlalchemy import update, or_
 from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from dotenv import load_dotenv
 from app import models
+from app.mcp_tools import onboarding_stats, onboarding_events
 import os
 
 load_dotenv()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/hr-login")
+# Same token, but optional: for routes that only need HR for some of their output
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/hr-login", auto_error=False)
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
@@ -75,13 +80,45 @@ def get_current_hr_user(token: str = Depends(oauth2_scheme), db: Session = Depen
     
     return HREmployee(employee, it_account)
 
+def mark_task_completed(db: Session, task: models.Task, department: Optional[str]) -> bool:
+    """Complete `task` with one conditional UPDATE; only the request that actually flips it
+    records the completion, so concurrent completions are counted once"""
+    flipped = db.execute(
+        update(models.Task)
+        .where(models.Task.id == task.id, or_(models.Task.status.is_(None), models.Task.status != "completed"))
+        .values(status="completed")
+    ).rowcount == 1
+    if flipped:
+        onboarding_stats.record_task_completed(db, department, task)
+        onboarding_events.record_task_completed(db, task.assigned_to_id, department, task.title)
+    return flipped
+
+def change_employee_status(db: Session, employee: models.Employee, status: str):
+    """Set an employee's status only if it still holds the value read, so the counters move
+    away from the status that was really replaced (re-reads and retries if another writer won)"""
+    while employee.status != status:
+        old_status = employee.status
+        current = models.Employee.status.is_(None) if old_status is None else models.Employee.status == old_status
+        changed = db.execute(
+            update(models.Employee)
+            .where(models.Employee.emp_id == employee.emp_id, current)
+            .values(status=status)
+        ).rowcount == 1
+        if changed:
+            onboarding_stats.record_status_change(db, employee.department, old_status, status)
+            onboarding_events.record_status_change(db, employee.emp_id, employee.department, old_status, status)
+            return
+        db.refresh(employee)
+
 def complete_task(db: Session, employee_id: str, title: str):
     task = db.query(models.Task).filter_by(
         assigned_to_id=employee_id,
         title=title
     ).first()
-    if task and task.status != "completed":
-        task.status = "completed"
-        db.commit()
-        return True
-    return False
+    if not task:
+        return False
+    employee = db.query(models.Employee).filter(models.Employee.emp_id == employee_id).first()
+    if not mark_task_completed(db, task, employee.department if employee else None):
+        return False
+    db.commit()
+    return True
@@ -1,10 +1,10 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import os
 
-from app.database import engine, Base, SessionLocal
+from app.database import engine, Base, SessionLocal, pool_metrics, create_missing_indexes
 from app.routes import (
     employee, hr, documents, training, feedback, tasks,
     test_grounding, it_accounts, email_accounts, auth, module_progress
@@ -16,6 +16,13 @@ from app.utils.security import (
     pwd_context
 )
 from app.chat_api import router as chat_router
+from app.mcp_tools.llm_client import ollama_client
+from app.mcp_tools.policy_index import build_policy_index
+from app.mcp_tools.faq_index import build_faq_index
+from app.mcp_tools.onboarding_stats import ensure_onboarding_stats
+from app.mcp_tools.onboarding_rollups import rollup_scheduler
+from app.mcp_tools.employee_search import setup_employee_search
+from app.utils.request_memo import request_scope
 
 load_dotenv()
 
@@ -45,6 +52,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ------------------------------------------------------------------
+# REQUEST-SCOPED MEMO (task_tracker lookups hit the DB once per request)
+# ------------------------------------------------------------------
+@app.middleware("http")
+async def request_memo_scope(request: Request, call_next):
+    with request_scope():
+        return await call_next(request)
+
 # ------------------------------------------------------------------
 # LOGIN REQUEST SCHEMA (JSON)
 # ------------------------------------------------------------------
@@ -147,6 +162,22 @@ def bootstrap_hr():
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
+    setup_employee_search()
+    ensure_onboarding_stats()
+    build_policy_index()
+    build_faq_index()
+
+@app.on_event("startup")
+async def start_background_jobs():
+    # Keeps the daily onboarding rollups behind /hr/analytics/cohorts current (only if
+    # ONBOARDING_ROLLUP_INTERVAL_SECONDS is set, on a single worker)
+    rollup_scheduler.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await rollup_scheduler.stop()
+    await ollama_client.aclose()
 
 # ------------------------------------------------------------------
 # ROUTES
@@ -170,3 +201,10 @@ app.include_router(auth.router)
 @app.get("/")
 def root():
     return {"message": "AI HR Onboarding Backend running"}
+
+# ------------------------------------------------------------------
+# DB POOL METRICS (checked_out should drop back to 0 between requests)
+# ------------------------------------------------------------------
+@app.get("/db/pool/stats")
+def db_pool_stats():
+    return pool_metrics.stats()
@@ -0,0 +1,219 @@
+"""
+Indexed employee search (name, email, emp_id).
+
+One interface, one backend per database:
+
+- PostgreSQL: pg_trgm GIN index on lower(name || email || emp_id); candidates
+  via word similarity (`<%`) or substring (ILIKE), both served by the index.
+- SQLite: FTS5 trigram table over employees (external content, kept in
+  sync by triggers); a token matches as a substring or through any of its
+  trigrams, ranked by bm25.
+- Anything else (MySQL): a LIKE scan, as before, so search still works.
+
+The index only narrows the candidates; every backend then ranks them with
+the same scoring, so results match across databases. Each query token
+must match some word of the employee (exactly, as a prefix, as a substring,
+or with trigram similarity >= FUZZY_THRESHOLD, as pg_trgm does), and the
+employee's score is the mean of its best token matches.
+
+Both indexes are maintained by the database on every insert and update of
+employees, whichever code path writes them. setup_employee_search() creates
+them at startup.
+"""
+import logging
+import re
+
+from sqlalchemy import or_, text
+from sqlalchemy.orm import Session
+
+from app.database import engine, session_scope
+from app.models import Employee
+from app.utils.request_memo import request_memoized
+
+logger = logging.getLogger("employee_search")
+
+FUZZY_THRESHOLD = 0.3  # pg_trgm's default similarity threshold
+MAX_CANDIDATES = 200
+
+
+def tokenize(query: str) -> list:
+    # Letters and digits only, split like FTS5's unicode61 tokenizer (on ".", "@", "_", ...)
+    return re.findall(r"[^\W_]+", (query or "").lower())
+
+
+def trigrams(word: str) -> set:
+    """pg_trgm-style trigrams: the word padded with two spaces in front, one behind"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    left, right = trigrams(a), trigrams(b)
+    return len(left & right) / len(left | right) if left and right else 0.0
+
+
+def _token_score(token: str, words: list) -> float:
+    best = 0.0
+    for word in words:
+        if word == token:
+            return 1.0
+        if word.startswith(token):
+            best = max(best, 0.9)
+        elif token in word:
+            best = max(best, 0.7)
+        elif len(token) >= 3:
+            score = similarity(token, word)
+            if score >= FUZZY_THRESHOLD:
+                best = max(best, score * 0.8)
+    return best
+
+
+def score(tokens: list, employee: Employee) -> float:
+    """Mean of each token's best match against the employee's words; 0 if any token misses"""
+    words = tokenize(f"{employee.name or ''} {employee.email or ''} {employee.emp_id or ''}")
+    scores = [_token_score(token, words) for token in tokens]
+    return sum(scores) / len(scores) if scores and all(scores) else 0.0
+
+
+class EmployeeSearchBackend:
+    name = "scan"
+
+    def setup(self, db: Session):
+        """Create the index if it doesn't exist yet"""
+
+    def candidates(self, db: Session, tokens: list, limit: int) -> list:
+        """Employees that may match (enough to fill `limit` when possible); ranking happens afterwards"""
+        conditions = []
+        for token in tokens:
+            conditions.append(Employee.name.ilike(f"%{token}%"))
+            conditions.append(Employee.email.ilike(f"%{token}%"))
+            conditions.append(Employee.emp_id.ilike(f"{token}%"))
+        return db.query(Employee).filter(or_(*conditions)).limit(MAX_CANDIDATES).all()
+
+
+class PostgresTrigramSearch(EmployeeSearchBackend):
+    name = "pg_trgm"
+    SEARCH_TEXT = "lower(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || emp_id)"
+
+    def setup(self, db: Session):
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        db.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_employees_search_trgm ON employees USING gin (({self.SEARCH_TEXT}) gin_trgm_ops)"
+        ))
+        db.commit()
+
+    def candidates(self, db: Session, tokens: list, limit: int) -> list:
+        params, matches, ranks = {}, [], []
+        for position, token in enumerate(tokens):
+            params[f"t{position}"] = token
+            params[f"p{position}"] = f"%{token}%"
+            matches.append(f"(:t{position} <% {self.SEARCH_TEXT} OR {self.SEARCH_TEXT} LIKE :p{position})")
+            ranks.append(f"word_similarity(:t{position}, {self.SEARCH_TEXT})")
+        ids = db.execute(text(
+            f"SELECT emp_id FROM employees WHERE {' OR '.join(matches)} "
+            f"ORDER BY {' + '.join(ranks)} DESC LIMIT {MAX_CANDIDATES}"
+        ), params).scalars().all()
+        return db.query(Employee).filter(Employee.emp_id.in_(ids)).all() if ids else []
+
+
+class SqliteFtsSearch(EmployeeSearchBackend):
+    name = "fts5"
+
+    SETUP = [
+        "CREATE VIRTUAL TABLE employee_search USING fts5("
+        "name, email, emp_id, content='employees', content_rowid='rowid', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS employees_search_insert AFTER INSERT ON employees BEGIN "
+        "INSERT INTO employee_search(rowid, name, email, emp_id) VALUES (new.rowid, new.name, new.email, new.emp_id); END",
+        "CREATE TRIGGER IF NOT EXISTS employees_search_delete AFTER DELETE ON employees BEGIN "
+        "INSERT INTO employee_search(employee_search, rowid, name, email, emp_id) VALUES ('delete', old.rowid, old.name, old.email, old.emp_id); END",
+        "CREATE TRIGGER IF NOT EXISTS employees_search_update AFTER UPDATE OF name, email, emp_id ON employees BEGIN "
+        "INSERT INTO employee_search(employee_search, rowid, name, email, emp_id) VALUES ('delete', old.rowid, old.name, old.email, old.emp_id); "
+        "INSERT INTO employee_search(rowid, name, email, emp_id) VALUES (new.rowid, new.name, new.email, new.emp_id); END",
+    ]
+
+    def setup(self, db: Session):
+        exists = db.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'employee_search'")).first()
+        if exists:
+            return
+        for statement in self.SETUP:
+            db.execute(text(statement))
+        # Index the employees that already exist
+        db.execute(text("INSERT INTO employee_search(employee_search) VALUES ('rebuild')"))
+        db.commit()
+        logger.info("🔎 Employee search index (FTS5) built")
+
+    def _match(self, db: Session, match: str, ranked: bool) -> list:
+        return db.execute(text(
+            f"SELECT emp_id FROM employee_search WHERE employee_search MATCH :match "
+            f"{'ORDER BY rank ' if ranked else ''}LIMIT {MAX_CANDIDATES}"
+        ), {"match": match}).scalars().all()
+
+    def candidates(self, db: Session, tokens: list, limit: int) -> list:
+        long_tokens = [token for token in tokens if len(token) >= 3]
+        if not long_tokens:
+            # The trigram index can't look up 1-2 letters
+            return super().candidates(db, tokens, limit)
+        # Substring hits always outscore fuzzy ones: when they fill the page, skip the bm25 ranking
+        ids = self._match(db, " AND ".join(f'"{token}"' for token in long_tokens), ranked=False)
+        if len(ids) < limit:
+            # Each token as a whole or through any of its trigrams, best overlap first
+            fuzzy = " AND ".join(
+                "(" + " OR ".join(f'"{gram}"' for gram in [token] + [token[i:i + 3] for i in range(len(token) - 2)]) + ")"
+                for token in long_tokens
+            )
+            ids = list(dict.fromkeys(ids + self._match(db, fuzzy, ranked=True)))
+        return db.query(Employee).filter(Employee.emp_id.in_(ids)).all() if ids else []
+
+
+def _backend_for(dialect: str) -> EmployeeSearchBackend:
+    if dialect == "postgresql":
+        return PostgresTrigramSearch()
+    if dialect == "sqlite":
+        return SqliteFtsSearch()
+    return EmployeeSearchBackend()
+
+
+backend = _backend_for(engine.dialect.name)
+_ready = False
+
+
+def setup_employee_search():
+    global backend, _ready
+    _ready = True
+    with session_scope() as db:
+        try:
+            backend.setup(db)
+        except Exception as e:
+            # e.g. no permission to create the extension, or SQLite without FTS5
+            db.rollback()
+            logger.warning(f"⚠️ Employee search index unavailable ({backend.name}): {e}; using a table scan")
+            backend = EmployeeSearchBackend()
+
+
+@request_memoized
+def search_employees(query: str, limit: int = 10, db: Session = None) -> list:
+    """Employees matching every word of `query` (prefix, substring or fuzzy), best first"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    if not _ready:
+        setup_employee_search()
+    with session_scope(db) as db:
+        candidates = backend.candidates(db, tokens, limit)
+        ranked = sorted(
+            ((score(tokens, employee), employee) for employee in candidates),
+            key=lambda item: (-item[0], item[1].name or "")
+        )
+        return [
+            {
+                "emp_id": employee.emp_id,
+                "name": employee.name,
+                "email": employee.email,
+                "department": employee.department,
+                "role": employee.role,
+                "status": employee.status,
+                "score": round(relevance, 3)
+            }
+            for relevance, employee in ranked[:limit]
+            if relevance > 0
+        ]
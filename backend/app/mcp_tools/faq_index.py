@@ -0,0 +1,226 @@
+"""
+FAQ fast path for SUPA chat.
+
+Questions like "when does joining day start" or "what's the dress code" are
+answered by static values: the page facts in grounding.PAGE_FACTS and the
+bullets of the policy files. This index turns each fact and policy bullet
+into an entry with its trigger terms. A question is answered from an entry,
+without calling the LLM, only when the match is confident:
+
+- most of the question's content words are covered by the entry,
+- the entry is anchored: asked on its page, or its page/policy is named
+  (for policies, the intent engine's topic counts), or its own label is
+  fully matched ("dress code"),
+- a how/where question about an action ("upload", "submit", "change") only
+  matches entries whose own text, not just their aliases, names it: "where do
+  i upload documents" isn't answered by the document list, while "which
+  documents do i need to upload" is,
+- no other entry matches equally well, and
+- the question isn't about the user's own progress, which needs live data.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Optional
+
+from app.config import settings
+from app.mcp_tools.grounding import PAGE_FACTS
+from app.mcp_tools.intent import classify_message, DEFAULT_POLICY_TOPIC
+from app.mcp_tools.policy_index import tokenize, split_into_chunks
+from app.mcp_tools.policy_store import policy_store
+
+logger = logging.getLogger("faq_index")
+
+PAGE_TITLES = {
+    "personal": "Personal Details",
+    "dashboard": "Dashboard",
+    "joining-day": "Joining Day",
+    "training": "Training",
+    "department-intro": "Department Introduction",
+    "feedback": "Feedback",
+    "pre-review": "PreReview (Final Review)",
+}
+
+# Extra words that name the same page
+PAGE_ALIASES = {
+    "personal": "personal details form",
+    "department-intro": "department introduction intro",
+    "pre-review": "pre review prereview final review",
+}
+
+# Extra ways people ask about each fact label
+FACT_ALIASES = {
+    "Timing": "time start begin reporting",
+    "Location": "where venue address office place",
+    "Dress Code": "dress wear attire clothes",
+    "Documents Required": "documents bring carry",
+    "Checklist": "checklist happen agenda",
+    "File Format": "file format type pdf",
+    "Estimated Time": "long take hours duration",
+    "Support": "help support stuck",
+    "Training Modules": "modules courses",
+    "Completion Criteria": "criteria proof",
+    "Required Documents": "documents upload",
+    "Mandatory Fields": "mandatory compulsory fields",
+    "Save Behavior": "save next button unlock",
+    "Main Tasks": "main tasks",
+    "Note": "pre-onboarding preonboarding",
+    "Features": "features org chart",
+    "Action": "contact details view member",
+    "Purpose": "purpose why",
+    "Visibility": "visibility visible who see",
+    "Format": "format rating stars",
+    "Editable": "edit change update resubmit",
+    "Next Steps": "next after submit badge",
+    "Content": "content contains shows",
+    "Access": "access available unlock",
+    "Total Main Tasks": "many total tasks",
+    "Final Step": "last final step",
+}
+
+# Words that carry no meaning for matching a fact
+FILLER = {"tell", "about", "please", "there", "any", "know", "get", "need", "want", "this", "that", "have", "has", "here", "s"}
+
+# Questions about the user's own state need live data, never a canned answer
+DYNAMIC_TERMS = {"pending", "completed", "status", "progress", "left", "remaining", "done", "percent", "percentage"}
+
+
+# Asked with how/where, these verbs make a question about doing something; matched as prefixes ("uploaded", "edited")
+PROCEDURE_WORDS = {"how", "where"}
+ACTION_VERBS = ("upload", "submit", "send", "change", "update", "edit", "fill", "download", "reset",
+                "sign", "apply", "attach", "delete", "remove", "replace", "register", "install")
+
+
+def query_terms(text: str) -> set:
+    return {term for term in tokenize(text) if term not in FILLER and len(term) > 1}
+
+
+def actions(terms) -> set:
+    return {verb for verb in ACTION_VERBS for term in terms if term.startswith(verb)}
+
+
+class FAQIndex:
+    def __init__(self, min_coverage: float = 0.75, min_matched: int = 2):
+        self.min_coverage = min_coverage
+        self.min_matched = min_matched
+        self.entries: list = []
+        self.built = False
+        self.source_version = None
+        self.lookups = 0
+        self.hits = 0
+        self.entry_hits: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def build(self, documents: dict, source_version=None):
+        """Index the static page facts plus `documents` (policy title -> text)"""
+        entries = []
+        for page, facts in PAGE_FACTS.items():
+            title = PAGE_TITLES[page]
+            page_terms = set(tokenize(f"{title} {PAGE_ALIASES.get(page, '')}"))
+            for label, value in facts.items():
+                label_terms = set(tokenize(label))
+                entries.append({
+                    "id": f"{page}:{label}",
+                    "kind": "page",
+                    "page": page,
+                    "terms": label_terms | set(tokenize(f"{FACT_ALIASES.get(label, '')} {value}")) | page_terms,
+                    "label_terms": label_terms,
+                    "anchor_terms": page_terms,
+                    "actions": actions(tokenize(f"{label} {value}")),
+                    "answer": f"{title} — {label}: {value}"
+                })
+        for title, text in documents.items():
+            _, chunks = split_into_chunks(text)
+            title_terms = set(tokenize(title))
+            for position, chunk in enumerate(chunks):
+                entries.append({
+                    "id": f"policy:{title}:{position}",
+                    "kind": "policy",
+                    "title": title,
+                    "terms": set(tokenize(chunk)) | title_terms,
+                    "label_terms": set(),
+                    "anchor_terms": title_terms,
+                    "actions": actions(tokenize(f"{title} {chunk}")),
+                    "answer": f"{title}:\n{chunk}"
+                })
+        with self._lock:
+            self.entries = entries
+            self.built = True
+            self.source_version = source_version
+        logger.info(f"❓ FAQ index built: {len(entries)} entries")
+
+    def _score(self, entry: dict, terms: set, asked_actions: set, page: str, policy_title: Optional[str]) -> Optional[float]:
+        if not asked_actions <= entry["actions"]:
+            return None
+        matched = terms & entry["terms"]
+        if len(matched) < self.min_matched:
+            return None
+        coverage = len(matched) / len(terms)
+        if coverage < self.min_coverage:
+            return None
+        if entry["kind"] == "page":
+            anchored = entry["page"] == page or bool(matched & entry["anchor_terms"]) or entry["label_terms"] <= matched
+        else:
+            anchored = entry["title"] == policy_title or bool(matched & entry["anchor_terms"])
+        if not anchored:
+            return None
+        # Tie-break towards entries that also cover their own wording
+        return coverage + len(matched) / (len(entry["terms"]) + 1) / 10
+
+    def match(self, message: str, page: str = "") -> Optional[dict]:
+        """The single confident entry for `message`, or None"""
+        terms = query_terms(message)
+        if not terms or terms & DYNAMIC_TERMS:
+            return None
+        topic = classify_message(message)["policy_topic"]
+        policy_title = policy_store.title(topic) if topic != DEFAULT_POLICY_TOPIC else None
+        asked_actions = actions(terms) if PROCEDURE_WORDS & set(re.findall(r"[a-z]+", message.lower())) else set()
+
+        scored = []
+        for entry in self.entries:
+            score = self._score(entry, terms, asked_actions, page, policy_title)
+            if score is not None:
+                scored.append((score, entry))
+        if not scored:
+            return None
+        scored.sort(key=lambda item: item[0], reverse=True)
+        if len(scored) > 1 and scored[1][0] == scored[0][0]:
+            return None
+        score, entry = scored[0]
+        return {"id": entry["id"], "answer": entry["answer"], "score": round(score, 3)}
+
+    def record(self, hit: Optional[dict]):
+        with self._lock:
+            self.lookups += 1
+            if hit:
+                self.hits += 1
+                self.entry_hits[hit["id"]] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+                "min_coverage": self.min_coverage,
+                "top_entries": dict(self.entry_hits.most_common(10))
+            }
+
+
+faq_index = FAQIndex(min_coverage=settings.FAQ_MIN_COVERAGE)
+
+
+def build_faq_index():
+    faq_index.build(policy_store.documents(), source_version=policy_store.version)
+
+
+def answer_faq(message: str, page: str = "") -> Optional[dict]:
+    """Canned answer for a confidently matched FAQ, or None to fall through to the LLM"""
+    policy_store.refresh()
+    if not faq_index.built or faq_index.source_version != policy_store.version:
+        build_faq_index()
+    hit = faq_index.match(message, page)
+    faq_index.record(hit)
+    return hit
@@ -1,5 +1,5 @@
-import os
-import re
+from app.mcp_tools.intent import detect_policy_topic
+from app.mcp_tools.policy_store import policy_store
 from app.mcp_tools.task_tracker import (
     get_employee_info,
     get_personal_info_by_token,
@@ -19,47 +19,58 @@ from app.mcp_tools.task_tracker import (
 )
 
 
-def get_policy(name: str) -> str:
-    base_path = os.path.join(os.path.dirname(__file__), "..", "assets", "policies")
-    filename = f"{name.lower().replace(' ', '-')}.txt"
-    filepath = os.path.join(base_path, filename)
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
-        return f"Policy file '{filename}' not found."
-
-def keyword_in_input(input_lower, keywords):
-    return any(re.search(rf"\b{kw}\b", input_lower) for kw in keywords)
+# 📌 Static facts shown on each onboarding page. get_page_context merges them into
+# the live context, and the FAQ index answers questions about them directly.
+PAGE_FACTS = {
+    "personal": {
+        "Required Documents": "Aadhaar, PAN, Bank Proof, NDA",
+        "Save Behavior": "Save unlocks Next button",
+        "Mandatory Fields": "Aadhaar and PAN are mandatory"
+    },
+    "dashboard": {
+        "Main Tasks": "Personal Details, Joining Day, Training, Department Introduction, Feedback, PreReview (Final Review)",
+        "Note": "Pre-Onboarding is handled by HR/Admin, not an employee task"
+    },
+    "joining-day": {
+        "Checklist": "Set up company email, Attend orientation session, Complete policy acknowledgment",
+        "Timing": "Starts at 10 AM IST",
+        "Location": "Sumeru Digitals HQ, 5th Floor",
+        "Dress Code": "Smart casual",
+        "Documents Required": "Signed NDA, Aadhaar, PAN"
+    },
+    "training": {
+        "Training Modules": "POSH Certification, IT Systems Access, Collaboration Training",
+        "Completion Criteria": "Upload PDF proof for each training module",
+        "File Format": "Only PDF files are accepted",
+        "Support": "Reach out to HR or your buddy for help",
+        "Estimated Time": "2–3 hours total"
+    },
+    "department-intro": {
+        "Features": "View organizational chart, See team members with details, Contact team via email, Copy email addresses",
+        "Action": "Click 'View Details' on any team member to see their contact info, availability, and organization details"
+    },
+    "feedback": {
+        "Purpose": "Share your onboarding experience",
+        "Visibility": "Only HR and onboarding team can view your feedback",
+        "Format": "Free text + star rating (1-5 stars)",
+        "Editable": "Feedback can be edited and updated - new submission replaces previous one",
+        "Next Steps": "Submit to unlock final badge (PreReview page)"
+    },
+    "pre-review": {
+        "Purpose": "Review all onboarding information before completion",
+        "Content": "Shows employee details, personal info, completed tasks, training modules, feedback, and all submitted documents",
+        "Access": "Available after all 5 main tasks are completed (Personal Details, Joining Day, Training, Department Introduction, Feedback). Note: Pre-Onboarding is handled by HR/Admin.",
+        "Total Main Tasks": "5 tasks (Pre-Onboarding is admin-only)",
+        "Final Step": "This is the last step before onboarding completion"
+    }
+}
 
-def detect_policy_topic(user_input: str) -> str:
-    input_lower = user_input.lower()
 
-    if keyword_in_input(input_lower, ["attendance", "absent", "late", "punch", "biometric", "work hours"]):
-        return "Work Hours and Attendance"
-    elif keyword_in_input(input_lower, ["conduct", "behavior", "ethics"]):
-        return "code of conduct"
-    elif keyword_in_input(input_lower, ["salary", "bonus", "benefits", "compensation"]):
-        return "Compensation and Benefits"
-    elif keyword_in_input(input_lower, ["confidential", "intellectual", "ip"]):
-        return "Confidentiality and Intellectual Property"
-    elif keyword_in_input(input_lower, ["exit", "resign", "transition", "notice period"]):
-        return "Exit and Transition"
-    elif keyword_in_input(input_lower, ["harassment", "posh", "grievance", "complaint"]):
-        return "Harassment and Grievance Redressal (POSH)"
-    elif keyword_in_input(input_lower, ["vpn", "security", "device", "laptop", "it usage"]):
-        return "IT Usage and Security"
-    elif keyword_in_input(input_lower, ["leave", "vacation", "holiday", "sick", "casual"]):
-        return "Leave Policy"
-    elif keyword_in_input(input_lower, ["performance", "appraisal", "review", "rating"]):
-        return "Performance and Appraisal"
-    elif keyword_in_input(input_lower, ["remote", "hybrid", "work from home", "wfh"]):
-        return "Remote Work and Hybrid Guidelines"
-    elif keyword_in_input(input_lower, ["travel", "expense", "reimbursement", "claim"]):
-        return "Travel and Expense Reimbursement"
-    else:
-        return "Company Policy"
+def get_policy(name: str) -> str:
+    text = policy_store.get(name)
+    if text is None:
+        return f"Policy '{name}' not found."
+    return text
 
 # 🧩 Page Context Injection
 def get_page_context(token: str, page: str) -> dict:
@@ -89,9 +100,7 @@ def get_page_context(token: str, page: str) -> dict:
         return {
             "Page": "personal-details",
             "Completion": f"{percent}%",
-            "Required Documents": "Aadhaar, PAN, Bank Proof, NDA",
-            "Save Behavior": "Save unlocks Next button",
-            "Mandatory Fields": "Aadhaar and PAN are mandatory",
+            **PAGE_FACTS["personal"],
             "Document Status": doc_status,
             "Task Modules": ", ".join(modules_info) if modules_info else "basic_info, family_info, aadhaar, pan, bank_details, nda, declaration",
             "Module Progress": f"{module_progress.get('completed_modules', 0)}/{module_progress.get('total_modules', 7)} modules completed" if module_progress and isinstance(module_progress, dict) else "Modules: basic_info, family_info, aadhaar, pan, bank_details, nda, declaration"
@@ -117,8 +126,7 @@ def get_page_context(token: str, page: str) -> dict:
             "Next Task": get_next_task(token),
             "Overall Completion": f"{status['percent']}%",
             "Task Modules Progress": "; ".join(module_summary) if module_summary else "Module tracking enabled for all tasks",
-            "Main Tasks": "Personal Details, Joining Day, Training, Department Introduction, Feedback, PreReview (Final Review)",
-            "Note": "Pre-Onboarding is handled by HR/Admin, not an employee task"
+            **PAGE_FACTS["dashboard"]
         }
 
     elif page == "joining-day":
@@ -132,13 +140,9 @@ def get_page_context(token: str, page: str) -> dict:
         
         return {
             "Page": "Joining Day",
-            "Checklist": "Set up company email, Attend orientation session, Complete policy acknowledgment",
             "Modules": ", ".join(modules_info) if modules_info else "email_setup, orientation, policy_acknowledgment",
             "Module Progress": f"{module_progress.get('completed_modules', 0)}/{module_progress.get('total_modules', 3)} modules completed" if module_progress and isinstance(module_progress, dict) else "3 modules: email_setup, orientation, policy_acknowledgment",
-            "Timing": "Starts at 10 AM IST",
-            "Location": "Sumeru Digitals HQ, 5th Floor",
-            "Dress Code": "Smart casual",
-            "Documents Required": "Signed NDA, Aadhaar, PAN"
+            **PAGE_FACTS["joining-day"]
         }
 
     elif page == "training":
@@ -152,13 +156,9 @@ def get_page_context(token: str, page: str) -> dict:
         
         return {
             "Page": "Training",
-            "Training Modules": "POSH Certification, IT Systems Access, Collaboration Training",
             "Modules": ", ".join(modules_info) if modules_info else "company_culture (POSH), technical_training (IT Access), compliance_training (Collaboration)",
             "Module Progress": f"{module_progress.get('completed_modules', 0)}/{module_progress.get('total_modules', 3)} modules completed" if module_progress and isinstance(module_progress, dict) else "3 modules: company_culture, technical_training, compliance_training",
-            "Completion Criteria": "Upload PDF proof for each training module",
-            "File Format": "Only PDF files are accepted",
-            "Support": "Reach out to HR or your buddy for help",
-            "Estimated Time": "2–3 hours total"
+            **PAGE_FACTS["training"]
         }
 
     elif page == "department-intro":
@@ -178,8 +178,7 @@ def get_page_context(token: str, page: str) -> dict:
             "Team Count": len(team_members) if team_members else 0,
             "Modules": ", ".join(modules_info) if modules_info else "org_chart (view organization chart), team_contact (contact team members)",
             "Module Progress": f"{module_progress.get('completed_modules', 0)}/{module_progress.get('total_modules', 2)} modules completed" if module_progress and isinstance(module_progress, dict) else "2 modules: org_chart, team_contact",
-            "Features": "View organizational chart, See team members with details, Contact team via email, Copy email addresses",
-            "Action": "Click 'View Details' on any team member to see their contact info, availability, and organization details"
+            **PAGE_FACTS["department-intro"]
         }
 
     elif page == "feedback":
@@ -193,13 +192,9 @@ def get_page_context(token: str, page: str) -> dict:
         
         return {
             "Page": "Feedback",
-            "Purpose": "Share your onboarding experience",
-            "Visibility": "Only HR and onboarding team can view your feedback",
-            "Format": "Free text + star rating (1-5 stars)",
             "Modules": ", ".join(modules_info) if modules_info else "rating (provide 1-5 star rating), comments (write feedback text), submission (submit feedback)",
             "Module Progress": f"{module_progress.get('completed_modules', 0)}/{module_progress.get('total_modules', 3)} modules completed" if module_progress and isinstance(module_progress, dict) else "3 modules: rating, comments, submission",
-            "Editable": "Feedback can be edited and updated - new submission replaces previous one",
-            "Next Steps": "Submit to unlock final badge (PreReview page)"
+            **PAGE_FACTS["feedback"]
         }
     
     elif page == "pre-review" or page == "prereview":
@@ -209,18 +204,14 @@ def get_page_context(token: str, page: str) -> dict:
         
         return {
             "Page": "PreReview (Final Review)",
-            "Purpose": "Review all onboarding information before completion",
-            "Content": "Shows employee details, personal info, completed tasks, training modules, feedback, and all submitted documents",
-            "Access": "Available after all 5 main tasks are completed (Personal Details, Joining Day, Training, Department Introduction, Feedback). Note: Pre-Onboarding is handled by HR/Admin.",
+            **PAGE_FACTS["pre-review"],
             "Overall Progress": f"{status['percent']}%",
             "Completed Tasks": ", ".join(status.get('completed', [])) if status.get('completed') else "None yet",
-            "Total Main Tasks": "5 tasks (Pre-Onboarding is admin-only)",
             "Task Modules Summary": "; ".join([
                 f"{task_title}: {task_data.get('completed_modules', 0)}/{task_data.get('total_modules', 0)} modules"
                 for task_title, task_data in (all_module_progress.items() if all_module_progress else {})
                 if isinstance(task_data, dict)
-            ]) if all_module_progress else "All modules tracked per task",
-            "Final Step": "This is the last step before onboarding completion"
+            ]) if all_module_progress else "All modules tracked per task"
         }
 
     # HR Dashboard Pages
@@ -235,7 +226,7 @@ def get_page_context(token: str, page: str) -> dict:
                 "Completed Onboarding": analytics["completed_employees"],
                 "Pending Onboarding": analytics["pending_employees"],
                 "Overall Completion Rate": f"{analytics['completion_rate']}%",
-                "Average Days to Complete": analytics["average_days_to_complete"],
+                "Average Days to Complete": analytics["average_days_to_complete"] if analytics["average_days_to_complete"] is not None else "Not enough data yet",
                 "Departments": list(summary["departments"].keys()),
                 "Feedback Average Rating": feedback_summary["average_rating"],
                 "Total Feedback Count": feedback_summary["total"]
@@ -1,47 +1,178 @@
-def is_onboarding_related(message: str) -> bool:
-    keywords = [
-        "onboarding", "joining", "training", "feedback", "personal details",
-        "documents", "aadhaar", "pan", "bank proof", "nda", "manager", "buddy",
-        "team", "dashboard", "tasks", "HR", "department", "form", "upload",
-        "next button", "badge", "completion", "progress", "analytics", "statistics",
-        "track", "employees", "summary", "report", "overview", "status"
-    ]
-    msg = message.lower()
-    return any(kw in msg for kw in keywords)
+"""
+Single-pass intent engine for SUPA chat messages.
 
-def is_hr_query(message: str) -> bool:
-    """Detect if query is from HR/admin perspective"""
-    hr_keywords = [
-        "all employees", "onboarding status", "completion rate", "analytics",
-        "dashboard overview", "department stats", "feedback summary", "task statistics",
-        "track onboarding", "employee details", "pending employees", "completed employees",
-        "how many", "show me", "list", "report", "summary", "breakdown"
-    ]
-    msg = message.lower()
-    return any(kw in msg for kw in hr_keywords)
+Every keyword table (onboarding relevance, HR phrasing, policy topics and
+search/filter cues) is compiled once into one Aho-Corasick automaton. A
+message is scanned a single time and classify_message() returns everything
+the chat pipeline needs; results are memoized by message text, so chat,
+build_prompt and enrich_data_with_query share one classification per
+request. The helpers below keep their original signatures and matching
+rules: plain substring checks, except policy keywords which match on word
+boundaries.
+"""
+from collections import deque
+from functools import lru_cache
 
-def extract_search_query(message: str) -> dict:
-    """Extract actionable queries from message"""
+ONBOARDING_KEYWORDS = [
+    "onboarding", "joining", "training", "feedback", "personal details",
+    "documents", "aadhaar", "pan", "bank proof", "nda", "manager", "buddy",
+    "team", "dashboard", "tasks", "HR", "department", "form", "upload",
+    "next button", "badge", "completion", "progress", "analytics", "statistics",
+    "track", "employees", "summary", "report", "overview", "status"
+]
+
+HR_KEYWORDS = [
+    "all employees", "onboarding status", "completion rate", "analytics",
+    "dashboard overview", "department stats", "feedback summary", "task statistics",
+    "track onboarding", "employee details", "pending employees", "completed employees",
+    "how many", "show me", "list", "report", "summary", "breakdown"
+]
+
+# Checked in order; the first topic with a keyword hit wins detect_policy_topic
+POLICY_TOPIC_KEYWORDS = [
+    ("Work Hours and Attendance", ["attendance", "absent", "late", "punch", "biometric", "work hours"]),
+    ("code of conduct", ["conduct", "behavior", "ethics"]),
+    ("Compensation and Benefits", ["salary", "bonus", "benefits", "compensation"]),
+    ("Confidentiality and Intellectual Property", ["confidential", "intellectual", "ip"]),
+    ("Exit and Transition", ["exit", "resign", "transition", "notice period"]),
+    ("Harassment and Grievance Redressal (POSH)", ["harassment", "posh", "grievance", "complaint"]),
+    ("IT Usage and Security", ["vpn", "security", "device", "laptop", "it usage"]),
+    ("Leave Policy", ["leave", "vacation", "holiday", "sick", "casual"]),
+    ("Performance and Appraisal", ["performance", "appraisal", "review", "rating"]),
+    ("Remote Work and Hybrid Guidelines", ["remote", "hybrid", "work from home", "wfh"]),
+    ("Travel and Expense Reimbursement", ["travel", "expense", "reimbursement", "claim"]),
+]
+DEFAULT_POLICY_TOPIC = "Company Policy"
+
+SEARCH_KEYWORDS = ["search for", "find employee", "show employee"]
+DEPARTMENT_KEYWORDS = ["engineering", "sales", "marketing", "hr", "finance", "operations"]
+PENDING_KEYWORDS = ["pending", "not completed"]
+COMPLETED_KEYWORDS = ["completed", "done"]
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every (start, keyword) occurrence, overlaps included"""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for keyword in dict.fromkeys(keywords):
+            self._add(keyword)
+        self._link()
+
+    def _add(self, keyword: str):
+        state = 0
+        for char in keyword:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append(keyword)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find_all(self, text: str) -> list:
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for keyword in self.output[state]:
+                matches.append((index - len(keyword) + 1, keyword))
+        return matches
+
+
+_AUTOMATON = KeywordAutomaton(
+    ONBOARDING_KEYWORDS
+    + HR_KEYWORDS
+    + [kw for _, keywords in POLICY_TOPIC_KEYWORDS for kw in keywords]
+    + SEARCH_KEYWORDS + DEPARTMENT_KEYWORDS + PENDING_KEYWORDS + COMPLETED_KEYWORDS
+)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+@lru_cache(maxsize=2048)
+def classify_message(message: str) -> dict:
+    """
+    Classify a message in one scan. Treat the returned dict as read-only: it
+    is shared by every caller asking about the same message.
+    """
     msg = message.lower()
-    
-    # Search for specific employee
-    if "search for" in msg or "find employee" in msg or "show employee" in msg:
-        # Try to extract name or email
-        parts = msg.split("search for")
-        if len(parts) > 1:
-            search_term = parts[1].strip().split()[0]
-            return {"type": "search_employee", "query": search_term}
-    
+    present = set()
+    whole_words = set()
+    first_at = {}
+    for start, keyword in _AUTOMATON.find_all(msg):
+        present.add(keyword)
+        first_at.setdefault(keyword, start)
+        end = start + len(keyword)
+        if (start == 0 or not _is_word_char(msg[start - 1])) and (end == len(msg) or not _is_word_char(msg[end])):
+            whole_words.add(keyword)
+
+    policy_scores = {}
+    for topic, keywords in POLICY_TOPIC_KEYWORDS:
+        hits = sum(1 for kw in keywords if kw in whole_words)
+        if hits:
+            policy_scores[topic] = hits
+    policy_topic = next(iter(policy_scores), DEFAULT_POLICY_TOPIC)
+
+    return {
+        "onboarding": any(kw in present for kw in ONBOARDING_KEYWORDS),
+        "hr": any(kw in present for kw in HR_KEYWORDS),
+        "policy_topic": policy_topic,
+        "policy_scores": policy_scores,
+        "search": _search_intent(msg, present, first_at)
+    }
+
+
+def _search_intent(msg: str, present: set, first_at: dict) -> dict:
+    # Search for specific employee (a name/email is only extracted after "search for")
+    if "search for" in present:
+        words = msg[first_at["search for"] + len("search for"):].strip().split()
+        if words:
+            return {"type": "search_employee", "query": words[0]}
+
     # Department query
-    if "department" in msg:
-        for dept in ["engineering", "sales", "marketing", "hr", "finance", "operations"]:
-            if dept in msg:
+    if "department" in present:
+        for dept in DEPARTMENT_KEYWORDS:
+            if dept in present:
                 return {"type": "department_stats", "department": dept.capitalize()}
-    
+
     # Status query
-    if "pending" in msg or "not completed" in msg:
+    if any(kw in present for kw in PENDING_KEYWORDS):
         return {"type": "status_filter", "status": "pending"}
-    elif "completed" in msg or "done" in msg:
+    elif any(kw in present for kw in COMPLETED_KEYWORDS):
         return {"type": "status_filter", "status": "completed"}
-    
-    return {"type": "general"}
\ No newline at end of file
+
+    return {"type": "general"}
+
+
+def is_onboarding_related(message: str) -> bool:
+    return classify_message(message)["onboarding"]
+
+def is_hr_query(message: str) -> bool:
+    """Detect if query is from HR/admin perspective"""
+    return classify_message(message)["hr"]
+
+def extract_search_query(message: str) -> dict:
+    """Extract actionable queries from message"""
+    return classify_message(message)["search"]
+
+def detect_policy_topic(user_input: str) -> str:
+    return classify_message(user_input)["policy_topic"]
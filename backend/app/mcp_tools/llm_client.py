@@ -0,0 +1,165 @@
+"""
+Async client for the local Ollama server used by SUPA chat.
+
+A single pooled httpx.AsyncClient is shared by every request so chats waiting
+on the model keep their keep-alive connections and never block the event loop.
+Callers pass the stable SUPA preamble as `system` and every call sends
+`keep_alive`, so the model stays loaded and Ollama can reuse the KV cache of
+that shared prefix instead of re-evaluating it on each request.
+"""
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger("llm_client")
+
+# Token counts and timings Ollama reports on the final response chunk
+USAGE_FIELDS = (
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+    "load_duration",
+    "total_duration"
+)
+
+
+class OllamaClient:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        max_connections: int,
+        max_keepalive: int,
+        keep_alive: Optional[str] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=60.0
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled client lazily so it binds to the running event loop"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits
+            )
+        return self._client
+
+    def _payload(self, model: str, prompt: str, stream: bool, options: Optional[dict], system: Optional[str]) -> dict:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options or {}
+        }
+        if system:
+            payload["system"] = system
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    @staticmethod
+    def _collect_usage(body: dict, usage: Optional[dict]):
+        if usage is None:
+            return
+        for field in USAGE_FIELDS:
+            if field in body:
+                usage[field] = body[field]
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        timeout: Optional[float] = None,
+        options: Optional[dict] = None,
+        system: Optional[str] = None,
+        usage: Optional[dict] = None
+    ) -> str:
+        """Run a non-streaming completion and return the response text; token counts go into `usage`"""
+        payload = self._payload(model, prompt, False, options, system)
+        response = await self._get_client().post(
+            "/api/generate",
+            json=payload,
+            timeout=timeout if timeout is not None else self.timeout
+        )
+        response.raise_for_status()
+        body = response.json()
+        self._collect_usage(body, usage)
+        return body.get("response", "").strip()
+
+    async def stream_generate(
+        self,
+        model: str,
+        prompt: str,
+        timeout: Optional[float] = None,
+        options: Optional[dict] = None,
+        system: Optional[str] = None,
+        usage: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """Yield response fragments from Ollama's NDJSON stream as they arrive"""
+        payload = self._payload(model, prompt, True, options, system)
+        async with self._get_client().stream(
+            "POST",
+            "/api/generate",
+            json=payload,
+            timeout=timeout if timeout is not None else self.timeout
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    self._collect_usage(chunk, usage)
+                    break
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+ollama_client = OllamaClient(
+    base_url=settings.OLLAMA_BASE_URL,
+    timeout=settings.OLLAMA_TIMEOUT_SECONDS,
+    max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+    max_keepalive=settings.OLLAMA_MAX_KEEPALIVE,
+    keep_alive=settings.OLLAMA_KEEP_ALIVE
+)
+
+
+async def run_until_disconnected(request, coro, poll_interval: float = 0.5):
+    """
+    Await `coro` while watching the HTTP client. If the client disconnects
+    first, the pending LLM call is cancelled and None is returned.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling LLM call")
+                task.cancel()
+                return None
+    finally:
+        if not task.done():
+            task.cancel()
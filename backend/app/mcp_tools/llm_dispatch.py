@@ -0,0 +1,303 @@
+"""
+Model dispatch strategies for SUPA's local LLMs.
+
+- sequential: try each model in order, moving on only after a failure (original behaviour)
+- hedged: start the next model if the current one hasn't answered within the hedge delay
+- race: start every model at once and keep the first acceptable answer
+
+Per-model latency is tracked so the hedge delay follows the primary model's
+recent p90 instead of a fixed guess. Each model also has a circuit breaker:
+while a model's breaker is open it is skipped, so requests go straight to a
+healthy model or fail fast instead of waiting out timeouts. A call whose
+caller set a deadline below min_breaker_timeout is not judged on a timeout
+(the deadline was tight, the model isn't necessarily down) and its latency
+is not sampled, since only its fast answers would ever be recorded.
+
+Ollama's prompt_eval_count is recorded next to an estimate of the full
+prompt size, so /chatbot/llm/stats shows how much of each prompt the model
+actually evaluated versus reused from its cached system-prompt prefix.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import httpx
+
+from app.config import settings
+from app.mcp_tools.llm_client import ollama_client
+from app.mcp_tools.policy_index import estimate_tokens
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.timing import percentile
+
+logger = logging.getLogger("llm_dispatch")
+
+STRATEGIES = ("sequential", "hedged", "race")
+
+
+class ModelStats:
+    """Rolling latency window and outcome counters for one model"""
+
+    def __init__(self, window: int = 100):
+        self.latencies = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.last_error: Optional[str] = None
+        self.usage_calls = 0
+        self.prompt_tokens_est = 0
+        self.prompt_eval_tokens = 0
+        self.eval_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, seconds: float, sample: bool = True):
+        with self._lock:
+            self.successes += 1
+            if sample:
+                self.latencies.append(seconds)
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+
+    def record_cancel(self):
+        with self._lock:
+            self.cancelled += 1
+
+    def record_usage(self, usage: dict, prompt_tokens_est: int):
+        """Token counts from a finished call; `prompt_tokens_est` is the size of system + prompt"""
+        if "eval_count" not in usage:
+            return
+        with self._lock:
+            self.usage_calls += 1
+            self.prompt_tokens_est += prompt_tokens_est
+            # Ollama leaves prompt_eval_count out when the whole prompt came from cache
+            self.prompt_eval_tokens += usage.get("prompt_eval_count", 0)
+            self.eval_tokens += usage["eval_count"]
+
+    def usage_snapshot(self) -> dict:
+        with self._lock:
+            calls = self.usage_calls
+            if not calls:
+                return {"calls": 0}
+            return {
+                "calls": calls,
+                "avg_prompt_tokens_est": round(self.prompt_tokens_est / calls, 1),
+                "avg_prompt_eval_tokens": round(self.prompt_eval_tokens / calls, 1),
+                "avg_eval_tokens": round(self.eval_tokens / calls, 1),
+                "prefix_reuse_ratio": round(max(0.0, 1 - self.prompt_eval_tokens / max(1, self.prompt_tokens_est)), 3)
+            }
+
+    def percentile_ms(self, pct: float) -> Optional[float]:
+        with self._lock:
+            value = percentile(list(self.latencies), pct)
+        return round(value * 1000, 1) if value is not None else None
+
+    def snapshot(self) -> dict:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "cancelled": self.cancelled,
+            "samples": len(self.latencies),
+            "p50_ms": self.percentile_ms(50),
+            "p90_ms": self.percentile_ms(90),
+            "p99_ms": self.percentile_ms(99),
+            "last_error": self.last_error,
+            "usage": self.usage_snapshot()
+        }
+
+
+class LLMDispatcher:
+    def __init__(
+        self,
+        client=ollama_client,
+        strategy: str = "sequential",
+        hedge_delay_ms: float = 4000,
+        min_hedge_delay_ms: float = 250,
+        adaptive_min_samples: int = 10,
+        breaker_options: Optional[dict] = None,
+        min_breaker_timeout: float = 0.0
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown LLM dispatch strategy '{strategy}', expected one of {STRATEGIES}")
+        self.client = client
+        self.strategy = strategy
+        self.hedge_delay_ms = hedge_delay_ms
+        self.min_hedge_delay_ms = min_hedge_delay_ms
+        self.adaptive_min_samples = adaptive_min_samples
+        self.models: dict = {}
+        self.breaker_options = breaker_options or {}
+        self.breakers: dict = {}
+        self.min_breaker_timeout = min_breaker_timeout
+
+    def model_stats(self, model: str) -> ModelStats:
+        if model not in self.models:
+            self.models[model] = ModelStats()
+        return self.models[model]
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker(model, **self.breaker_options)
+        return self.breakers[model]
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for `model` before hedging: its recent p90, capped by the configured delay"""
+        stats = self.model_stats(model)
+        delay_ms = self.hedge_delay_ms
+        if len(stats.latencies) >= self.adaptive_min_samples:
+            delay_ms = min(delay_ms, max(self.min_hedge_delay_ms, stats.percentile_ms(90)))
+        return delay_ms / 1000
+
+    async def _attempt(
+        self,
+        model: str,
+        prompt: str,
+        timeout: Optional[float],
+        options: Optional[dict],
+        system: Optional[str],
+        usage: dict
+    ) -> str:
+        stats = self.model_stats(model)
+        breaker = self.breaker(model)
+        short_deadline = timeout is not None and timeout < self.min_breaker_timeout
+        started = time.monotonic()
+        try:
+            text = await self.client.generate(model, prompt, timeout=timeout, options=options, system=system, usage=usage)
+        except asyncio.CancelledError:
+            stats.record_cancel()
+            breaker.record_cancel()
+            raise
+        except httpx.TimeoutException as e:
+            if short_deadline:
+                # The caller's deadline ran out, not necessarily the model
+                stats.record_cancel()
+                breaker.record_cancel()
+            else:
+                stats.record_failure(f"{type(e).__name__}: {e}")
+                breaker.record_failure()
+            raise
+        except Exception as e:
+            stats.record_failure(f"{type(e).__name__}: {e}")
+            breaker.record_failure()
+            raise
+        stats.record_success(time.monotonic() - started, sample=not short_deadline)
+        stats.record_usage(usage, estimate_tokens((system or "") + prompt))
+        breaker.record_success()
+        return text
+
+    async def dispatch(
+        self,
+        prompt: str,
+        models: list,
+        accept: Callable[[str], bool],
+        timeout: Optional[float] = None,
+        options: Optional[dict] = None,
+        strategy: Optional[str] = None,
+        system: Optional[str] = None,
+        usage: Optional[dict] = None
+    ) -> Optional[tuple]:
+        """
+        Return (text, model) for the first acceptable answer, or None if every
+        model failed. The winning call's token counts are copied into `usage`.
+        """
+        strategy = strategy or self.strategy
+        queue = list(models)
+        pending = {}
+        usages = {}
+
+        def launch() -> bool:
+            """Start the next model whose breaker lets calls through"""
+            while queue:
+                model = queue.pop(0)
+                if not self.breaker(model).allow():
+                    logger.info(f"⛔ Skipping {model}: circuit open")
+                    continue
+                usages[model] = {}
+                task = asyncio.ensure_future(self._attempt(model, prompt, timeout, options, system, usages[model]))
+                pending[task] = model
+                return True
+            return False
+
+        if not launch():
+            logger.warning("⛔ All model circuits are open, failing fast")
+            return None
+        if strategy == "race":
+            while launch():
+                pass
+
+        try:
+            while pending:
+                wait_for = None
+                if strategy == "hedged" and queue:
+                    wait_for = self.hedge_delay(pending[next(iter(pending))])
+                done, _ = await asyncio.wait(set(pending), timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"⏱️ Hedging: starting {queue[0]} after {wait_for:.2f}s")
+                    if not launch():
+                        # Remaining models are all tripped: keep waiting on the current call
+                        queue.clear()
+                    continue
+
+                for task in done:
+                    model = pending.pop(task)
+                    try:
+                        text = task.result()
+                    except httpx.TimeoutException:
+                        logger.warning(f"❌ {model} timed out")
+                        continue
+                    except Exception as e:
+                        logger.error(f"❌ {model} failed: {e}")
+                        continue
+                    if accept(text):
+                        if usage is not None:
+                            usage.update(usages[model])
+                        return text, model
+                    logger.warning(f"⚠️ {model} returned an unusable answer")
+
+                if not pending and queue:
+                    launch()
+            return None
+        finally:
+            # Losing or abandoned calls are cancelled so Ollama can drop them
+            for task in pending:
+                task.cancel()
+
+    def health(self, models: list = ()) -> dict:
+        names = list(dict.fromkeys(list(models) + list(self.breakers)))
+        breakers = {model: self.breaker(model).snapshot() for model in names}
+        available = [model for model in names if self.breaker(model).is_available()]
+        if len(available) == len(names):
+            status = "ok"
+        elif available:
+            status = "degraded"
+        else:
+            status = "down"
+        return {"status": status, "available_models": available, "breakers": breakers}
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "hedge_delay_ms": self.hedge_delay_ms,
+            "models": {
+                model: {**stats.snapshot(), "current_hedge_delay_ms": round(self.hedge_delay(model) * 1000, 1)}
+                for model, stats in self.models.items()
+            }
+        }
+
+
+BREAKER_OPTIONS = {
+    "failure_rate_threshold": settings.LLM_BREAKER_FAILURE_RATE,
+    "min_calls": settings.LLM_BREAKER_MIN_CALLS,
+    "window": settings.LLM_BREAKER_WINDOW,
+    "cooldown_seconds": settings.LLM_BREAKER_COOLDOWN_SECONDS
+}
+
+llm_dispatcher = LLMDispatcher(
+    strategy=settings.LLM_DISPATCH_STRATEGY,
+    hedge_delay_ms=settings.LLM_HEDGE_DELAY_MS,
+    breaker_options=BREAKER_OPTIONS,
+    min_breaker_timeout=settings.LLM_BREAKER_MIN_TIMEOUT_SECONDS
+)
@@ -0,0 +1,157 @@
+"""
+Onboarding event timeline and time-to-complete analytics.
+
+Tasks carry no timestamps, so the routes that assign and complete work also
+append a row to onboarding_events (task assigned, module completed, task
+completed, status changed), with the writer's session before it commits.
+Rows are never updated or deleted.
+
+Completion events store their duration at write time: the time since the
+employee's first assignment of that task (or, for a status change to
+"completed", since their first event at all). Percentiles are then one
+window query per grouping over completions inside the reporting window,
+read through the (event_type, occurred_at) index, so a dashboard view never
+scans older history however many years of hires the table holds.
+
+Employees onboarded before the log existed have no assignment event; their
+completions are logged without a duration and left out of the percentiles.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, case, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import session_scope
+from app.models import OnboardingEvent
+from app.utils.request_memo import request_memoized
+
+TASK_ASSIGNED = "task_assigned"
+MODULE_COMPLETED = "module_completed"
+TASK_COMPLETED = "task_completed"
+STATUS_CHANGED = "status_changed"
+
+PERCENTILES = (50, 75, 90)
+
+
+def _since_first(db: Session, employee_id: str, now: datetime, task_title: str = None) -> Optional[int]:
+    """Seconds since the employee's first assignment (of `task_title`, or of anything)"""
+    query = db.query(func.min(OnboardingEvent.occurred_at)).filter(OnboardingEvent.employee_id == employee_id)
+    if task_title is not None:
+        query = query.filter(OnboardingEvent.task_title == task_title, OnboardingEvent.event_type == TASK_ASSIGNED)
+    started = query.scalar()
+    if started is None:
+        return None
+    return max(int((now - started).total_seconds()), 0)
+
+
+def _append(db: Session, event_type: str, employee_id: str, department: Optional[str], **fields):
+    db.add(OnboardingEvent(event_type=event_type, employee_id=employee_id, department=department, **fields))
+
+
+# 🔹 Write hooks — call with the writer's session before it commits
+
+def record_task_assigned(db: Session, employee_id: str, department: Optional[str], task_title: str):
+    _append(db, TASK_ASSIGNED, employee_id, department, task_title=task_title, occurred_at=datetime.utcnow())
+
+
+def record_module_completed(db: Session, employee_id: str, department: Optional[str], task_title: str, module_key: str):
+    now = datetime.utcnow()
+    _append(
+        db, MODULE_COMPLETED, employee_id, department, task_title=task_title, module_key=module_key,
+        duration_seconds=_since_first(db, employee_id, now, task_title), occurred_at=now
+    )
+
+
+def record_task_completed(db: Session, employee_id: str, department: Optional[str], task_title: str):
+    """Call when a not-yet-completed task is marked completed"""
+    now = datetime.utcnow()
+    _append(
+        db, TASK_COMPLETED, employee_id, department, task_title=task_title,
+        duration_seconds=_since_first(db, employee_id, now, task_title), occurred_at=now
+    )
+
+
+def record_status_change(db: Session, employee_id: str, department: Optional[str], old_status: Optional[str], new_status: Optional[str]):
+    if old_status == new_status:
+        return
+    now = datetime.utcnow()
+    duration = _since_first(db, employee_id, now) if new_status == "completed" else None
+    _append(db, STATUS_CHANGED, employee_id, department, status=new_status, duration_seconds=duration, occurred_at=now)
+
+
+# 🔹 Reads
+
+def _window_start(days: Optional[int]) -> datetime:
+    return datetime.utcnow() - timedelta(days=days or settings.ONBOARDING_EVENTS_WINDOW_DAYS)
+
+
+def _days(seconds) -> Optional[float]:
+    return round(float(seconds) / 86400, 2) if seconds is not None else None
+
+
+def _percentiles(db: Session, event_type: str, since: datetime, group_col=None, status: str = None) -> dict:
+    """Nearest-rank percentiles of duration_seconds per `group_col` (one "" group when None)"""
+    event = OnboardingEvent.__table__.c
+    partition = [group_col] if group_col is not None else None
+    conditions = [event.event_type == event_type, event.occurred_at >= since, event.duration_seconds.isnot(None)]
+    if status is not None:
+        conditions.append(event.status == status)
+    # cume_dist(): share of the group at or below this duration (one sort per query)
+    ranked = select(
+        (group_col if group_col is not None else event.event_type).label("grp"),
+        event.duration_seconds.label("duration"),
+        func.cume_dist().over(partition_by=partition, order_by=event.duration_seconds).label("share")
+    ).where(*conditions).subquery()
+
+    columns = [func.count(), func.avg(ranked.c.duration)] + [
+        # Smallest duration reaching p% of the group (epsilon absorbs float rounding)
+        func.min(case((ranked.c.share >= p / 100 - 1e-9, ranked.c.duration)))
+        for p in PERCENTILES
+    ]
+    if group_col is not None:
+        rows = db.execute(select(ranked.c.grp, *columns).group_by(ranked.c.grp)).all()
+    else:
+        rows = [("", *db.execute(select(*columns)).one())]
+
+    stats = {}
+    for group, count, average, *values in rows:
+        if not count:
+            continue
+        stats[group or ""] = {
+            "completed": count,
+            "avg_days": _days(average),
+            **{f"p{p}_days": _days(value) for p, value in zip(PERCENTILES, values)}
+        }
+    return stats
+
+
+@request_memoized
+def get_time_to_complete(days: int = None, db: Session = None) -> dict:
+    """Percentile days to complete each task, and to finish onboarding overall and per department"""
+    since = _window_start(days)
+    with session_scope(db) as db:
+        tasks = _percentiles(db, TASK_COMPLETED, since, OnboardingEvent.__table__.c.task_title)
+        departments = _percentiles(db, STATUS_CHANGED, since, OnboardingEvent.__table__.c.department, status="completed")
+        overall = _percentiles(db, STATUS_CHANGED, since, status="completed").get("")
+    return {
+        "window_days": days or settings.ONBOARDING_EVENTS_WINDOW_DAYS,
+        "since": since.isoformat(),
+        "onboarding": overall,
+        "tasks": tasks,
+        "departments": departments
+    }
+
+
+@request_memoized
+def get_average_days_to_complete(db: Session = None) -> Optional[float]:
+    """Mean days from first assignment to onboarding completion in the window, None without data"""
+    with session_scope(db) as db:
+        average = db.query(func.avg(OnboardingEvent.duration_seconds)).filter(
+            OnboardingEvent.event_type == STATUS_CHANGED,
+            OnboardingEvent.occurred_at >= _window_start(None),
+            OnboardingEvent.status == "completed",
+            OnboardingEvent.duration_seconds.isnot(None)
+        ).scalar()
+    return _days(average)
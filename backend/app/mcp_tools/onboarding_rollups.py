@@ -0,0 +1,255 @@
+"""
+Daily onboarding rollups for cohort and time-bucketed HR charts.
+
+refresh_rollups() folds each day of onboarding_events into onboarding_rollups:
+per department, the employees who joined (first task assigned) that day and
+the onboarding, task and module completions that happened that day. Every
+count also carries the cohort (the employees' joining day) and, for
+completions, the whole days since assignment, so both views below come
+from the same rows:
+
+- by="join":     "completion rate by joining week" (group on cohort_day)
+- by="activity": "median days in Training by month" (group on day)
+
+Medians are read off the per-day duration histograms, to the whole day.
+A day is recomputed from scratch each time, so refreshing is idempotent;
+a run starts at the last day already rolled up (which may have been
+partial) and goes through today. Refreshes must not overlap: a day's rows
+are deleted and re-inserted, so two runs on the same day can both insert
+and double every count. Run scripts/refresh_onboarding_rollups.py from cron
+(one runner), or set ONBOARDING_ROLLUP_INTERVAL_SECONDS on exactly one
+worker to have RollupScheduler repeat it in the background; it is off by
+default because every uvicorn worker would start its own.
+"""
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import session_scope
+from app.mcp_tools.onboarding_events import TASK_ASSIGNED, MODULE_COMPLETED, TASK_COMPLETED, STATUS_CHANGED
+from app.models import OnboardingEvent, OnboardingRollup
+from app.utils.request_memo import request_memoized
+
+logger = logging.getLogger("onboarding_rollups")
+
+# Rollup metrics
+JOINED = "joined"
+ONBOARDING_COMPLETED = "onboarding_completed"
+TASKS_COMPLETED = "task_completed"
+MODULES_COMPLETED = "module_completed"
+
+
+def _first_assignments(db: Session, employee_ids: set) -> dict:
+    """employee_id -> when their first task was assigned (their joining time)"""
+    joined_at = {}
+    ids = sorted(employee_ids)
+    for start in range(0, len(ids), 500):
+        rows = db.query(OnboardingEvent.employee_id, func.min(OnboardingEvent.occurred_at)).filter(
+            OnboardingEvent.employee_id.in_(ids[start:start + 500]),
+            OnboardingEvent.event_type == TASK_ASSIGNED
+        ).group_by(OnboardingEvent.employee_id).all()
+        joined_at.update(rows)
+    return joined_at
+
+
+def _day_counts(db: Session, day: date) -> Counter:
+    """(metric, department, task_title, cohort_day, duration_days) -> count for one day"""
+    start = datetime.combine(day, datetime.min.time())
+    events = db.query(
+        OnboardingEvent.event_type,
+        OnboardingEvent.employee_id,
+        OnboardingEvent.department,
+        OnboardingEvent.task_title,
+        OnboardingEvent.status,
+        OnboardingEvent.duration_seconds
+    ).filter(
+        OnboardingEvent.event_type.in_([TASK_ASSIGNED, MODULE_COMPLETED, TASK_COMPLETED, STATUS_CHANGED]),
+        OnboardingEvent.occurred_at >= start,
+        OnboardingEvent.occurred_at < start + timedelta(days=1)
+    ).all()
+    joined_at = _first_assignments(db, {event.employee_id for event in events})
+
+    counts = Counter()
+    joined = set()
+    for event_type, employee_id, department, task_title, status, duration in events:
+        first = joined_at.get(employee_id)
+        cohort = first.date() if first else None
+        department = department or ""
+        if event_type == TASK_ASSIGNED:
+            if cohort == day and employee_id not in joined:
+                joined.add(employee_id)
+                counts[(JOINED, department, "", cohort, None)] += 1
+            continue
+        if event_type == STATUS_CHANGED:
+            if status != "completed":
+                continue
+            metric, task_title = ONBOARDING_COMPLETED, ""
+        else:
+            metric = TASKS_COMPLETED if event_type == TASK_COMPLETED else MODULES_COMPLETED
+        duration_days = duration // 86400 if duration is not None else None
+        counts[(metric, department, task_title or "", cohort, duration_days)] += 1
+    return counts
+
+
+def refresh_rollups(db: Session, since: date = None) -> dict:
+    """Recompute the rollups of every day from `since` (default: the last day rolled up) through today"""
+    today = datetime.utcnow().date()
+    if since is None:
+        since = db.query(func.max(OnboardingRollup.day)).scalar()
+    if since is None:
+        first_event = db.query(func.min(OnboardingEvent.occurred_at)).scalar()
+        if first_event is None:
+            return {"days": 0, "rows": 0}
+        since = first_event.date()
+
+    day, days, rows = since, 0, 0
+    while day <= today:
+        counts = _day_counts(db, day)
+        db.query(OnboardingRollup).filter(OnboardingRollup.day == day).delete(synchronize_session=False)
+        db.add_all([
+            OnboardingRollup(
+                day=day, department=department, metric=metric, task_title=task_title,
+                cohort_day=cohort_day, duration_days=duration_days, count=count
+            )
+            for (metric, department, task_title, cohort_day, duration_days), count in counts.items()
+        ])
+        db.commit()
+        days += 1
+        rows += len(counts)
+        day += timedelta(days=1)
+    return {"from": since.isoformat(), "through": today.isoformat(), "days": days, "rows": rows}
+
+
+def refresh_onboarding_rollups(since: date = None) -> dict:
+    with session_scope() as db:
+        return refresh_rollups(db, since)
+
+
+# 🔹 Reads
+
+def _period(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _median(histogram: Counter) -> Optional[int]:
+    total = sum(histogram.values())
+    if not total:
+        return None
+    seen = 0
+    for days in sorted(histogram):
+        seen += histogram[days]
+        if seen * 2 >= total:
+            return days
+
+
+@request_memoized
+def get_cohorts(start: date, end: date, bucket: str = "week", by: str = "join", department: str = None, db: Session = None) -> dict:
+    """Onboarding counts and median days per period, grouped by joining date (by="join") or by when things happened"""
+    period_col = OnboardingRollup.cohort_day if by == "join" else OnboardingRollup.day
+    with session_scope(db) as db:
+        query = db.query(
+            period_col,
+            OnboardingRollup.metric,
+            OnboardingRollup.task_title,
+            OnboardingRollup.duration_days,
+            func.sum(OnboardingRollup.count)
+        ).filter(period_col >= start, period_col <= end)
+        if department:
+            query = query.filter(OnboardingRollup.department == department)
+        rows = query.group_by(
+            period_col, OnboardingRollup.metric, OnboardingRollup.task_title, OnboardingRollup.duration_days
+        ).all()
+        rolled_up_through = db.query(func.max(OnboardingRollup.day)).scalar()
+
+    # Per period: metric totals, completions per task, and duration histograms for the medians
+    periods = defaultdict(lambda: {
+        "counts": Counter(), "task_counts": Counter(), "onboarding": Counter(), "tasks": defaultdict(Counter)
+    })
+    for day, metric, task_title, duration_days, count in rows:
+        period = periods[_period(day, bucket)]
+        count = int(count)
+        period["counts"][metric] += count
+        if metric == TASKS_COMPLETED:
+            period["task_counts"][task_title] += count
+        if duration_days is None:
+            continue
+        if metric == ONBOARDING_COMPLETED:
+            period["onboarding"][duration_days] += count
+        elif metric == TASKS_COMPLETED:
+            period["tasks"][task_title][duration_days] += count
+
+    result = []
+    for period_start in sorted(periods):
+        period = periods[period_start]
+        counts = period["counts"]
+        entry = {
+            "period": period_start.isoformat(),
+            "joined": counts[JOINED],
+            "onboarding_completed": counts[ONBOARDING_COMPLETED],
+            "median_days_to_onboard": _median(period["onboarding"]),
+            "modules_completed": counts[MODULES_COMPLETED],
+            "tasks": {
+                title: {"completed": completed, "median_days": _median(period["tasks"][title])}
+                for title, completed in sorted(period["task_counts"].items())
+            }
+        }
+        if by == "join":
+            joined = counts[JOINED]
+            entry["completion_rate"] = round(counts[ONBOARDING_COMPLETED] / joined * 100, 1) if joined else None
+        result.append(entry)
+
+    return {
+        "by": by,
+        "bucket": bucket,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "department": department,
+        "rolled_up_through": rolled_up_through.isoformat() if rolled_up_through else None,
+        "periods": result
+    }
+
+
+# 🔹 Background refresh
+
+class RollupScheduler:
+    def __init__(self, interval_seconds: int):
+        self.interval_seconds = interval_seconds
+        self.last_run = None
+        self.last_result = None
+        self._task = None
+
+    def start(self):
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                self.last_result = await asyncio.to_thread(refresh_onboarding_rollups)
+                self.last_run = datetime.utcnow()
+                logger.info(f"🗓️ Onboarding rollups refreshed: {self.last_result}")
+            except Exception as e:
+                logger.warning(f"⚠️ Onboarding rollup refresh failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+
+rollup_scheduler = RollupScheduler(settings.ONBOARDING_ROLLUP_INTERVAL_SECONDS)
@@ -0,0 +1,318 @@
+"""
+Incrementally maintained onboarding analytics.
+
+The onboarding_stats table holds counters for the HR views: employees per
+status (overall and per department), employees assigned/having completed
+each onboarding task (overall) and completed per department, and the feedback rating
+histogram. Every write that changes one of them calls a record_* hook with
+its own session *before* committing, so the counter update lands in the same
+transaction as the change. Each hook is a single `value = value + delta`
+UPDATE, which is safe under concurrent writers.
+
+HR reads (task_tracker's analytics, summary, department and feedback
+functions) then load the whole table, whose size depends on the number of
+departments and tasks, not on headcount. Until the snapshot has been built,
+or with ONBOARDING_STATS_SNAPSHOT off, they fall back to live aggregate
+queries.
+
+rebuild() recomputes every counter from the raw tables; reconcile() does the
+same and reports where the snapshot had drifted (writes made outside the
+app, e.g. by scripts). See scripts/reconcile_onboarding_stats.py.
+"""
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, case, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import session_scope
+from app.models import Employee, Task, Feedback, OnboardingStat
+from app.utils.request_memo import request_memoized
+
+logger = logging.getLogger("onboarding_stats")
+
+# Main onboarding tasks every employee is assigned (Pre-Onboarding is handled by admin)
+ONBOARDING_TASKS = ["Personal Details", "Joining Day", "Training", "Department Introduction", "Feedback"]
+
+# Counter scopes: (scope, department, key) -> value
+STATUS = "status"                                        # ("status", "", status)
+DEPARTMENT_STATUS = "department_status"                  # ("department_status", dept, status)
+TASK_ASSIGNED = "task_assigned"                          # ("task_assigned", "", title)
+TASK_COMPLETED = "task_completed"                        # ("task_completed", "", title)
+DEPARTMENT_TASK_COMPLETED = "department_task_completed"  # ("department_task_completed", dept, title)
+RATING = "rating"                                        # ("rating", "", "1".."5")
+META = "meta"                                            # ("meta", "", "built") -> unix time of last rebuild
+
+
+def _bump(db: Session, scope: str, key: str, delta: int, department: str = ""):
+    if not delta:
+        return
+    stat = OnboardingStat.__table__.c
+    increment = (
+        update(OnboardingStat)
+        .where(stat.scope == scope, stat.department == department, stat.key == key)
+        .values(value=stat.value + delta, updated_at=datetime.utcnow())
+    )
+    if db.execute(increment).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(OnboardingStat(scope=scope, department=department, key=key, value=delta))
+    except IntegrityError:
+        # Another writer created the row first
+        db.execute(increment)
+
+
+# 🔹 Write hooks — call with the writer's session before it commits
+
+def record_employee(db: Session, department: Optional[str], status: Optional[str], delta: int = 1):
+    _bump(db, STATUS, status or "", delta)
+    if department:
+        _bump(db, DEPARTMENT_STATUS, status or "", delta, department)
+
+
+def record_status_change(db: Session, department: Optional[str], old_status: Optional[str], new_status: Optional[str]):
+    if old_status == new_status:
+        return
+    record_employee(db, department, old_status, -1)
+    record_employee(db, department, new_status, 1)
+
+
+def _has_other(db: Session, task: Task, completed: bool = False) -> bool:
+    """Whether the employee already holds (or has completed) another task with this title"""
+    query = db.query(Task.id).filter(
+        Task.assigned_to_id == task.assigned_to_id,
+        Task.title == task.title,
+        Task.id != task.id
+    )
+    if completed:
+        query = query.filter(Task.status == "completed")
+    return query.first() is not None
+
+
+def record_task(db: Session, department: Optional[str], task: Task):
+    """A task was assigned (counters count employees per title, so a duplicate assignment doesn't)"""
+    if task.title not in ONBOARDING_TASKS:
+        return
+    db.flush()
+    if not _has_other(db, task):
+        _bump(db, TASK_ASSIGNED, task.title, 1)
+    if task.status == "completed":
+        record_task_completed(db, department, task)
+
+
+def record_task_completed(db: Session, department: Optional[str], task: Task):
+    """Call before marking a not-yet-completed task completed"""
+    if task.title not in ONBOARDING_TASKS or _has_other(db, task, completed=True):
+        return
+    _bump(db, TASK_COMPLETED, task.title, 1)
+    if department:
+        _bump(db, DEPARTMENT_TASK_COMPLETED, task.title, 1, department)
+
+
+def record_feedback(db: Session, old_rating: Optional[int], new_rating: Optional[int]):
+    """New feedback (old_rating None) or an edited rating"""
+    if old_rating == new_rating:
+        return
+    if old_rating is not None:
+        _bump(db, RATING, str(old_rating), -1)
+    if new_rating is not None:
+        _bump(db, RATING, str(new_rating), 1)
+
+
+# 🔹 Reads
+
+class OnboardingSnapshot:
+    def __init__(self, counters: dict):
+        self.counters = counters
+
+    def _get(self, scope: str, key: str, department: str = "") -> int:
+        return self.counters.get((scope, department, key), 0)
+
+    def _statuses(self, department: str = None) -> dict:
+        if department is None:
+            return {key: value for (scope, _, key), value in self.counters.items() if scope == STATUS}
+        return {key: value for (scope, dept, key), value in self.counters.items() if scope == DEPARTMENT_STATUS and dept == department}
+
+    def departments(self) -> list:
+        return sorted({
+            dept for (scope, dept, _), value in self.counters.items()
+            if scope == DEPARTMENT_STATUS and value
+        })
+
+    def onboarding_analytics(self) -> dict:
+        """Counts only; get_onboarding_analytics adds average_days_to_complete from the event log"""
+        statuses = self._statuses()
+        total_employees = sum(statuses.values())
+        completed_employees = statuses.get("completed", 0)
+        task_stats = {}
+        for task_title in ONBOARDING_TASKS:
+            assigned_count = self._get(TASK_ASSIGNED, task_title)
+            completed_count = self._get(TASK_COMPLETED, task_title)
+            task_stats[task_title] = {
+                "assigned": assigned_count,
+                "completed": completed_count,
+                "completion_rate": round((completed_count / assigned_count * 100) if assigned_count > 0 else 0, 1)
+            }
+        return {
+            "total_employees": total_employees,
+            "completed_employees": completed_employees,
+            "pending_employees": total_employees - completed_employees,
+            "completion_rate": round((completed_employees / total_employees * 100) if total_employees > 0 else 0, 1),
+            "task_statistics": task_stats
+        }
+
+    def employees_summary(self) -> dict:
+        statuses = self._statuses()
+        departments = {}
+        for department in self.departments():
+            dept_statuses = self._statuses(department)
+            total = sum(dept_statuses.values())
+            completed = dept_statuses.get("completed", 0)
+            departments[department] = {"total": total, "completed": completed, "pending": total - completed}
+        return {
+            "total": sum(statuses.values()),
+            "completed": statuses.get("completed", 0),
+            "pending": statuses.get("pending", 0),
+            "disabled": statuses.get("disabled", 0),
+            "departments": departments
+        }
+
+    def departments_stats(self, departments: tuple = None) -> dict:
+        stats = {}
+        for department in (departments if departments is not None else self.departments()):
+            dept_statuses = self._statuses(department)
+            total = sum(dept_statuses.values())
+            completed = dept_statuses.get("completed", 0)
+            task_stats = {}
+            for task_title in ONBOARDING_TASKS:
+                completed_count = self._get(DEPARTMENT_TASK_COMPLETED, task_title, department)
+                task_stats[task_title] = {
+                    "completed": completed_count,
+                    "total": total,
+                    "rate": round((completed_count / total * 100) if total > 0 else 0, 1)
+                }
+            stats[department] = {
+                "department": department,
+                "total_employees": total,
+                "completed": completed,
+                "pending": total - completed,
+                "completion_rate": round((completed / total * 100) if total > 0 else 0, 1),
+                "task_stats": task_stats
+            }
+        return stats
+
+    def feedback_summary(self) -> dict:
+        ratings = {int(key): value for (scope, _, key), value in self.counters.items() if scope == RATING and value}
+        total = sum(ratings.values())
+        if not total:
+            return {"total": 0, "average_rating": 0, "count": 0}
+        rating_dist = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+        rating_dist.update(ratings)
+        return {
+            "total": total,
+            "average_rating": round(sum(rating * count for rating, count in ratings.items()) / total, 2),
+            "count": total,
+            "rating_distribution": rating_dist
+        }
+
+
+def _stored_counters(db: Session) -> dict:
+    rows = db.query(OnboardingStat.scope, OnboardingStat.department, OnboardingStat.key, OnboardingStat.value).all()
+    return {(scope, department, key): value for scope, department, key, value in rows}
+
+
+@request_memoized
+def load_snapshot(db: Session = None) -> Optional[OnboardingSnapshot]:
+    """The current snapshot, or None when it hasn't been built (or is switched off)"""
+    if not settings.ONBOARDING_STATS_SNAPSHOT:
+        return None
+    with session_scope(db) as db:
+        counters = _stored_counters(db)
+    if (META, "", "built") not in counters:
+        return None
+    return OnboardingSnapshot(counters)
+
+
+# 🔹 Rebuild / reconcile
+
+def compute_counters(db: Session) -> dict:
+    """Every counter recomputed from employees, tasks and feedback"""
+    counters = Counter()
+    employee_rows = db.query(Employee.department, Employee.status, func.count(Employee.emp_id)).group_by(
+        Employee.department, Employee.status
+    ).all()
+    for department, status, count in employee_rows:
+        counters[(STATUS, "", status or "")] += count
+        if department:
+            counters[(DEPARTMENT_STATUS, department, status or "")] += count
+
+    # Employees holding / having completed each task (duplicate task rows count once)
+    task_rows = db.query(
+        Employee.department,
+        Task.title,
+        func.count(func.distinct(Task.assigned_to_id)),
+        func.count(func.distinct(case((Task.status == "completed", Task.assigned_to_id))))
+    ).join(Employee, Employee.emp_id == Task.assigned_to_id).filter(
+        Task.title.in_(ONBOARDING_TASKS)
+    ).group_by(Employee.department, Task.title).all()
+    for department, title, assigned, completed in task_rows:
+        counters[(TASK_ASSIGNED, "", title)] += assigned
+        counters[(TASK_COMPLETED, "", title)] += completed
+        if department:
+            counters[(DEPARTMENT_TASK_COMPLETED, department, title)] += completed
+
+    for rating, count in db.query(Feedback.rating, func.count(Feedback.id)).group_by(Feedback.rating).all():
+        counters[(RATING, "", str(rating))] += count
+    return {key: value for key, value in counters.items() if value}
+
+
+def rebuild(db: Session) -> dict:
+    """Replace the snapshot with counters recomputed from the raw tables (caller commits)"""
+    counters = compute_counters(db)
+    db.query(OnboardingStat).delete(synchronize_session=False)
+    db.add_all([
+        OnboardingStat(scope=scope, department=department, key=key, value=value)
+        for (scope, department, key), value in counters.items()
+    ])
+    db.add(OnboardingStat(scope=META, department="", key="built", value=int(time.time())))
+    db.flush()
+    return counters
+
+
+def reconcile(db: Session, fix: bool = True) -> dict:
+    """Compare the snapshot with the raw tables; with fix, rebuild it and commit"""
+    current = _stored_counters(db)
+    built = (META, "", "built") in current
+    stored = {key: value for key, value in current.items() if key[0] != META and value}
+    actual = compute_counters(db)
+    drift = [
+        {
+            "scope": scope,
+            "department": department,
+            "key": key,
+            "snapshot": stored.get((scope, department, key), 0),
+            "actual": actual.get((scope, department, key), 0)
+        }
+        for (scope, department, key) in sorted(set(stored) | set(actual))
+        if stored.get((scope, department, key), 0) != actual.get((scope, department, key), 0)
+    ]
+    if fix:
+        rebuild(db)
+        db.commit()
+    return {"built": built, "counters": len(actual), "drift": drift, "rebuilt": fix}
+
+
+def ensure_onboarding_stats():
+    """Build the snapshot on first start (existing data is counted once)"""
+    with session_scope() as db:
+        if (META, "", "built") in _stored_counters(db):
+            return
+        counters = rebuild(db)
+        db.commit()
+    logger.info(f"📊 Onboarding stats snapshot built: {len(counters)} counters")
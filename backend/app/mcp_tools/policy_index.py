@@ -0,0 +1,182 @@
+"""
+BM25 retrieval over paragraph-level chunks of the company policy files.
+
+The index is built once at startup from the policy store and rebuilt only
+when the store reloads a changed file. build_prompt asks it for the top-k
+chunks that fit a token budget instead of pasting one whole policy file,
+so questions spanning several policies get all of them and prompt size no
+longer grows with the policy corpus.
+"""
+import logging
+import math
+import re
+import threading
+from collections import Counter
+
+from app.mcp_tools.policy_store import policy_store
+
+logger = logging.getLogger("policy_index")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "our", "should", "the",
+    "to", "what", "when", "where", "which", "who", "will", "with", "you", "your", "am"
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        # Light plural folding so "leaves"/"leave" and "expenses"/"expense" meet
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap LLM token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def split_into_chunks(text: str) -> tuple:
+    """
+    Return (title, chunks) for one policy file. The first line is the title;
+    each blank-line paragraph is split into top-level bullets, and a bullet
+    ending in ':' keeps the sub-items that follow it.
+    """
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    if not lines:
+        return "", []
+    title, body = lines[0].strip(), lines[1:]
+
+    chunks = []
+    current = []
+    open_list = False
+    for line in body + [""]:
+        stripped = line.strip()
+        if not stripped:
+            if current:
+                chunks.append("\n".join(current))
+            current, open_list = [], False
+            continue
+        is_bullet = stripped.startswith("-")
+        if is_bullet and current and not (open_list and not stripped.endswith(".")):
+            chunks.append("\n".join(current))
+            current, open_list = [], False
+        current.append(stripped)
+        if stripped.endswith(":"):
+            open_list = True
+    return title, chunks
+
+
+class PolicyIndex:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.chunks: list = []
+        self.doc_freq: Counter = Counter()
+        self.avg_len = 0.0
+        self.built = False
+        self.source_version = None
+        self._lock = threading.Lock()
+
+    def build(self, documents: dict, source_version=None):
+        """Index `documents`, a mapping of policy title -> full text"""
+        chunks = []
+        for title, text in documents.items():
+            _, parts = split_into_chunks(text)
+            for position, part in enumerate(parts):
+                # Title words are indexed with every chunk so "leave" finds the whole Leave Policy
+                terms = tokenize(f"{title} {part}")
+                chunks.append({
+                    "title": title,
+                    "text": part,
+                    "position": position,
+                    "terms": Counter(terms),
+                    "length": len(terms),
+                    "tokens": estimate_tokens(part)
+                })
+
+        doc_freq = Counter()
+        for chunk in chunks:
+            doc_freq.update(chunk["terms"].keys())
+
+        with self._lock:
+            self.chunks = chunks
+            self.doc_freq = doc_freq
+            self.avg_len = (sum(c["length"] for c in chunks) / len(chunks)) if chunks else 0.0
+            self.built = True
+            self.source_version = source_version
+        logger.info(f"📚 Policy index built: {len(documents)} documents, {len(chunks)} chunks")
+
+    def _idf(self, term: str) -> float:
+        n = len(self.chunks)
+        df = self.doc_freq.get(term, 0)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 4, token_budget: int = 300) -> list:
+        """Top-k chunks by BM25 score whose combined size stays within `token_budget`"""
+        terms = set(tokenize(query))
+        if not terms or not self.chunks:
+            return []
+
+        scored = []
+        for chunk in self.chunks:
+            score = 0.0
+            for term in terms:
+                tf = chunk["terms"].get(term)
+                if not tf:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * chunk["length"] / self.avg_len)
+                score += self._idf(term) * tf * (self.k1 + 1) / (tf + norm)
+            if score > 0:
+                scored.append((score, chunk))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        results = []
+        used = 0
+        for score, chunk in scored:
+            if len(results) >= top_k:
+                break
+            if used + chunk["tokens"] > token_budget:
+                continue
+            used += chunk["tokens"]
+            results.append({
+                "title": chunk["title"],
+                "text": chunk["text"],
+                "position": chunk["position"],
+                "score": round(score, 3)
+            })
+        return results
+
+
+policy_index = PolicyIndex()
+
+
+def build_policy_index():
+    documents = policy_store.documents()
+    policy_index.build(documents, source_version=policy_store.version)
+
+
+def retrieve_policy_context(query: str, top_k: int = 4, token_budget: int = 300) -> str:
+    """Format the best-matching policy chunks for a prompt, grouped by policy in document order"""
+    policy_store.refresh()
+    if not policy_index.built or policy_index.source_version != policy_store.version:
+        build_policy_index()
+    hits = policy_index.search(query, top_k=top_k, token_budget=token_budget)
+    if not hits:
+        return "No specific policy section matched this question."
+
+    grouped = {}
+    for hit in hits:
+        grouped.setdefault(hit["title"], []).append(hit)
+    sections = []
+    for title, title_hits in grouped.items():
+        body = "\n".join(h["text"] for h in sorted(title_hits, key=lambda h: h["position"]))
+        sections.append(f"{title}:\n{body}")
+    return "\n\n".join(sections)
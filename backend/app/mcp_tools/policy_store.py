@@ -0,0 +1,106 @@
+"""
+In-memory store for the company policy files.
+
+Every policy is loaded and normalized once and served from memory. Files are
+re-read only when their mtime changes (checked at most every few seconds),
+and topic names map to files through an explicit table rather than a
+filename guess, so lookups work regardless of the files' mixed casing.
+"""
+import glob
+import logging
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger("policy_store")
+
+POLICY_DIR = os.path.join(os.path.dirname(__file__), "..", "assets", "policies")
+
+# Topic names produced by detect_policy_topic -> policy file
+TOPIC_FILES = {
+    "work hours and attendance": "Work-Hours-and-Attendance.txt",
+    "code of conduct": "code-of-conduct.txt",
+    "compensation and benefits": "Compensation-and-Benefits.txt",
+    "confidentiality and intellectual property": "Confidentiality-and-Intellectual-Property.txt",
+    "exit and transition": "Exit-and-Transition.txt",
+    "harassment and grievance redressal (posh)": "Harassment-and-Grievance-Redressal-(POSH).txt",
+    "it usage and security": "IT-Usage-amd-Security.txt",
+    "leave policy": "Leave-Policy.txt",
+    "performance and appraisal": "Performance-and-Appraisal.txt",
+    "remote work and hybrid guidelines": "Remote-Work-and-Hybrid-Guidelines.txt",
+    "travel and expense reimbursement": "Travel-and-Expense-Reimbursement.txt",
+}
+
+
+def normalize_policy_text(text: str) -> str:
+    text = text.lstrip("\ufeff").replace("\r\n", "\n").replace("\r", "\n")
+    text = "\n".join(line.rstrip() for line in text.split("\n"))
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+class PolicyStore:
+    def __init__(self, policy_dir: str = POLICY_DIR, check_interval: float = 2.0):
+        self.policy_dir = policy_dir
+        self.check_interval = check_interval
+        # filename -> {"mtime": int, "title": str, "text": str}
+        self._docs: dict = {}
+        self._last_check = 0.0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload new or modified files and drop deleted ones. Returns True if anything changed."""
+        now = time.monotonic()
+        if not force and self._docs and now - self._last_check < self.check_interval:
+            return False
+        with self._lock:
+            self._last_check = now
+            changed = False
+            seen = set()
+            for path in glob.glob(os.path.join(self.policy_dir, "*.txt")):
+                filename = os.path.basename(path)
+                seen.add(filename)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                cached = self._docs.get(filename)
+                if cached and cached["mtime"] == mtime:
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    text = normalize_policy_text(f.read())
+                title = text.split("\n", 1)[0].strip() if text else filename
+                self._docs[filename] = {"mtime": mtime, "title": title, "text": text}
+                changed = True
+                logger.info(f"📄 Loaded policy {filename}")
+            for filename in set(self._docs) - seen:
+                del self._docs[filename]
+                changed = True
+            if changed:
+                self.version += 1
+            return changed
+
+    def get(self, topic: str) -> Optional[str]:
+        """Policy text for a topic name, or None if the topic has no policy file"""
+        self.refresh()
+        filename = TOPIC_FILES.get(topic.strip().lower())
+        doc = self._docs.get(filename) if filename else None
+        return doc["text"] if doc else None
+
+    def title(self, topic: str) -> Optional[str]:
+        """Title line of a topic's policy file, or None if the topic has no policy file"""
+        self.refresh()
+        filename = TOPIC_FILES.get(topic.strip().lower())
+        doc = self._docs.get(filename) if filename else None
+        return doc["title"] if doc else None
+
+    def documents(self) -> dict:
+        """Mapping of policy title -> normalized text for every loaded policy"""
+        self.refresh()
+        return {doc["title"]: doc["text"] for _, doc in sorted(self._docs.items())}
+
+
+policy_store = PolicyStore()
@@ -0,0 +1,168 @@
+"""
+Per-conversation memory for SUPA chat.
+
+Sessions are keyed by "<employee token>:<session id>", the session id
+coming from the browser tab (sessionStorage), so two tabs or two people on
+a shared link never see each other's turns. chat_api keeps no memory for
+HR pages or tokens that aren't an employee's.
+
+Each session keeps its last few turns verbatim. Older turns are folded into
+a short rolling summary (one line per turn: the question and the first line
+of the answer), so follow-ups like "and what about PAN?" keep their context
+without another LLM call. history() renders summary + recent turns within a
+hard token budget, newest turns first to survive the cut. Sessions expire
+after an idle period and the store holds at most `max_sessions`, dropping
+the least recently used one first. max_turns=0 turns session memory off.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+from app.config import settings
+from app.mcp_tools.policy_index import estimate_tokens
+
+
+def _first_line(text: str, limit: int = 120) -> str:
+    line = next((l.strip() for l in text.strip().splitlines() if l.strip()), "")
+    line = line.lstrip("-•* ").strip()
+    return line if len(line) <= limit else line[:limit - 3].rstrip() + "..."
+
+
+def _clip_to_tokens(text: str, budget: int) -> str:
+    return text if estimate_tokens(text) <= budget else text[:max(0, budget * 4 - 3)].rstrip() + "..."
+
+
+class ChatSession:
+    def __init__(self, max_turns: int):
+        # (user message, SUPA answer) pairs, oldest first
+        self.turns: deque = deque()
+        self.max_turns = max_turns
+        self.summary: deque = deque()
+        self.last_active = time.monotonic()
+
+    def add(self, user_text: str, reply: str, summary_budget: int):
+        self.turns.append((user_text, reply))
+        while len(self.turns) > self.max_turns:
+            old_user, old_reply = self.turns.popleft()
+            self.summary.append(f"- Asked \"{_first_line(old_user, 80)}\"; SUPA: {_first_line(old_reply)}")
+        # Rolling: the oldest summary lines go first once the summary outgrows its budget
+        while len(self.summary) > 1 and estimate_tokens("\n".join(self.summary)) > summary_budget:
+            self.summary.popleft()
+        self.last_active = time.monotonic()
+
+
+class SessionStore:
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_turns: int = 4,
+        idle_ttl_seconds: float = 1800,
+        history_token_budget: int = 200,
+        summary_token_budget: int = 80
+    ):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = summary_token_budget
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    def _live(self, token: str):
+        """Return the token's session if it hasn't gone idle, dropping it otherwise"""
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        if time.monotonic() - session.last_active > self.idle_ttl_seconds:
+            del self._sessions[token]
+            self.expired += 1
+            return None
+        return session
+
+    def _purge(self):
+        now = time.monotonic()
+        for token in [t for t, s in self._sessions.items() if now - s.last_active > self.idle_ttl_seconds]:
+            del self._sessions[token]
+            self.expired += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def add_turn(self, token: str, user_text: str, reply: str):
+        if self.max_turns <= 0:
+            return
+        with self._lock:
+            session = self._live(token)
+            if session is None:
+                session = ChatSession(self.max_turns)
+                self._sessions[token] = session
+            session.add(user_text, reply, self.summary_token_budget)
+            self._sessions.move_to_end(token)
+            self._purge()
+
+    def history(self, token: str) -> str:
+        """Summary and recent turns for the prompt, never over the history token budget"""
+        with self._lock:
+            session = self._live(token)
+            if session is None:
+                return ""
+            summary = list(session.summary)
+            turns = list(session.turns)
+
+        budget = self.history_token_budget
+        recent = []
+        for user_text, reply in reversed(turns):
+            block = f"User: {user_text}\nSUPA: {reply}"
+            cost = estimate_tokens(block)
+            if cost > budget:
+                if not recent:
+                    # Always keep the last exchange, shortened to fit
+                    recent.append(_clip_to_tokens(f"User: {user_text}\nSUPA: {_first_line(reply)}", budget))
+                    budget = 0
+                break
+            recent.append(block)
+            budget -= cost
+        recent.reverse()
+
+        sections = []
+        if summary and budget > 0:
+            summary_text = _clip_to_tokens("Earlier in this conversation:\n" + "\n".join(summary), budget)
+            sections.append(summary_text)
+        sections.extend(recent)
+        return "\n".join(sections)
+
+    def clear(self, token: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(token, None) is not None
+
+    def clear_prefix(self, prefix: str) -> int:
+        """Drop every session whose key starts with `prefix` (all of one employee's tabs)"""
+        with self._lock:
+            keys = [key for key in self._sessions if key.startswith(prefix)]
+            for key in keys:
+                del self._sessions[key]
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge()
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "max_turns": self.max_turns,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "history_token_budget": self.history_token_budget,
+                "expired": self.expired,
+                "evicted": self.evicted
+            }
+
+
+session_store = SessionStore(
+    max_sessions=settings.CHAT_SESSION_MAX_SESSIONS,
+    max_turns=settings.CHAT_SESSION_MAX_TURNS,
+    idle_ttl_seconds=settings.CHAT_SESSION_IDLE_SECONDS,
+    history_token_budget=settings.CHAT_SESSION_HISTORY_TOKENS,
+    summary_token_budget=settings.CHAT_SESSION_SUMMARY_TOKENS
+)
@@ -1,50 +1,54 @@
-from sqlalchemy.orm import Session, joinedload
-from app.database import SessionLocal
-from app.database import get_db
+from sqlalchemy.orm import Session
+from app.database import session_scope
 from app.models import Employee, Task, EmployeePersonalInfo, Feedback, TrainingModule, TaskModule, TaskModuleProgress
-from sqlalchemy import func
+from sqlalchemy import func, case
+from app.utils.request_memo import request_memoized
+from app.mcp_tools.onboarding_stats import ONBOARDING_TASKS, load_snapshot
+from app.mcp_tools.onboarding_events import get_average_days_to_complete
+from app.mcp_tools.employee_search import search_employees
 import os
+from datetime import datetime
 
 # 🔹 Get employee info by token
-def get_employee_info(token: str) -> dict:
-    db: Session = SessionLocal()
-    employee = db.query(Employee).filter(Employee.uuid_token == token).first()
-    if not employee:
-        raise ValueError("Invalid token")
+@request_memoized
+def get_employee_info(token: str, db: Session = None) -> dict:
+    with session_scope(db) as db:
+        employee = db.query(Employee).filter(Employee.uuid_token == token).first()
+        if not employee:
+            raise ValueError("Invalid token")
 
-    return {
-        "emp_id": employee.emp_id,
-        "name": employee.name,
-        "email": employee.email,
-        "department": employee.department,
-        "folder": employee.folder_name
-    }
+        return {
+            "emp_id": employee.emp_id,
+            "name": employee.name,
+            "email": employee.email,
+            "department": employee.department,
+            "folder": employee.folder_name
+        }
 
 # 🔹 Get completed task titles for an employee
-def get_completed_tasks(employee_id: str) -> list:
-    db: Session = SessionLocal()
-    tasks = db.query(Task).filter(
-        Task.assigned_to_id == employee_id,
-        Task.status == "completed"
-    ).all()
-
-    return [task.title for task in tasks]
-
-def get_personal_info_by_token(token: str) -> EmployeePersonalInfo:
-    db: Session = SessionLocal()
+@request_memoized
+def get_completed_tasks(employee_id: str, db: Session = None) -> list:
+    with session_scope(db) as db:
+        tasks = db.query(Task).filter(
+            Task.assigned_to_id == employee_id,
+            Task.status == "completed"
+        ).all()
 
-    employee = db.query(Employee).filter(Employee.uuid_token == token).first()
-    if not employee:
-        raise ValueError("Invalid token")
+        return [task.title for task in tasks]
 
-    info = db.query(EmployeePersonalInfo).filter_by(employee_id=employee.emp_id).first()
-    if not info:
-        raise ValueError("Personal info not found")
+@request_memoized
+def get_personal_info_by_token(token: str, db: Session = None) -> EmployeePersonalInfo:
+    emp = get_employee_info(token, db=db)
+    with session_scope(db) as db:
+        info = db.query(EmployeePersonalInfo).filter_by(employee_id=emp["emp_id"]).first()
+        if not info:
+            raise ValueError("Personal info not found")
 
-    return info
+        return info
 
-def get_uploaded_documents_status(token: str) -> dict:
-    emp = get_employee_info(token)
+@request_memoized
+def get_uploaded_documents_status(token: str, db: Session = None) -> dict:
+    emp = get_employee_info(token, db=db)
     folder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "uploads", emp["folder"])
 
     keywords = {
@@ -66,9 +70,10 @@ def get_uploaded_documents_status(token: str) -> dict:
 
     return status
 
-def get_all_tasks_status(token: str) -> dict:
-    emp = get_employee_info(token)
-    completed = get_completed_tasks(emp["emp_id"])
+@request_memoized
+def get_all_tasks_status(token: str, db: Session = None) -> dict:
+    emp = get_employee_info(token, db=db)
+    completed = get_completed_tasks(emp["emp_id"], db=db)
     # Pre-Onboarding is now handled by admin, not a task for employees
     all_tasks = ["Personal Details", "Joining Day", "Training", "Department Introduction", "Feedback"]
     pending = [t for t in all_tasks if t not in completed]
@@ -79,215 +84,282 @@ def get_all_tasks_status(token: str) -> dict:
         "percent": percent
     }
 
-def get_next_task(token: str) -> str:
-    status = get_all_tasks_status(token)
+@request_memoized
+def get_next_task(token: str, db: Session = None) -> str:
+    status = get_all_tasks_status(token, db=db)
     return status["pending"][0] if status["pending"] else "None 🎉"
 
-def get_department_members_excluding_self(department: str, token: str) -> list:
-    db: Session = next(get_db())
-    
+@request_memoized
+def get_department_members_excluding_self(department: str, token: str, db: Session = None) -> list:
     # Get the current employee using the token
-    current_employee = db.query(Employee).filter(Employee.uuid_token == token).first()
-    if not current_employee:
+    try:
+        current_employee = get_employee_info(token, db=db)
+    except ValueError:
         return []
 
-    # Query all employees in the same department, excluding the current one
-    members = db.query(Employee).filter(
-        Employee.department == department,
-        Employee.emp_id != current_employee.emp_id
-    ).all()
+    with session_scope(db) as db:
+        # Query all employees in the same department, excluding the current one
+        members = db.query(Employee).filter(
+            Employee.department == department,
+            Employee.emp_id != current_employee["emp_id"]
+        ).all()
 
-    # Return a simplified list of member info
-    return [
-        {
-            "emp_id": emp.emp_id,
-            "name": emp.name,
-            "email": emp.email,
-            "role": emp.role,
-            "status": emp.status,
-            "uuid_token": emp.uuid_token
-        }
-        for emp in members
-    ]
+        # Return a simplified list of member info
+        return [
+            {
+                "emp_id": emp.emp_id,
+                "name": emp.name,
+                "email": emp.email,
+                "role": emp.role,
+                "status": emp.status,
+                "uuid_token": emp.uuid_token
+            }
+            for emp in members
+        ]
 
 # 🔹 HR-Specific Functions
 
-def get_all_employees_summary() -> dict:
+@request_memoized
+def get_all_employees_summary(db: Session = None) -> dict:
     """Get summary of all employees for HR dashboard"""
-    db: Session = SessionLocal()
-    employees = db.query(Employee).all()
-    
-    total = len(employees)
-    completed = len([e for e in employees if e.status == "completed"])
-    pending = len([e for e in employees if e.status == "pending"])
-    
-    # Get departments
-    departments = {}
-    for emp in employees:
-        if emp.department:
-            if emp.department not in departments:
-                departments[emp.department] = {"total": 0, "completed": 0, "pending": 0}
-            departments[emp.department]["total"] += 1
-            if emp.status == "completed":
-                departments[emp.department]["completed"] += 1
-            else:
-                departments[emp.department]["pending"] += 1
-    
+    with session_scope(db) as db:
+        snapshot = load_snapshot(db=db)
+        if snapshot is not None:
+            return snapshot.employees_summary()
+        employees = db.query(Employee).all()
+    
+        total = len(employees)
+        completed = len([e for e in employees if e.status == "completed"])
+        pending = len([e for e in employees if e.status == "pending"])
+        disabled = len([e for e in employees if e.status == "disabled"])
+    
+        # Get departments
+        departments = {}
+        for emp in employees:
+            if emp.department:
+                if emp.department not in departments:
+                    departments[emp.department] = {"total": 0, "completed": 0, "pending": 0}
+                departments[emp.department]["total"] += 1
+                if emp.status == "completed":
+                    departments[emp.department]["completed"] += 1
+                else:
+                    departments[emp.department]["pending"] += 1
+    
+        return {
+            "total": total,
+            "completed": completed,
+            "pending": pending,
+            "disabled": disabled,
+            "departments": departments
+        }
+
+@request_memoized
+def get_employee_overview(db: Session = None) -> dict:
+    """Headcounts for the HR dashboard and tracking pages: statuses, departments, genders and task completion"""
+    with session_scope(db) as db:
+        summary = get_all_employees_summary(db=db)
+        task_stats = get_onboarding_analytics(db=db)["task_statistics"].values()
+        genders = db.query(
+            EmployeePersonalInfo.gender,
+            func.count(func.distinct(EmployeePersonalInfo.employee_id))
+        ).group_by(EmployeePersonalInfo.gender).all()
+
+    assigned = sum(stats["assigned"] for stats in task_stats)
+    completed = sum(stats["completed"] for stats in task_stats)
     return {
-        "total": total,
-        "completed": completed,
-        "pending": pending,
-        "departments": departments
+        **summary,
+        # Everyone not completed and not disabled (pending, active, ...)
+        "in_progress": summary["total"] - summary["completed"] - summary["disabled"],
+        "genders": {gender: count for gender, count in genders if gender},
+        "task_completion_rate": round((completed / assigned * 100) if assigned > 0 else 0, 1)
     }
 
-def get_employee_detailed_info(employee_id: str) -> dict:
+@request_memoized
+def get_employee_detailed_info(employee_id: str, db: Session = None) -> dict:
     """Get detailed information about an employee"""
-    db: Session = SessionLocal()
-    employee = db.query(Employee).filter(Employee.emp_id == employee_id).first()
-    
-    if not employee:
-        return {}
-    
-    # Get personal info
-    personal_info = db.query(EmployeePersonalInfo).filter_by(employee_id=employee_id).first()
-    
-    # Get tasks
-    tasks = db.query(Task).filter(Task.assigned_to_id == employee_id).all()
-    
-    # Get feedback
-    feedback = db.query(Feedback).filter(Feedback.employee_id == employee_id).first()
-    
-    # Get uploaded documents
-    folder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "uploads", employee.folder_name) if employee.folder_name else None
-    documents = []
-    if folder_path and os.path.exists(folder_path):
-        try:
-            uploaded_files = os.listdir(folder_path)
-            for file in uploaded_files:
-                if file.endswith('.pdf'):
-                    documents.append(file)
-        except:
-            pass
-    
-    return {
-        "emp_id": employee.emp_id,
-        "name": employee.name,
-        "email": employee.email,
-        "role": employee.role,
-        "department": employee.department,
-        "status": employee.status,
-        "uuid_token": employee.uuid_token,
-        "personal_info": {
-            "mobile": personal_info.mobile if personal_info else None,
-            "dob": personal_info.dob if personal_info else None,
-            "gender": personal_info.gender if personal_info else None,
-            "aadhaar_number": personal_info.aadhaar_number if personal_info else None,
-            "pan_number": personal_info.pan_number if personal_info else None,
-        } if personal_info else None,
-        "tasks": [{"title": t.title, "status": t.status} for t in tasks],
-        "documents": documents,
-        "feedback": {
-            "rating": feedback.rating,
-            "message": feedback.message[:100] + "..." if feedback and len(feedback.message) > 100 else (feedback.message if feedback else None),
-            "submitted_at": feedback.submitted_at.strftime("%Y-%m-%d") if feedback and feedback.submitted_at else None
-        } if feedback else None
-    }
+    with session_scope(db) as db:
+        employee = db.query(Employee).filter(Employee.emp_id == employee_id).first()
+    
+        if not employee:
+            return {}
+    
+        # Get personal info
+        personal_info = db.query(EmployeePersonalInfo).filter_by(employee_id=employee_id).first()
+    
+        # Get tasks
+        tasks = db.query(Task).filter(Task.assigned_to_id == employee_id).all()
+    
+        # Get feedback
+        feedback = db.query(Feedback).filter(Feedback.employee_id == employee_id).first()
+    
+        # Get uploaded documents
+        folder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "uploads", employee.folder_name) if employee.folder_name else None
+        documents = []
+        if folder_path and os.path.exists(folder_path):
+            try:
+                uploaded_files = os.listdir(folder_path)
+                for file in uploaded_files:
+                    if file.endswith('.pdf'):
+                        documents.append(file)
+            except:
+                pass
+    
+        return {
+            "emp_id": employee.emp_id,
+            "name": employee.name,
+            "email": employee.email,
+            "role": employee.role,
+            "department": employee.department,
+            "status": employee.status,
+            "uuid_token": employee.uuid_token,
+            "personal_info": {
+                "mobile": personal_info.mobile if personal_info else None,
+                "dob": personal_info.dob if personal_info else None,
+                "gender": personal_info.gender if personal_info else None,
+                "aadhaar_number": personal_info.aadhaar_number if personal_info else None,
+                "pan_number": personal_info.pan_number if personal_info else None,
+            } if personal_info else None,
+            "tasks": [{"title": t.title, "status": t.status} for t in tasks],
+            "documents": documents,
+            "feedback": {
+                "rating": feedback.rating,
+                "message": feedback.message[:100] + "..." if feedback and len(feedback.message) > 100 else (feedback.message if feedback else None),
+                "submitted_at": feedback.submitted_at.strftime("%Y-%m-%d") if feedback and feedback.submitted_at else None
+            } if feedback else None
+        }
 
-def get_onboarding_analytics() -> dict:
+@request_memoized
+def get_onboarding_analytics(db: Session = None) -> dict:
     """Get comprehensive onboarding analytics for HR"""
-    db: Session = SessionLocal()
-    
-    # Get all employees with their tasks
-    employees = db.query(Employee).options(
-        joinedload(Employee.tasks)
-    ).all()
+    with session_scope(db) as db:
+        snapshot = load_snapshot(db=db)
+        if snapshot is not None:
+            return {**snapshot.onboarding_analytics(), "average_days_to_complete": get_average_days_to_complete(db=db)}
+        # Employee totals, counted in the DB
+        total_employees, completed_employees = db.query(
+            func.count(Employee.emp_id),
+            func.coalesce(func.sum(case((Employee.status == "completed", 1), else_=0)), 0)
+        ).one()
+        total_employees, completed_employees = int(total_employees), int(completed_employees)
+    
+        # Calculate task completion rates: employees holding each task, and how many of them completed it
+        rows = db.query(
+            Task.title,
+            func.count(func.distinct(Task.assigned_to_id)),
+            func.count(func.distinct(case((Task.status == "completed", Task.assigned_to_id))))
+        ).filter(
+            Task.title.in_(ONBOARDING_TASKS)
+        ).group_by(Task.title).all()
+        counts = {title: (assigned, completed) for title, assigned, completed in rows}
+    
+        task_stats = {}
+        for task_title in ONBOARDING_TASKS:
+            assigned_count, completed_count = counts.get(task_title, (0, 0))
+            task_stats[task_title] = {
+                "assigned": assigned_count,
+                "completed": completed_count,
+                "completion_rate": round((completed_count / assigned_count * 100) if assigned_count > 0 else 0, 1)
+            }
     
-    total_employees = len(employees)
-    completed_employees = len([e for e in employees if e.status == "completed"])
+        # Average completion time, from the onboarding event log
+        avg_days_to_complete = get_average_days_to_complete(db=db)
     
-    # Calculate task completion rates
-    all_tasks = ["Personal Details", "Joining Day", "Training", "Department Introduction", "Feedback"]
-    task_stats = {}
-    
-    for task_title in all_tasks:
-        assigned_count = 0
-        completed_count = 0
-        for emp in employees:
-            task = next((t for t in emp.tasks if t.title == task_title), None)
-            if task:
-                assigned_count += 1
-                if task.status == "completed":
-                    completed_count += 1
-        
-        task_stats[task_title] = {
-            "assigned": assigned_count,
-            "completed": completed_count,
-            "completion_rate": round((completed_count / assigned_count * 100) if assigned_count > 0 else 0, 1)
+        return {
+            "total_employees": total_employees,
+            "completed_employees": completed_employees,
+            "pending_employees": total_employees - completed_employees,
+            "completion_rate": round((completed_employees / total_employees * 100) if total_employees > 0 else 0, 1),
+            "task_statistics": task_stats,
+            "average_days_to_complete": avg_days_to_complete
         }
-    
-    # Average completion time (mock data - would need timestamp tracking)
-    avg_days_to_complete = 7  # Placeholder
-    
-    return {
-        "total_employees": total_employees,
-        "completed_employees": completed_employees,
-        "pending_employees": total_employees - completed_employees,
-        "completion_rate": round((completed_employees / total_employees * 100) if total_employees > 0 else 0, 1),
-        "task_statistics": task_stats,
-        "average_days_to_complete": avg_days_to_complete
-    }
 
-def get_department_onboarding_stats(department: str) -> dict:
-    """Get onboarding statistics for a specific department"""
-    db: Session = SessionLocal()
-    
-    employees = db.query(Employee).filter(Employee.department == department).all()
-    
-    total = len(employees)
-    completed = len([e for e in employees if e.status == "completed"])
-    
-    # Get task completion by department
-    task_stats = {}
-    all_tasks = ["Personal Details", "Joining Day", "Training", "Department Introduction", "Feedback"]
+@request_memoized
+def get_departments_onboarding_stats(departments: tuple = None, db: Session = None) -> dict:
+    """Onboarding statistics per department (all departments when none are given): from the snapshot, else two aggregate queries"""
+    with session_scope(db) as db:
+        snapshot = load_snapshot(db=db)
+        if snapshot is not None:
+            return snapshot.departments_stats(departments)
+        # Employee totals per department
+        employee_query = db.query(
+            Employee.department,
+            func.count(Employee.emp_id),
+            func.coalesce(func.sum(case((Employee.status == "completed", 1), else_=0)), 0)
+        )
+        # Employees per department who completed each task
+        task_query = db.query(
+            Employee.department,
+            Task.title,
+            func.count(func.distinct(Task.assigned_to_id))
+        ).join(Employee, Employee.emp_id == Task.assigned_to_id).filter(
+            Task.title.in_(ONBOARDING_TASKS),
+            Task.status == "completed"
+        )
+        if departments is not None:
+            employee_query = employee_query.filter(Employee.department.in_(departments))
+            task_query = task_query.filter(Employee.department.in_(departments))
+        else:
+            employee_query = employee_query.filter(Employee.department.isnot(None))
+        totals = {dept: (int(total), int(completed)) for dept, total, completed in employee_query.group_by(Employee.department).all()}
+        task_completed = {(dept, title): count for dept, title, count in task_query.group_by(Employee.department, Task.title).all()}
+    
+    stats = {}
+    for department in (departments if departments is not None else sorted(totals)):
+        total, completed = totals.get(department, (0, 0))
+    
+        # Get task completion by department
+        task_stats = {}
+        for task_title in ONBOARDING_TASKS:
+            completed_count = task_completed.get((department, task_title), 0)
+            task_stats[task_title] = {
+                "completed": completed_count,
+                "total": total,
+                "rate": round((completed_count / total * 100) if total > 0 else 0, 1)
+            }
     
-    for task_title in all_tasks:
-        completed_count = 0
-        for emp in employees:
-            task = next((t for t in emp.tasks if t.title == task_title), None)
-            if task and task.status == "completed":
-                completed_count += 1
-        
-        task_stats[task_title] = {
-            "completed": completed_count,
-            "total": total,
-            "rate": round((completed_count / total * 100) if total > 0 else 0, 1)
+        stats[department] = {
+            "department": department,
+            "total_employees": total,
+            "completed": completed,
+            "pending": total - completed,
+            "completion_rate": round((completed / total * 100) if total > 0 else 0, 1),
+            "task_stats": task_stats
         }
-    
-    return {
-        "department": department,
-        "total_employees": total,
-        "completed": completed,
-        "pending": total - completed,
-        "completion_rate": round((completed / total * 100) if total > 0 else 0, 1),
-        "task_stats": task_stats
-    }
+    return stats
 
-def get_feedback_summary() -> dict:
-    """Get summary of all employee feedback"""
-    db: Session = SessionLocal()
-    
-    feedbacks = db.query(Feedback).all()
-    
-    if not feedbacks:
+@request_memoized
+def get_department_onboarding_stats(department: str, db: Session = None) -> dict:
+    """Get onboarding statistics for a specific department"""
+    return get_departments_onboarding_stats((department,), db=db)[department]
+
+@request_memoized
+def get_feedback_summary(start: datetime = None, end: datetime = None, department: str = None, db: Session = None) -> dict:
+    """Get summary of employee feedback, optionally submitted in [start, end) and/or from one department"""
+    with session_scope(db) as db:
+        if start is None and end is None and not department:
+            snapshot = load_snapshot(db=db)
+            if snapshot is not None:
+                return snapshot.feedback_summary()
+    
+        # One GROUP BY on rating; count and average follow from the histogram
+        query = db.query(Feedback.rating, func.count(Feedback.id))
+        if start is not None:
+            query = query.filter(Feedback.submitted_at >= start)
+        if end is not None:
+            query = query.filter(Feedback.submitted_at < end)
+        if department:
+            query = query.join(Employee, Employee.emp_id == Feedback.employee_id).filter(Employee.department == department)
+        rows = query.group_by(Feedback.rating).all()
+    
+    total = sum(count for _, count in rows)
+    if not total:
         return {"total": 0, "average_rating": 0, "count": 0}
-    
-    total = len(feedbacks)
-    avg_rating = sum(f.rating for f in feedbacks) / total
+    avg_rating = sum(rating * count for rating, count in rows) / total
     
     # Rating distribution
     rating_dist = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    for fb in feedbacks:
-        rating_dist[fb.rating] = rating_dist.get(fb.rating, 0) + 1
+    for rating, count in rows:
+        rating_dist[rating] = count
     
     return {
         "total": total,
@@ -296,110 +368,91 @@ def get_feedback_summary() -> dict:
         "rating_distribution": rating_dist
     }
 
-def search_employee_by_name_or_email(search_term: str) -> list:
-    """Search for employees by name or email"""
-    db: Session = SessionLocal()
-    
-    employees = db.query(Employee).filter(
-        (Employee.name.ilike(f"%{search_term}%")) |
-        (Employee.email.ilike(f"%{search_term}%"))
-    ).limit(10).all()
-    
-    return [
-        {
-            "emp_id": emp.emp_id,
-            "name": emp.name,
-            "email": emp.email,
-            "department": emp.department,
-            "role": emp.role,
-            "status": emp.status
-        }
-        for emp in employees
-    ]
+@request_memoized
+def search_employee_by_name_or_email(search_term: str, db: Session = None) -> list:
+    """Search for employees by name or email (indexed; prefix, fuzzy and multi-word), best match first"""
+    return search_employees(search_term, 10, db=db)
 
-def get_employees_by_department(department: str) -> list:
+@request_memoized
+def get_employees_by_department(department: str, db: Session = None) -> list:
     """Get all employees in a department"""
-    db: Session = SessionLocal()
-    
-    employees = db.query(Employee).filter(Employee.department == department).all()
-    
-    return [
-        {
-            "emp_id": emp.emp_id,
-            "name": emp.name,
-            "email": emp.email,
-            "role": emp.role,
-            "status": emp.status,
-            "uuid_token": emp.uuid_token
-        }
-        for emp in employees
-    ]
+    with session_scope(db) as db:
+        employees = db.query(Employee).filter(Employee.department == department).all()
+    
+        return [
+            {
+                "emp_id": emp.emp_id,
+                "name": emp.name,
+                "email": emp.email,
+                "role": emp.role,
+                "status": emp.status,
+                "uuid_token": emp.uuid_token
+            }
+            for emp in employees
+        ]
 
-def get_employees_by_status(status: str) -> list:
+@request_memoized
+def get_employees_by_status(status: str, db: Session = None) -> list:
     """Get all employees with a specific status"""
-    db: Session = SessionLocal()
-    
-    employees = db.query(Employee).filter(Employee.status == status).all()
-    
-    return [
-        {
-            "emp_id": emp.emp_id,
-            "name": emp.name,
-            "email": emp.email,
-            "department": emp.department,
-            "role": emp.role,
-            "status": emp.status
-        }
-        for emp in employees
-    ]
+    with session_scope(db) as db:
+        employees = db.query(Employee).filter(Employee.status == status).all()
+    
+        return [
+            {
+                "emp_id": emp.emp_id,
+                "name": emp.name,
+                "email": emp.email,
+                "department": emp.department,
+                "role": emp.role,
+                "status": emp.status
+            }
+            for emp in employees
+        ]
 
-def get_module_progress_by_token(token: str, task_title: str = None) -> dict:
+@request_memoized
+def get_module_progress_by_token(token: str, task_title: str = None, db: Session = None) -> dict:
     """Get module progress for an employee by token. If task_title is provided, filter to that task."""
-    db: Session = SessionLocal()
-    
-    employee = db.query(Employee).filter(Employee.uuid_token == token).first()
-    if not employee:
-        raise ValueError("Invalid token")
-    
-    # Get modules (optionally filtered by task_title)
-    query = db.query(TaskModule)
-    if task_title:
-        query = query.filter(TaskModule.task_title == task_title)
-    modules = query.order_by(TaskModule.task_title, TaskModule.order_index).all()
-    
-    # Get progress records
-    progress_records = db.query(TaskModuleProgress).filter(
-        TaskModuleProgress.employee_id == employee.emp_id
-    ).all()
-    progress_map = {p.module_id: p for p in progress_records}
-    
-    # Group by task
-    tasks_dict = {}
-    for module in modules:
-        if module.task_title not in tasks_dict:
-            tasks_dict[module.task_title] = {
-                "total_modules": 0,
-                "completed_modules": 0,
-                "modules": []
-            }
+    employee = get_employee_info(token, db=db)
+    with session_scope(db) as db:
+        # Get modules (optionally filtered by task_title)
+        query = db.query(TaskModule)
+        if task_title:
+            query = query.filter(TaskModule.task_title == task_title)
+        modules = query.order_by(TaskModule.task_title, TaskModule.order_index).all()
+    
+        # Get progress records
+        progress_records = db.query(TaskModuleProgress).filter(
+            TaskModuleProgress.employee_id == employee["emp_id"]
+        ).all()
+        progress_map = {p.module_id: p for p in progress_records}
+    
+        # Group by task
+        tasks_dict = {}
+        for module in modules:
+            if module.task_title not in tasks_dict:
+                tasks_dict[module.task_title] = {
+                    "total_modules": 0,
+                    "completed_modules": 0,
+                    "modules": []
+                }
         
-        progress = progress_map.get(module.id)
-        status = progress.status if progress else "pending"
+            progress = progress_map.get(module.id)
+            status = progress.status if progress else "pending"
         
-        tasks_dict[module.task_title]["modules"].append({
-            "module_key": module.module_key,
-            "module_name": module.module_name,
-            "status": status,
-            "is_required": module.is_required == "yes"
-        })
-        tasks_dict[module.task_title]["total_modules"] += 1
-        if status == "completed":
-            tasks_dict[module.task_title]["completed_modules"] += 1
-    
-    # Calculate percentages
-    for task_title, data in tasks_dict.items():
-        total = data["total_modules"]
-        completed = data["completed_modules"]
-        data["progress_percent"] = int((completed / total * 100)) if total > 0 else 0
-    
-    return tasks_dict if not task_title else tasks_dict.get(task_title, {})
+            tasks_dict[module.task_title]["modules"].append({
+                "module_key": module.module_key,
+                "module_name": module.module_name,
+                "status": status,
+                "is_required": module.is_required == "yes"
+            })
+            tasks_dict[module.task_title]["total_modules"] += 1
+            if status == "completed":
+                tasks_dict[module.task_title]["completed_modules"] += 1
+    
+        # Calculate percentages
+        for task_title, data in tasks_dict.items():
+            total = data["total_modules"]
+            completed = data["completed_modules"]
+            data["progress_percent"] = int((completed / total * 100)) if total > 0 else 0
+    
+        return tasks_dict if not task_title else tasks_dict.get(task_title, {})
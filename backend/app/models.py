@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Date, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime 
@@ -26,6 +26,15 @@ class Employee(Base):
     it_accounts = relationship("ITAccount", back_populates="employee", uselist=False)
     module_progress = relationship("TaskModuleProgress", back_populates="employee")
 
+    __table_args__ = (
+        # GET /employees filters on department and/or status
+        Index("ix_employees_department_status", "department", "status"),
+        # ...and pages through (sort column, emp_id)
+        Index("ix_employees_name_emp_id", "name", "emp_id"),
+        Index("ix_employees_department_emp_id", "department", "emp_id"),
+        Index("ix_employees_status_emp_id", "status", "emp_id"),
+    )
+
 class HR(Base):
     __tablename__ = "hr_users"
     id = Column(Integer, primary_key=True, index=True)
@@ -70,6 +79,11 @@ class Task(Base):
     employee = relationship("Employee", back_populates="tasks")
     module_progress = relationship("TaskModuleProgress", back_populates="task", cascade="all, delete-orphan")
 
+    # Covers the per-title GROUP BY in HR analytics without touching the table
+    __table_args__ = (
+        Index("ix_tasks_title_assignee_status", "title", "assigned_to_id", "status"),
+    )
+
 
 class TaskModule(Base):
     """Defines subtasks/modules within a main task"""
@@ -135,6 +149,11 @@ class Feedback(Base):
 
     employee = relationship("Employee", back_populates="feedbacks")
 
+    # Date-range feedback summaries read only this index
+    __table_args__ = (
+        Index("ix_feedback_submitted_rating", "submitted_at", "rating"),
+    )
+
 class ITAccount(Base):
     """Track IT account credentials for employees - Company Email and Password only"""
     __tablename__ = "it_accounts"
@@ -164,3 +183,64 @@ class EmailAccount(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     notes = Column(Text, nullable=True)  # Optional notes about the account
 
+
+class OnboardingStat(Base):
+    """Pre-aggregated onboarding counters, kept in step with every write (see mcp_tools/onboarding_stats.py)"""
+    __tablename__ = "onboarding_stats"
+
+    # e.g. ("department_status", "Engineering", "pending") or ("rating", "", "4")
+    scope = Column(String(50), primary_key=True)
+    department = Column(String(255), primary_key=True, default="")
+    key = Column(String(255), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class OnboardingEvent(Base):
+    """Append-only onboarding timeline (see mcp_tools/onboarding_events.py)"""
+    __tablename__ = "onboarding_events"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(50), nullable=False)  # task_assigned, module_completed, task_completed, status_changed
+    employee_id = Column(String(50), nullable=False)  # no FK: history outlives the employee row
+    department = Column(String(255), nullable=True)  # as it was when the event happened
+    task_title = Column(String(255), nullable=True)
+    module_key = Column(String(100), nullable=True)
+    status = Column(String(50), nullable=True)  # new status for status_changed
+    duration_seconds = Column(Integer, nullable=True)  # completions: time since the first assignment
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Percentile queries read one event type over a time window
+        Index("ix_onboarding_events_type_time", "event_type", "occurred_at"),
+        # Finding an employee's first assignment when a completion is logged
+        Index("ix_onboarding_events_employee_task", "employee_id", "task_title", "event_type", "occurred_at"),
+    )
+
+
+class OnboardingRollup(Base):
+    """Daily onboarding counts per department, rebuilt from onboarding_events (see mcp_tools/onboarding_rollups.py)"""
+    __tablename__ = "onboarding_rollups"
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)  # when it happened
+    department = Column(String(255), nullable=False, default="")
+    metric = Column(String(50), nullable=False)  # joined, onboarding_completed, task_completed, module_completed
+    task_title = Column(String(255), nullable=False, default="")
+    cohort_day = Column(Date, nullable=True)  # the employees' joining day (None: joined before the event log)
+    duration_days = Column(Integer, nullable=True)  # completions: whole days since assignment
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_onboarding_rollups_day", "day", "metric"),
+        Index("ix_onboarding_rollups_cohort", "cohort_day", "metric"),
+    )
+
+
+class GroundingVersion(Base):
+    """Change counters for the data chat answers are grounded on (see utils/data_version.py)"""
+    __tablename__ = "grounding_versions"
+
+    # an employee's uuid_token, "dept:<department>", or "*" for company-wide data
+    scope = Column(String(300), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
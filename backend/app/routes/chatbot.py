@@ -1,42 +1,46 @@
 from fastapi import APIRouter, Body
-from app.mcp_tools.prompt_builder import build_prompt
+from app.mcp_tools.prompt_builder import build_prompt_parts
 from app.mcp_tools.grounding import detect_policy_topic
-import requests
+from app.config import settings
+from app.mcp_tools.llm_dispatch import LLMDispatcher, BREAKER_OPTIONS
 
 router = APIRouter(prefix="/chatbot", tags=["chatbot"])
 
-def ask_local_llm(prompt: str, model_name: str = "phi") -> str:
-    try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": model_name, "prompt": prompt, "stream": False},
-            timeout=6
-        )
-        return response.json().get("response", "").strip()
-    except Exception as e:
-        return f"Error: {str(e)}"
+# Own breakers and latency stats: a model missing this endpoint's short deadline
+# says nothing about whether it can serve /chatbot/chat
+ask_dispatcher = LLMDispatcher(
+    strategy=settings.LLM_DISPATCH_STRATEGY,
+    hedge_delay_ms=settings.LLM_HEDGE_DELAY_MS,
+    breaker_options=BREAKER_OPTIONS,
+    min_breaker_timeout=settings.LLM_BREAKER_MIN_TIMEOUT_SECONDS
+)
+
+def is_usable(text: str) -> bool:
+    return bool(text) and len(text) >= 20 and "SUPA Chat is taking longer" not in text
 
 @router.post("/ask")
-def ask_bot(payload: dict = Body(...)):
+async def ask_bot(payload: dict = Body(...)):
     prompt = payload.get("prompt")
     employee_id = payload.get("employee_id")
 
     if not prompt or not employee_id:
         return {"error": "Missing prompt or employee_id"}
 
-    enriched_prompt = build_prompt(prompt, token=employee_id, task="Joining Day")
-    response_text = ask_local_llm(enriched_prompt, model_name="phi")
+    parts = build_prompt_parts(prompt, employee_id, {"Page": "Joining Day"})
 
-    # Fallback to Mistral if Phi fails or gives weak response
-    if not response_text or len(response_text) < 20 or "SUPA Chat is taking longer" in response_text:
-        response_text = ask_local_llm(enriched_prompt, model_name="mistral")
-        model_used = "mistral"
-    else:
-        model_used = "phi"
+    # Phi first, Mistral as the fallback/hedge — same dispatch strategy as /chatbot/chat
+    result = await ask_dispatcher.dispatch(
+        parts["prompt"],
+        ["phi", "mistral"],
+        accept=is_usable,
+        timeout=6,
+        system=parts["system"]
+    )
+    response_text, model_used = result if result else ("SUPA Chat encountered an error. Please try again or contact HR.", "none")
 
     return {
         "response": response_text,
         "model_used": model_used,
         "policy_topic": detect_policy_topic(prompt),
         "task": "Joining Day"
-    }
\ No newline at end of file
+    }
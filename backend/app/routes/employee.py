@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile, Query
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, load_only, selectinload
 from app import models, schemas
 from app.database import get_db
 from app.utils.email_service import send_onboarding_email
-from app.dependencies import get_current_hr_user
+from app.dependencies import get_current_hr_user, optional_oauth2_scheme, mark_task_completed, change_employee_status
 from app.utils.document_parser import create_employee_folder
+from app.utils.data_version import bump_grounding_version
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.mcp_tools import onboarding_stats, onboarding_events
+from app.mcp_tools.employee_search import search_employees
 import os
 import uuid
 import re
@@ -29,17 +34,144 @@ def normalize_department(dept):
     # Otherwise, capitalize first letter of each word
     return " ".join(word.capitalize() for word in trimmed.split())
 
-# Get all employees
+# 🔹 Employee listing: keyset pages, filters and field projection
+EMPLOYEE_FIELDS = ["emp_id", "name", "email", "role", "department", "status", "folder_name"]
+# Scalar employee columns only; relations must be asked for
+DEFAULT_FIELDS = ["emp_id", "name", "email", "role", "department", "status"]
+# Relations that can be requested (whole, or as relation.column); never the IT account password
+RELATION_FIELDS = {
+    "personal_info": (models.EmployeePersonalInfo, [
+        column.name for column in models.EmployeePersonalInfo.__table__.columns if column.name not in ("id", "employee_id")
+    ]),
+    "tasks": (models.Task, ["id", "title", "status"]),
+    "it_accounts": (models.ITAccount, ["id", "company_email", "created_at", "updated_at"]),
+}
+# Personal details (Aadhaar, PAN, bank, family contacts) and IT accounts: HR only
+HR_ONLY_RELATIONS = {"personal_info", "it_accounts"}
+SORT_FIELDS = ["emp_id", "name", "department", "status"]
+
+
+def _parse_fields(fields: str):
+    """`fields=` -> (employee columns, {relation: columns}); 400 on anything unknown"""
+    if not fields:
+        return list(DEFAULT_FIELDS), {}
+    columns, relations = [], {}
+    for field in (part.strip() for part in fields.split(",")):
+        if not field:
+            continue
+        name, _, column = field.partition(".")
+        if not column and name in EMPLOYEE_FIELDS:
+            if name not in columns:
+                columns.append(name)
+        elif name in RELATION_FIELDS and (not column or column in RELATION_FIELDS[name][1]):
+            selected = relations.setdefault(name, [])
+            for col in ([column] if column else RELATION_FIELDS[name][1]):
+                if col not in selected:
+                    selected.append(col)
+        else:
+            allowed = EMPLOYEE_FIELDS + [f"{relation}[.column]" for relation in RELATION_FIELDS]
+            raise HTTPException(status_code=400, detail=f"Unknown field '{field}'. Allowed: {', '.join(allowed)}")
+    return columns, relations
+
+
+def _project(employee, columns: list, relations: dict) -> dict:
+    item = {column: getattr(employee, column) for column in columns}
+    for relation, selected in relations.items():
+        value = getattr(employee, relation)
+        if isinstance(value, list):
+            item[relation] = [{column: getattr(row, column) for column in selected} for row in value]
+        else:
+            item[relation] = {column: getattr(value, column) for column in selected} if value is not None else None
+    return item
+
+
+def _keyset_page(query, sort_field: str, descending: bool, last: list, size: int) -> list:
+    """Up to `size` rows after `last` in (sort column, emp_id) order, rows with a NULL sort column last.
+
+    Each part is a range read of the (column, emp_id) index: the non-NULL
+    rows first, then (once those run out) the NULL ones by emp_id. The same
+    in every database, whatever its own NULL ordering.
+    """
+    emp_id = models.Employee.emp_id
+    after = (lambda key, bound: key < bound) if descending else (lambda key, bound: key > bound)
+    direction = (lambda key: key.desc()) if descending else (lambda key: key)
+    if sort_field == "emp_id":
+        if last:
+            query = query.filter(after(emp_id, last[0]))
+        return query.order_by(direction(emp_id)).limit(size).all()
+
+    column = getattr(models.Employee, sort_field)
+    rows = []
+    in_nulls = last is not None and last[0] is None
+    if not in_nulls:
+        values = query.filter(column.isnot(None))
+        if last:
+            values = values.filter(after(tuple_(column, emp_id), tuple_(*last)))
+        rows = values.order_by(direction(column), direction(emp_id)).limit(size).all()
+    if len(rows) < size:
+        nulls = query.filter(column.is_(None))
+        if in_nulls:
+            nulls = nulls.filter(after(emp_id, last[1]))
+        rows += nulls.order_by(direction(emp_id)).limit(size - len(rows)).all()
+    return rows
+
+
+# Get employees (one page)
 @router.get("/")
 @router.get("")
-def get_all_employees(db: Session = Depends(get_db)):
-    """Get all employees with their personal info, tasks, and IT accounts"""
-    employees = db.query(models.Employee).options(
-        joinedload(models.Employee.personal_info),
-        joinedload(models.Employee.tasks),
-        joinedload(models.Employee.it_accounts)
-    ).all()
-    return employees
+def get_all_employees(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    department: str = Query(None),
+    status: str = Query(None, description="One status, or several separated by commas"),
+    name: str = Query(None, description="Names starting with this (case-insensitive)"),
+    sort: str = Query("emp_id", description="emp_id, name, department or status; prefix '-' for descending"),
+    fields: str = Query(None, description="Comma-separated columns and relations, e.g. emp_id,name,tasks.status"),
+    token: str = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """A page of employees with only the requested fields, and the cursor of the next page"""
+    sort_field = sort.lstrip("-")
+    if sort_field not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort '{sort}'. Allowed: {', '.join(SORT_FIELDS)} (prefix '-' for descending)")
+    descending = sort.startswith("-")
+    columns, relations = _parse_fields(fields)
+    if HR_ONLY_RELATIONS & set(relations):
+        if not token:
+            raise HTTPException(status_code=401, detail="HR login required for personal_info and it_accounts")
+        get_current_hr_user(token, db)
+
+    loaded = {"emp_id", sort_field, *columns}
+    options = [load_only(*(getattr(models.Employee, column) for column in loaded))]
+    for relation, selected in relations.items():
+        model = RELATION_FIELDS[relation][0]
+        options.append(
+            selectinload(getattr(models.Employee, relation)).load_only(*(getattr(model, column) for column in selected))
+        )
+    query = db.query(models.Employee).options(*options)
+
+    if department:
+        query = query.filter(models.Employee.department == department)
+    if status:
+        query = query.filter(models.Employee.status.in_([value.strip() for value in status.split(",")]))
+    if name:
+        escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(models.Employee.name.ilike(f"{escaped}%", escape="\\"))
+    last = None
+    if cursor:
+        last = decode_cursor(cursor, sort)
+        size = 1 if sort_field == "emp_id" else 2
+        if len(last) != size or not isinstance(last[-1], str) or not isinstance(last[0], (str, type(None))):
+            raise HTTPException(status_code=400, detail="Invalid cursor for this sort")
+
+    rows = _keyset_page(query, sort_field, descending, last, limit + 1)
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last_row = page[-1]
+        values = [last_row.emp_id] if sort_field == "emp_id" else [getattr(last_row, sort_field), last_row.emp_id]
+        next_cursor = encode_cursor(sort, values)
+    return {"items": [_project(employee, columns, relations) for employee in page], "next_cursor": next_cursor}
 
 # Create employee and send onboarding email
 @router.post("/", response_model=schemas.EmployeeCreate)
@@ -84,6 +216,7 @@ def create_employee(
         uuid_token=uuid_token
     )
     db.add(db_employee)
+    onboarding_stats.record_employee(db, db_employee.department, db_employee.status)
     db.commit()
     db.refresh(db_employee)
 
@@ -115,11 +248,20 @@ def create_employee(
             status="pending"
         )
         db.add(task)
+        onboarding_stats.record_task(db, db_employee.department, task)
+        onboarding_events.record_task_assigned(db, db_employee.emp_id, db_employee.department, title)
 
+    # A new teammate shows up in the department's context
+    bump_grounding_version(db, db_employee.uuid_token, db_employee.department)
     db.commit()
 
     return db_employee
 
+# Search employees by name, email or ID (prefix, fuzzy, multi-word)
+@router.get("/search")
+def search(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    return {"query": q, "results": search_employees(q, limit, db=db)}
+
 # Get employee
 @router.get("/{employee_id}")
 def get_employee(employee_id: str, db: Session = Depends(get_db)):
@@ -285,7 +427,7 @@ async def submit_personal_info_by_token(
     
     employee = db.query(models.Employee).filter_by(emp_id=employee_id).first()
     if employee:
-        employee.status = "completed"
+        change_employee_status(db, employee, "completed")
         db.commit()
 
     task = db.query(models.Task).filter_by(
@@ -294,9 +436,12 @@ async def submit_personal_info_by_token(
     ).first()
 
     if task:
-        task.status = "completed"
+        mark_task_completed(db, task, employee.department if employee else None)
         db.commit()
 
+    # The employee's status (seen by their teammates) is now completed
+    bump_grounding_version(db, token, employee.department if employee else None)
+    db.commit()
     return {"status": "success", "data": info}
 
 # Get personal info for an employee
@@ -371,7 +516,8 @@ def update_employee_status(
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    employee.status = status
+    change_employee_status(db, employee, status)
+    bump_grounding_version(db, employee.uuid_token, employee.department)
     db.commit()
     db.refresh(employee)
     
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas import FeedbackTokenBase
 from app.models import Employee, Feedback
+from app.utils.data_version import bump_grounding_version
 from datetime import datetime
+from typing import Optional
+from app.mcp_tools.task_tracker import get_feedback_summary
+from app.mcp_tools import onboarding_stats
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
@@ -14,6 +19,16 @@ def get_all_feedback(db: Session = Depends(get_db)):
     feedbacks = db.query(Feedback).all()
     return feedbacks
 
+@router.get("/summary")
+def feedback_summary(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Feedback count, average rating and 1-5 histogram, for submissions in [start, end) and/or one department"""
+    return get_feedback_summary(start, end, department, db=db)
+
 @router.get("/by-token/{token}")
 def get_feedback_by_token(token: str, db: Session = Depends(get_db)):
     """Get the latest feedback submission for a specific employee by token"""
@@ -60,9 +75,20 @@ def submit_feedback(feedback: FeedbackTokenBase, db: Session = Depends(get_db)):
 
     existing = db.query(Feedback).filter(Feedback.token == feedback.token).first()
     if existing:
-        existing.message = feedback.message
-        existing.rating = feedback.rating
-        existing.submitted_at = datetime.utcnow()
+        # Move the histogram from the rating actually replaced: the UPDATE only
+        # applies if no other edit changed it since it was read
+        while True:
+            old_rating = existing.rating
+            replaced = db.execute(
+                update(Feedback)
+                .where(Feedback.id == existing.id, Feedback.rating == old_rating)
+                .values(rating=feedback.rating, message=feedback.message, submitted_at=datetime.utcnow())
+            ).rowcount == 1
+            if replaced:
+                onboarding_stats.record_feedback(db, old_rating, feedback.rating)
+                break
+            db.refresh(existing)
+        bump_grounding_version(db, feedback.token)
         db.commit()
         db.refresh(existing)
         return {"id": existing.id, "rating": existing.rating}
@@ -74,6 +100,8 @@ def submit_feedback(feedback: FeedbackTokenBase, db: Session = Depends(get_db)):
         rating=feedback.rating
     )
     db.add(f)
+    onboarding_stats.record_feedback(db, None, f.rating)
+    bump_grounding_version(db, feedback.token)
     db.commit()
     db.refresh(f)
 
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Employee, Task
+from app.mcp_tools.task_tracker import get_departments_onboarding_stats, get_employee_overview
+from app.mcp_tools import onboarding_stats, onboarding_events, onboarding_rollups
+from app.utils.data_version import bump_grounding_version
 
 router = APIRouter(prefix="/hr", tags=["hr"])
 
@@ -10,10 +15,46 @@ def onboarding_status(db: Session = Depends(get_db)):
     employees = db.query(Employee).all()
     return [{"emp_id": e.emp_id, "name": e.name, "status": e.status} for e in employees]
 
+@router.get("/department_stats")
+def department_stats(department: Optional[List[str]] = Query(None), db: Session = Depends(get_db)):
+    """Onboarding stats for the given departments (repeat ?department=), or for every department"""
+    return get_departments_onboarding_stats(tuple(department) if department else None, db=db)
+
+@router.get("/employee_overview")
+def employee_overview(db: Session = Depends(get_db)):
+    """Status, department and gender headcounts plus overall task completion, without listing employees"""
+    return get_employee_overview(db=db)
+
+@router.get("/analytics/time-to-complete")
+def time_to_complete(days: Optional[int] = Query(None, ge=1, le=3650), db: Session = Depends(get_db)):
+    """p50/p75/p90 days to complete each task and onboarding (overall, per department) over the last `days`"""
+    return onboarding_events.get_time_to_complete(days, db=db)
+
+@router.get("/analytics/cohorts")
+def cohorts(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    by: str = Query("join", pattern="^(join|activity)$"),
+    department: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Joins, completions and median days per day/week/month, by joining date or by activity date (default: last 12 weeks)"""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(weeks=12)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+    return onboarding_rollups.get_cohorts(start, end, bucket, by, department, db=db)
+
 @router.post("/assign_task")
 def assign_task(title: str, employee_id: str, db: Session = Depends(get_db)):
     task = Task(title=title, assigned_to_id=employee_id)
     db.add(task)
+    employee = db.query(Employee).filter(Employee.emp_id == employee_id).first()
+    if employee:
+        onboarding_stats.record_task(db, employee.department, task)
+        onboarding_events.record_task_assigned(db, employee.emp_id, employee.department, title)
+        bump_grounding_version(db, employee.uuid_token)
     db.commit()
     db.refresh(task)
     return {"task_id": task.id, "title": task.title}
@@ -3,10 +3,12 @@ API routes for tracking subtask/module progress
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, update
 from datetime import datetime
 from app import models, schemas
 from app.database import get_db
+from app.utils.data_version import bump_grounding_version
+from app.mcp_tools import onboarding_events
 
 router = APIRouter(prefix="/module-progress", tags=["module-progress"])
 
@@ -62,11 +64,21 @@ def update_module_progress(
         progress.status = data.status
         progress.progress_percent = data.progress_percent
     
-    # Set completed_at if completed
-    if data.status == "completed" and not progress.completed_at:
-        progress.completed_at = datetime.utcnow()
-    
     progress.updated_at = datetime.utcnow()
+
+    # Set completed_at if completed; the conditional UPDATE lets only one of
+    # several concurrent completions log the event
+    if data.status == "completed" and not progress.completed_at:
+        db.flush()
+        first_completion = db.execute(
+            update(models.TaskModuleProgress)
+            .where(models.TaskModuleProgress.id == progress.id, models.TaskModuleProgress.completed_at.is_(None))
+            .values(completed_at=datetime.utcnow())
+        ).rowcount == 1
+        if first_completion:
+            onboarding_events.record_module_completed(db, employee.emp_id, employee.department, data.task_title, data.module_key)
+
+    bump_grounding_version(db, data.token)
     db.commit()
     db.refresh(progress)
     
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.database import get_db
+from app.utils.data_version import bump_grounding_version
+from app.dependencies import mark_task_completed
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -19,7 +21,8 @@ def complete_task(data: schemas.TaskCompleteRequest, db: Session = Depends(get_d
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    task.status = "completed"
+    if mark_task_completed(db, task, employee.department):
+        bump_grounding_version(db, data.token)
     db.commit()
     return {"status": "success", "task": data.task}
 
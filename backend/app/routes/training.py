@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
 from app.utils.document_parser import create_employee_folder
+from app.utils.data_version import bump_grounding_version
 import os
 import uuid
 
@@ -86,6 +87,8 @@ async def submit_training_proof(
             f.write(await collaboration_training.read())
         print(f"✅ Collaboration Training Proof saved: {collab_path}")
 
+    bump_grounding_version(db, token)
+    db.commit()
     return {"status": "success", "message": "All available files saved"}
 
 @router.get("/status/{token}")
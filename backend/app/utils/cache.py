@@ -0,0 +1,142 @@
+"""
+In-process LRU cache with per-entry TTL and a memory cap.
+
+Named caches are shared through get_cache() so the chat endpoint and any
+other cached path can reuse the same instance and report stats together.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+_MISSING = object()
+
+
+def _sizeof(value: Any) -> int:
+    """Rough byte size of a cached key or value"""
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = 300,
+        max_bytes: Optional[int] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # key -> (value, expires_at, size)
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        size = _sizeof(key) + _sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never let one oversized entry flush the whole cache
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        """Drop expired entries first, then least recently used ones, until within bounds"""
+        if len(self._data) <= self.max_entries and (self.max_bytes is None or self._bytes <= self.max_bytes):
+            return
+        now = time.monotonic()
+        for key in [k for k, (_, exp, _) in self._data.items() if exp is not None and exp <= now]:
+            self._remove(key)
+            self.expirations += 1
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+_caches: dict = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name: str, **kwargs) -> TTLCache:
+    """Return the shared cache registered under `name`, creating it on first use"""
+    with _registry_lock:
+        if name not in _caches:
+            _caches[name] = TTLCache(name, **kwargs)
+        return _caches[name]
+
+
+def all_cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
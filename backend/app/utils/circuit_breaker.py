@@ -0,0 +1,111 @@
+"""
+Failure-rate circuit breaker.
+
+closed    -> calls flow; outcomes are kept in a sliding window
+open      -> failure rate crossed the threshold; calls are rejected until the cool-down ends
+half_open -> after the cool-down a limited number of probe calls decide whether to close or re-open
+"""
+import threading
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 4,
+        window: int = 20,
+        cooldown_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.outcomes = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = None
+        self.half_open_in_flight = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def _failure_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed now (reserving a probe slot when half-open)"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self.half_open_in_flight = 0
+            if self.state == HALF_OPEN:
+                if self.half_open_in_flight >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self.half_open_in_flight += 1
+            return True
+
+    def is_available(self) -> bool:
+        """Non-reserving check used for health reporting and routing decisions"""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= self.cooldown_seconds
+            if self.state == HALF_OPEN:
+                return self.half_open_in_flight < self.half_open_max_calls
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self.outcomes.clear()
+                self.half_open_in_flight = 0
+            self.outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self.outcomes.append(False)
+            if len(self.outcomes) >= self.min_calls and self._failure_rate() >= self.failure_rate_threshold:
+                self._open()
+
+    def record_cancel(self):
+        """A call was abandoned before it finished; free its probe slot without judging health"""
+        with self._lock:
+            if self.state == HALF_OPEN and self.half_open_in_flight > 0:
+                self.half_open_in_flight -= 1
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.half_open_in_flight = 0
+        self.times_opened += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.cooldown_seconds - (time.monotonic() - self.opened_at)), 1)
+            return {
+                "state": self.state,
+                "failure_rate": round(self._failure_rate(), 3),
+                "window_calls": len(self.outcomes),
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "retry_in_seconds": retry_in
+            }
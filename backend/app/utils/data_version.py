@@ -0,0 +1,69 @@
+"""
+Version counters for the data SUPA answers are grounded on.
+
+Every write that changes what an employee's chat context would show bumps
+that employee's counter, the counter of their department (whose members see
+them in the Department Introduction context) and the company-wide one used by
+HR pages. Chat cache keys include the counters, so unchanged state keeps
+hitting the cache and any change misses it without explicit invalidation.
+
+Counters are rows in the grounding_versions table, so every worker process
+sees every other worker's bumps. Like the onboarding_stats hooks, bumps take
+the writer's session *before* it commits and land in the same transaction.
+"""
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import session_scope
+from app.models import GroundingVersion
+
+GLOBAL_SCOPE = "*"
+
+
+def _department_scope(department: str) -> str:
+    return f"dept:{department}"
+
+
+def _bump(db: Session, scope: str):
+    row = GroundingVersion.__table__.c
+    increment = update(GroundingVersion).where(row.scope == scope).values(version=row.version + 1)
+    if db.execute(increment).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(GroundingVersion(scope=scope, version=1))
+    except IntegrityError:
+        # Another writer created the row first
+        db.execute(increment)
+
+
+def bump_grounding_version(db: Session, token: str = None, department: Optional[str] = None) -> None:
+    """Record a change to an employee's grounding data, to what their department's members
+    see of them (pass department), or only to company-wide data (neither)"""
+    if token:
+        _bump(db, token)
+    if department:
+        _bump(db, _department_scope(department))
+    _bump(db, GLOBAL_SCOPE)
+
+
+def _read(scopes: list, db: Session = None) -> int:
+    with session_scope(db) as db:
+        versions = db.query(GroundingVersion.version).filter(GroundingVersion.scope.in_(scopes)).all()
+        # Counters only grow, so their sum changes whenever any of them does
+        return sum(version for (version,) in versions)
+
+
+def get_grounding_version(token: str, department: Optional[str] = None, db: Session = None) -> int:
+    """Version of an employee's chat context: their own data plus their department's"""
+    scopes = [token]
+    if department:
+        scopes.append(_department_scope(department))
+    return _read(scopes, db)
+
+
+def get_global_version(db: Session = None) -> int:
+    return _read([GLOBAL_SCOPE], db)
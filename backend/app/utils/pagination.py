@@ -0,0 +1,29 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row a page returned (plus the sort it
+belongs to), so the next page is `WHERE key > last` on an index instead of
+an OFFSET that re-reads every skipped row. Clients pass it back unchanged.
+"""
+import base64
+import json
+
+from fastapi import HTTPException
+
+
+def encode_cursor(sort: str, values: list) -> str:
+    payload = json.dumps({"s": sort, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    """The key values stored in `cursor`; 400 if it's malformed or from another sort"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = payload["v"]
+        valid = payload["s"] == sort and isinstance(values, list)
+    except (ValueError, TypeError, KeyError):
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid cursor for this sort")
+    return values
@@ -0,0 +1,74 @@
+"""
+Request-scoped memoization.
+
+One chat request resolves the same employee, task and module lookups several
+times (page context, next task, prompt header). Functions decorated with
+@request_memoized remember their result, or the exception they raised, for
+the rest of the current request only, so each distinct lookup hits the DB
+once. The memo lives in a contextvar opened by request_scope() (see the
+middleware in main.py); outside a scope the functions run uncached, so
+background jobs and scripts always see fresh data.
+
+Memoized results are shared by every caller in the request: treat them as
+read-only. Arguments are bound to the function's signature (defaults filled
+in) before keying, so f(x), f(x, y=default) and f(token=x) share one entry;
+the `db` argument is not part of the key.
+"""
+import functools
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+_memo: ContextVar[Optional[dict]] = ContextVar("request_memo", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Open a fresh memo for one request (nested scopes reuse the outer one)"""
+    if _memo.get() is not None:
+        yield
+        return
+    reset_token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(reset_token)
+
+
+def request_memoized(func):
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        memo = _memo.get()
+        if memo is None:
+            return func(*args, **kwargs)
+        try:
+            bound = signature.bind(*args, **kwargs)
+        except TypeError:
+            # A bad call: let the function raise its own error
+            return func(*args, **kwargs)
+        bound.apply_defaults()
+        # The session a lookup runs on doesn't change its answer
+        bound.arguments.pop("db", None)
+        key = (func.__qualname__, tuple(bound.arguments.items()))
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable arguments (e.g. a list) can't be memoized
+            return func(*args, **kwargs)
+        if key in memo:
+            ok, value = memo[key]
+            if ok:
+                return value
+            raise value
+        try:
+            value = func(*args, **kwargs)
+        except Exception as exc:
+            memo[key] = (False, exc)
+            raise
+        memo[key] = (True, value)
+        return value
+
+    return wrapper
@@ -0,0 +1,59 @@
+"""
+Single-flight coalescing for async calls.
+
+Concurrent callers asking for the same key share one in-flight call and its
+result. The shared call is cancelled only when every waiter has gone away.
+"""
+import asyncio
+import hashlib
+from typing import Awaitable, Callable
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        # key -> [future, waiter_count]
+        self._inflight: dict = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    async def do(self, key: str, factory: Callable[[], Awaitable]):
+        entry = self._inflight.get(key)
+        if entry is None:
+            self.calls += 1
+            future = asyncio.ensure_future(factory())
+            entry = [future, 0]
+            self._inflight[key] = entry
+            future.add_done_callback(lambda _: self._forget(key, future))
+        else:
+            self.coalesced += 1
+
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        except asyncio.CancelledError:
+            if entry[0].cancelled():
+                raise
+            entry[1] -= 1
+            if entry[1] == 0:
+                entry[0].cancel()
+            raise
+
+    def _forget(self, key: str, future):
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is future:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        total = self.calls + self.coalesced
+        return {
+            "name": self.name,
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / total, 3) if total else 0.0
+        }
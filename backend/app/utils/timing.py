@@ -0,0 +1,94 @@
+"""
+Per-stage latency instrumentation.
+
+A StageTimer measures the named stages of one request with monotonic clocks
+and renders them as a Server-Timing header. StageHistogram keeps a rolling
+window of every stage's durations (plus any other per-request numbers, such
+as prompt size) so percentiles can be queried at runtime.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Optional
+
+
+def percentile(values: list, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StageTimer:
+    def __init__(self):
+        self.started = time.monotonic()
+        # stage -> milliseconds, in the order stages ran
+        self.stages: "OrderedDict[str, float]" = OrderedDict()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, (time.monotonic() - started) * 1000)
+
+    def record(self, name: str, ms: float):
+        """Add `ms` to a stage (a stage entered twice accumulates)"""
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def total_ms(self) -> float:
+        return (time.monotonic() - self.started) * 1000
+
+    def as_dict(self) -> dict:
+        timings = {name: round(ms, 1) for name, ms in self.stages.items()}
+        timings["total"] = round(self.total_ms(), 1)
+        return timings
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.as_dict().items())
+
+
+class StageHistogram:
+    def __init__(self, name: str, window: int = 500):
+        self.name = name
+        self.window = window
+        self._stages: dict = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def observe(self, timings: dict):
+        with self._lock:
+            self.requests += 1
+            for stage, ms in timings.items():
+                if stage not in self._stages:
+                    self._stages[stage] = deque(maxlen=self.window)
+                self._stages[stage].append(ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {stage: list(values) for stage, values in self._stages.items()}
+            requests = self.requests
+        return {
+            "name": self.name,
+            "requests": requests,
+            "window": self.window,
+            "metrics": {
+                stage: {
+                    "count": len(values),
+                    "mean": round(sum(values) / len(values), 1),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "p99": percentile(values, 99),
+                    "max": max(values)
+                }
+                for stage, values in stages.items() if values
+            }
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self.requests = 0
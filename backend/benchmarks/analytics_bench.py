@@ -0,0 +1,329 @@
+"""
+Scaling benchmark for the HR analytics queries in task_tracker.py.
+
+For each employee count it seeds a throwaway SQLite database (5 onboarding
+tasks per employee), then times each analytics function on its own session
+and prints the median latency per size, so growth with headcount is visible
+at a glance. The pre-aggregation implementation of get_onboarding_analytics
+(load every employee and task into Python) is timed alongside for
+comparison up to --legacy-max employees, and its result must match.
+The same goes for per-department stats, which used to lazy-load every
+employee's tasks (one query per employee), and the feedback summary, which
+used to load every feedback row. Employees who finished onboarding leave
+one feedback row dated within the past year. Finally the onboarding_stats
+snapshot is built and the same reads are timed again; their results must
+match the live ones.
+
+Every employee is also given an onboarding event timeline: hired up to
+--history-years ago, tasks completed over the following weeks. The
+time-to-complete percentiles read only the last year of it.
+
+    cd backend
+    python benchmarks/analytics_bench.py --sizes 100 1000 10000 100000
+    python benchmarks/analytics_bench.py --sizes 100 100000 --max-ratio 300 --json analytics.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+DEPARTMENTS = ["Engineering", "Sales", "Marketing", "HR", "Finance", "Operations"]
+TASK_TITLES = ["Personal Details", "Joining Day", "Training", "Department Introduction", "Feedback"]
+NOW = datetime(2025, 1, 1)
+FEEDBACK_MESSAGE = "Onboarding went smoothly; the buddy and training sessions helped a lot. " * 4
+
+
+def legacy_onboarding_analytics(db) -> dict:
+    """get_onboarding_analytics before SQL aggregation, kept as the baseline"""
+    from sqlalchemy.orm import joinedload
+    from app.models import Employee
+    from app.mcp_tools.onboarding_events import get_average_days_to_complete
+
+    employees = db.query(Employee).options(joinedload(Employee.tasks)).all()
+    total_employees = len(employees)
+    completed_employees = len([e for e in employees if e.status == "completed"])
+    task_stats = {}
+    for task_title in TASK_TITLES:
+        assigned_count = 0
+        completed_count = 0
+        for emp in employees:
+            task = next((t for t in emp.tasks if t.title == task_title), None)
+            if task:
+                assigned_count += 1
+                if task.status == "completed":
+                    completed_count += 1
+        task_stats[task_title] = {
+            "assigned": assigned_count,
+            "completed": completed_count,
+            "completion_rate": round((completed_count / assigned_count * 100) if assigned_count > 0 else 0, 1)
+        }
+    return {
+        "total_employees": total_employees,
+        "completed_employees": completed_employees,
+        "pending_employees": total_employees - completed_employees,
+        "completion_rate": round((completed_employees / total_employees * 100) if total_employees > 0 else 0, 1),
+        "task_statistics": task_stats,
+        # Was a hard-coded 7; the event log supplies it now and isn't what's being compared
+        "average_days_to_complete": get_average_days_to_complete(db=db)
+    }
+
+
+def legacy_departments_onboarding_stats(db) -> dict:
+    """get_department_onboarding_stats before SQL aggregation, called once per department"""
+    from app.models import Employee
+
+    stats = {}
+    for department in DEPARTMENTS:
+        employees = db.query(Employee).filter(Employee.department == department).all()
+        total = len(employees)
+        completed = len([e for e in employees if e.status == "completed"])
+        task_stats = {}
+        for task_title in TASK_TITLES:
+            completed_count = 0
+            for emp in employees:
+                # emp.tasks lazy-loads: one query per employee
+                task = next((t for t in emp.tasks if t.title == task_title), None)
+                if task and task.status == "completed":
+                    completed_count += 1
+            task_stats[task_title] = {
+                "completed": completed_count,
+                "total": total,
+                "rate": round((completed_count / total * 100) if total > 0 else 0, 1)
+            }
+        stats[department] = {
+            "department": department,
+            "total_employees": total,
+            "completed": completed,
+            "pending": total - completed,
+            "completion_rate": round((completed / total * 100) if total > 0 else 0, 1),
+            "task_stats": task_stats
+        }
+    return stats
+
+
+def legacy_feedback_summary(db) -> dict:
+    """get_feedback_summary before SQL aggregation (loads every row, message included)"""
+    from app.models import Feedback
+
+    feedbacks = db.query(Feedback).all()
+    if not feedbacks:
+        return {"total": 0, "average_rating": 0, "count": 0}
+    total = len(feedbacks)
+    rating_dist = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+    for fb in feedbacks:
+        rating_dist[fb.rating] = rating_dist.get(fb.rating, 0) + 1
+    return {
+        "total": total,
+        "average_rating": round(sum(f.rating for f in feedbacks) / total, 2),
+        "count": total,
+        "rating_distribution": rating_dist
+    }
+
+
+# Benchmarked name -> pre-aggregation baseline it must agree with
+LEGACY = {
+    "onboarding_analytics": legacy_onboarding_analytics,
+    "departments_onboarding_stats": legacy_departments_onboarding_stats,
+    "feedback_summary": legacy_feedback_summary,
+}
+
+
+# Cases the onboarding_stats snapshot answers, timed again after it is built
+SNAPSHOT_CASES = {"onboarding_analytics", "departments_onboarding_stats", "feedback_summary"}
+
+
+def cases() -> dict:
+    """Benchmarked functions, each called with an explicit session"""
+    from app.mcp_tools import task_tracker, onboarding_events
+
+    return {
+        "onboarding_analytics": lambda db: task_tracker.get_onboarding_analytics(db=db),
+        "departments_onboarding_stats": lambda db: task_tracker.get_departments_onboarding_stats(tuple(DEPARTMENTS), db=db),
+        "feedback_summary": lambda db: task_tracker.get_feedback_summary(db=db),
+        "feedback_summary_last_30d": lambda db: task_tracker.get_feedback_summary(NOW - timedelta(days=30), NOW, db=db),
+        "time_to_complete": lambda db: onboarding_events.get_time_to_complete(db=db),
+    }
+
+
+def seed(engine, employees: int, rng: random.Random, history_years: int):
+    """Bulk-insert `employees` synthetic employees with their onboarding tasks and event timeline"""
+    from app.database import Base
+    from app.models import Employee, Feedback, OnboardingEvent, Task
+
+    Base.metadata.create_all(bind=engine)
+    batch = 5000
+    with engine.begin() as conn:
+        for start in range(0, employees, batch):
+            employee_rows, task_rows, feedback_rows, event_rows = [], [], [], []
+            for i in range(start, min(start + batch, employees)):
+                emp_id = f"BENCH{i:06d}"
+                done = rng.randint(0, len(TASK_TITLES))
+                department = rng.choice(DEPARTMENTS)
+                employee_rows.append({
+                    "emp_id": emp_id,
+                    "name": f"Emp{i} Bench",
+                    "email": f"emp{i}@bench.example",
+                    "role": "Engineer",
+                    "department": department,
+                    "status": "completed" if done == len(TASK_TITLES) else "pending",
+                    "uuid_token": f"bench-token-{i:06d}"
+                })
+                for index, title in enumerate(TASK_TITLES):
+                    task_rows.append({
+                        "title": title,
+                        "assigned_to_id": emp_id,
+                        "status": "completed" if index < done else "pending"
+                    })
+                event_rows.extend(timeline(emp_id, department, done, rng, history_years))
+                if done == len(TASK_TITLES):
+                    feedback_rows.append({
+                        "employee_id": emp_id,
+                        "token": f"bench-token-{i:06d}",
+                        "message": FEEDBACK_MESSAGE,
+                        "rating": rng.randint(1, 5),
+                        "submitted_at": NOW - timedelta(days=rng.randint(0, 365))
+                    })
+            conn.execute(Employee.__table__.insert(), employee_rows)
+            conn.execute(Task.__table__.insert(), task_rows)
+            if feedback_rows:
+                conn.execute(Feedback.__table__.insert(), feedback_rows)
+            conn.execute(OnboardingEvent.__table__.insert(), event_rows)
+
+
+def timeline(emp_id: str, department: str, done: int, rng: random.Random, history_years: int) -> list:
+    """Event rows for one hire: every task assigned on the hire date, the first `done` completed in turn"""
+    hired = datetime.utcnow() - timedelta(days=rng.randint(30, 30 + 365 * history_years))
+    event = {"employee_id": emp_id, "department": department, "module_key": None, "status": None, "duration_seconds": None}
+    rows = [{**event, "event_type": "task_assigned", "task_title": title, "occurred_at": hired} for title in TASK_TITLES]
+    elapsed = 0
+    for title in TASK_TITLES[:done]:
+        elapsed += rng.randint(3600, 5 * 86400)
+        rows.append({**event, "event_type": "task_completed", "task_title": title, "duration_seconds": elapsed,
+                     "occurred_at": hired + timedelta(seconds=elapsed)})
+    if done == len(TASK_TITLES):
+        rows.append({**event, "event_type": "status_changed", "task_title": None, "status": "completed",
+                     "duration_seconds": elapsed, "occurred_at": hired + timedelta(seconds=elapsed)})
+    return rows
+
+
+def time_call(func, session_factory, repeats: int) -> tuple:
+    """Median wall time in ms over `repeats` calls (after one warm-up), and the last result"""
+    samples = []
+    result = None
+    for attempt in range(repeats + 1):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            result = func(db)
+            elapsed = (time.perf_counter() - started) * 1000
+        finally:
+            db.close()
+        if attempt:
+            samples.append(elapsed)
+    samples.sort()
+    return round(samples[len(samples) // 2], 2), result
+
+
+def run_size(employees: int, args, workdir: str) -> dict:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, f'analytics_{employees}.db')}")
+    seeded = time.perf_counter()
+    seed(engine, employees, random.Random(args.seed), args.history_years)
+    session_factory = sessionmaker(bind=engine)
+    row = {"employees": employees, "seed_s": round(time.perf_counter() - seeded, 1), "ms": {}}
+
+    live_results = {}
+    for name, func in cases().items():
+        row["ms"][name], live_results[name] = time_call(func, session_factory, args.repeats)
+        if name in LEGACY and employees <= args.legacy_max:
+            row["ms"][f"legacy_{name}"], legacy = time_call(LEGACY[name], session_factory, args.repeats)
+            if legacy != live_results[name]:
+                raise SystemExit(f"❌ {name} differs from the legacy result at {employees} employees")
+
+    # Same reads once the onboarding_stats snapshot exists (filtered feedback stays live)
+    from app.mcp_tools.onboarding_stats import rebuild
+    db = session_factory()
+    try:
+        rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    for name, func in cases().items():
+        if name in SNAPSHOT_CASES:
+            row["ms"][f"snapshot_{name}"], result = time_call(func, session_factory, args.repeats)
+            if result != live_results[name]:
+                raise SystemExit(f"❌ {name} from the snapshot differs from the live result at {employees} employees")
+    engine.dispose()
+    return row
+
+
+def print_report(rows: list):
+    names = sorted({name for row in rows for name in row["ms"]})
+    print(f"\n📊 HR analytics latency (median ms, {len(TASK_TITLES)} tasks per employee)")
+    print(f"   {'employees':<40}" + "".join(f"{row['employees']:>12}" for row in rows))
+    for name in names:
+        print(f"   {name:<40}" + "".join(f"{str(row['ms'].get(name, '-')):>12}" for row in rows))
+
+
+def check_gates(rows: list, args) -> list:
+    breaches = []
+    if args.max_ratio is not None and len(rows) > 1:
+        for name in rows[0]["ms"]:
+            if name.startswith("legacy_") or name not in rows[-1]["ms"]:
+                continue
+            ratio = rows[-1]["ms"][name] / max(rows[0]["ms"][name], 0.01)
+            if ratio > args.max_ratio:
+                breaches.append(f"{name} grew {ratio:.1f}x from {rows[0]['employees']} to {rows[-1]['employees']} employees (> {args.max_ratio}x)")
+    return breaches
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HR analytics scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000], help="employee counts to seed")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--legacy-max", type=int, default=20000, help="skip the legacy baseline above this many employees")
+    parser.add_argument("--history-years", type=int, default=3, help="spread hire dates (and their onboarding events) over this many years")
+    parser.add_argument("--max-ratio", type=float, help="fail if latency grows more than this from the smallest to the largest size")
+    parser.add_argument("--json", help="write the results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="supa-analytics-bench-")
+    # app.config needs a DATABASE_URL; every size gets its own engine below
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'unused.db')}"
+
+    rows = []
+    for employees in sorted(args.sizes):
+        print(f"⏳ {employees} employees...", flush=True)
+        rows.append(run_size(employees, args, workdir))
+    print_report(rows)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": rows, "config": {k: v for k, v in vars(args).items() if k != "json"}}, f, indent=2)
+        print(f"\n📝 Results written to {args.json}")
+
+    breaches = check_gates(rows, args)
+    if breaches:
+        print("\n❌ Thresholds breached:")
+        for breach in breaches:
+            print(f"   - {breach}")
+        sys.exit(1)
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Offline load benchmark for SUPA chat (POST /chatbot/chat).
+
+Seeds a throwaway SQLite database with synthetic employees, starts the stub
+Ollama server from fake_ollama.py, and drives the app in-process at a fixed
+concurrency across every page get_page_context handles. Prints latency
+percentiles, throughput, cache hit rate and per-stage timings; thresholds
+turn it into a CI gate (exit code 1 when a limit is breached).
+
+    cd backend
+    python benchmarks/chat_bench.py --employees 200 --requests 500 --concurrency 20
+    python benchmarks/chat_bench.py --latency-ms 300 --fail-rate 0.2 --max-p95-ms 2000 --json bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_ollama import FakeOllama, FAILURE_MODES
+
+EMPLOYEE_PAGES = ["personal", "dashboard", "joining-day", "training", "department-intro", "feedback", "pre-review"]
+HR_PAGES = ["hr-dashboard", "track-onboarding", "employee-details"]
+
+QUESTIONS = {
+    "personal": ["which documents do i need to upload", "is pan mandatory for onboarding", "how do i upload my bank proof"],
+    "dashboard": ["what tasks are pending on my dashboard", "how do i unlock the badge", "show my onboarding progress"],
+    "joining-day": ["what happens on joining day", "who is my manager for onboarding", "what documents should i bring on joining day"],
+    "training": ["which training modules are left", "how do i submit training proof", "what is my training progress"],
+    "department-intro": ["who is on my team", "who is my buddy during onboarding", "tell me about my department"],
+    "feedback": ["how do i edit my feedback", "can i resubmit onboarding feedback", "what should the feedback form include"],
+    "pre-review": ["what is on the final review page for onboarding", "is my onboarding completion ready for review", "which tasks are left before pre-review"],
+    "hr-dashboard": ["show onboarding analytics summary", "how many employees are pending", "give me a department stats overview for engineering department"],
+    "track-onboarding": ["list pending employees", "show completed employees", "what is the onboarding completion rate"],
+    "employee-details": ["show employee details summary", "search for emp1 details", "how many employees completed onboarding"],
+}
+
+DEPARTMENTS = ["Engineering", "Sales", "Marketing", "HR", "Finance", "Operations"]
+TASK_TITLES = ["Personal Details", "Joining Day", "Training", "Department Introduction", "Feedback"]
+LLM_ERROR_TEXT = "SUPA Chat encountered an error"
+
+
+def percentile(values: list, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+def configure_environment(args, workdir: str):
+    """Point the app at a throwaway DB and the stub Ollama before app.config is imported"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ["OLLAMA_TIMEOUT_SECONDS"] = str(args.timeout)
+    os.environ["LLM_DISPATCH_STRATEGY"] = args.strategy
+    os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY", "dummy")
+    os.environ["GEMINI_API_KEY"] = os.environ.get("GEMINI_API_KEY", "dummy")
+    if args.no_session_memory:
+        os.environ["CHAT_SESSION_MAX_TURNS"] = "0"
+
+
+def seed_database(employees: int, rng: random.Random) -> list:
+    """Create the schema and `employees` synthetic employees; returns their tokens"""
+    from app.database import Base, SessionLocal, engine
+    from app.models import Employee, EmployeePersonalInfo, Feedback, Task
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tokens = []
+    try:
+        for i in range(employees):
+            emp_id = f"BENCH{i:05d}"
+            token = f"bench-token-{i:05d}"
+            done = rng.randint(0, len(TASK_TITLES))
+            db.add(Employee(
+                emp_id=emp_id,
+                name=f"Emp{i} Bench",
+                email=f"emp{i}@bench.example",
+                role=rng.choice(["Engineer", "Analyst", "Designer", "Manager"]),
+                department=rng.choice(DEPARTMENTS),
+                status="completed" if done == len(TASK_TITLES) else "pending",
+                uuid_token=token,
+                folder_name=f"bench_{i:05d}"
+            ))
+            db.add(EmployeePersonalInfo(
+                employee_id=emp_id,
+                name=f"Emp{i} Bench",
+                email=f"emp{i}@bench.example",
+                mobile="9000000000",
+                aadhaar_number="123412341234" if rng.random() < 0.7 else None,
+                pan_number="ABCDE1234F" if rng.random() < 0.7 else None
+            ))
+            for index, title in enumerate(TASK_TITLES):
+                db.add(Task(title=title, assigned_to_id=emp_id, status="completed" if index < done else "pending"))
+            if done == len(TASK_TITLES):
+                db.add(Feedback(employee_id=emp_id, token=token, message="Smooth onboarding", rating=rng.randint(3, 5)))
+            tokens.append(token)
+        db.commit()
+    finally:
+        db.close()
+    return tokens
+
+
+def build_workload(requests: int, tokens: list, rng: random.Random) -> list:
+    """Round-robin over every page so each one is exercised evenly"""
+    pages = EMPLOYEE_PAGES + HR_PAGES
+    workload = []
+    for i in range(requests):
+        page = pages[i % len(pages)]
+        token = page if page in HR_PAGES else rng.choice(tokens)
+        request = {"message": rng.choice(QUESTIONS[page]), "token": token, "page": page}
+        if page not in HR_PAGES:
+            # One browser tab per employee, as the frontend sends it
+            request["session_id"] = f"tab-{token}"
+        workload.append(request)
+    return workload
+
+
+async def drive(app, workload: list, concurrency: int) -> tuple:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as client:
+        async def one(payload: dict):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/chatbot/chat", json=payload)
+                    body = response.json() if response.status_code == 200 else {}
+                    status = response.status_code
+                except Exception as e:
+                    body, status = {"error": str(e)}, 0
+                results.append({
+                    "page": payload["page"],
+                    "status": status,
+                    "ms": (time.perf_counter() - started) * 1000,
+                    "model_used": body.get("model_used"),
+                    "llm_error": LLM_ERROR_TEXT in body.get("response", "")
+                })
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(payload) for payload in workload))
+        elapsed = time.perf_counter() - started
+        timings = (await client.get("/chatbot/timings")).json()
+        cache = (await client.get("/chatbot/cache/stats")).json()
+        llm = (await client.get("/chatbot/llm/stats")).json()
+        pool = (await client.get("/db/pool/stats")).json()
+    return results, elapsed, timings, cache, llm, pool
+
+
+def summarize(results: list, elapsed: float, timings: dict, cache: dict, llm: dict, pool: dict, fake: FakeOllama) -> dict:
+    latencies = [r["ms"] for r in results]
+    errors = [r for r in results if r["status"] != 200 or r["llm_error"]]
+    per_page = {}
+    for page in EMPLOYEE_PAGES + HR_PAGES:
+        page_ms = [r["ms"] for r in results if r["page"] == page]
+        per_page[page] = {"requests": len(page_ms), "p50_ms": percentile(page_ms, 50), "p95_ms": percentile(page_ms, 95)}
+    return {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(max(latencies), 1) if latencies else None
+        },
+        "cache_hit_rate": round(sum(1 for r in results if r["model_used"] == "cached") / len(results), 3) if results else 0.0,
+        "faq_hit_rate": round(sum(1 for r in results if r["model_used"] == "faq") / len(results), 3) if results else 0.0,
+        "error_rate": round(len(errors) / len(results), 3) if results else 0.0,
+        "models_used": {m: sum(1 for r in results if r["model_used"] == m) for m in sorted({str(r["model_used"]) for r in results})},
+        "per_page": per_page,
+        "stages_p50_ms": {name: stats["p50"] for name, stats in timings.get("metrics", {}).items()},
+        "stages_p95_ms": {name: stats["p95"] for name, stats in timings.get("metrics", {}).items()},
+        "response_cache": cache.get("chat_responses", {}),
+        "single_flight": llm.get("single_flight", {}),
+        "db_pool": pool,
+        "fake_ollama": fake.stats()
+    }
+
+
+def print_report(summary: dict):
+    latency = summary["latency_ms"]
+    print(f"\n📊 SUPA chat benchmark: {summary['requests']} requests in {summary['elapsed_s']}s")
+    print(f"   throughput      {summary['throughput_rps']} req/s")
+    print(f"   latency (ms)    p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    print(f"   cache hit rate  {summary['cache_hit_rate']:.1%}")
+    print(f"   faq hit rate    {summary['faq_hit_rate']:.1%}")
+    print(f"   error rate      {summary['error_rate']:.1%}")
+    print(f"   models used     {summary['models_used']}")
+    print(f"   fake ollama     {summary['fake_ollama']}")
+    print(f"   db pool         {summary['db_pool']}")
+    print("\n   page                 reqs    p50 ms    p95 ms")
+    for page, stats in summary["per_page"].items():
+        print(f"   {page:<20} {stats['requests']:>4} {str(stats['p50_ms']):>9} {str(stats['p95_ms']):>9}")
+    print("\n   stage                p50 ms    p95 ms")
+    for stage, p50 in summary["stages_p50_ms"].items():
+        print(f"   {stage:<20} {str(p50):>6} {str(summary['stages_p95_ms'][stage]):>9}")
+
+
+def check_thresholds(summary: dict, args) -> list:
+    breaches = []
+    if args.max_p95_ms is not None and summary["latency_ms"]["p95"] > args.max_p95_ms:
+        breaches.append(f"p95 {summary['latency_ms']['p95']} ms > {args.max_p95_ms} ms")
+    if args.min_rps is not None and summary["throughput_rps"] < args.min_rps:
+        breaches.append(f"throughput {summary['throughput_rps']} req/s < {args.min_rps} req/s")
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        breaches.append(f"error rate {summary['error_rate']} > {args.max_error_rate}")
+    if summary["db_pool"].get("checked_out"):
+        breaches.append(f"{summary['db_pool']['checked_out']} DB connections still checked out after the run")
+    return breaches
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline SUPA chat benchmark")
+    parser.add_argument("--employees", type=int, default=100, help="synthetic employees to seed")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--strategy", choices=["sequential", "hedged", "race"], default="sequential")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Ollama request timeout (s)")
+    parser.add_argument("--no-session-memory", action="store_true", help="benchmark stateless chat")
+    parser.add_argument("--deadline-s", type=float, default=300, help="fail if the run takes longer than this")
+    # Stub Ollama
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--failure-mode", choices=FAILURE_MODES, default="http_500")
+    # CI gates
+    parser.add_argument("--max-p95-ms", type=float)
+    parser.add_argument("--min-rps", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--json", help="write the summary to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="supa-bench-")
+    configure_environment(args, workdir)
+
+    import logging
+    # Injected failures would otherwise flood the report with per-request errors
+    logging.disable(logging.ERROR)
+
+    tokens = seed_database(args.employees, rng)
+    fake = FakeOllama(
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        fail_rate=args.fail_rate,
+        failure_mode=args.failure_mode,
+        seed=args.seed
+    ).start()
+
+    import app.mcp_tools.prompt_builder as prompt_builder
+    from app.main import app, on_startup, on_shutdown
+
+    # build_prompt prints every prompt; keep the report readable
+    prompt_builder.print = lambda *a, **k: None
+    on_startup()
+
+    async def run():
+        try:
+            return await drive(app, build_workload(args.requests, tokens, rng), args.concurrency)
+        finally:
+            await on_shutdown()
+
+    # The app shares one event loop with the driver, so a blocking call inside a
+    # request (e.g. waiting on an exhausted DB pool) stalls everything; run it on
+    # a worker thread so a stuck benchmark fails the CI job instead of hanging it.
+    outcome = {}
+
+    def worker():
+        try:
+            outcome["result"] = asyncio.run(run())
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    thread.join(timeout=args.deadline_s)
+    fake.stop()
+    if thread.is_alive():
+        from app.database import engine
+        print(f"\n❌ Benchmark did not finish within {args.deadline_s}s — the event loop is blocked")
+        print(f"   DB pool: {engine.pool.status()}")
+        sys.stdout.flush()
+        os._exit(2)
+    if "error" in outcome:
+        raise outcome["error"]
+
+    results, elapsed, timings, cache, llm, pool = outcome["result"]
+    summary = summarize(results, elapsed, timings, cache, llm, pool, fake)
+    summary["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n📝 Summary written to {args.json}")
+
+    breaches = check_thresholds(summary, args)
+    if breaches:
+        print("\n❌ Benchmark thresholds breached:\n   " + "\n   ".join(breaches))
+        sys.exit(1)
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
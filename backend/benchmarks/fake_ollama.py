@@ -0,0 +1,162 @@
+"""
+Stub Ollama server for offline benchmarks.
+
+Implements the subset of POST /api/generate that SUPA chat uses, with
+configurable latency, NDJSON streaming and failure injection, so chat
+throughput can be measured without a GPU or real models.
+
+    python benchmarks/fake_ollama.py --port 11435 --latency-ms 800 --fail-rate 0.1
+
+or start it in-process with FakeOllama(...).start().
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+ANSWER = (
+    "- Complete the pending modules on your Dashboard, starting with Personal Details.\n"
+    "- Keep your Aadhaar, PAN and bank proof ready to upload.\n"
+    "- Your buddy and manager are listed on the Department Introduction page.\n"
+    "- Open the Final Review card once all 5 tasks are done."
+)
+
+# How an injected failure shows up to the client
+FAILURE_MODES = ("http_500", "timeout", "stream_error")
+
+
+class FakeOllama:
+    def __init__(
+        self,
+        port: int = 11435,
+        latency_ms: float = 500,
+        jitter_ms: float = 100,
+        model_latency_ms: dict = None,
+        fail_rate: float = 0.0,
+        failure_mode: str = "http_500",
+        tokens_per_sec: float = 40.0,
+        seed: int = 7
+    ):
+        if failure_mode not in FAILURE_MODES:
+            raise ValueError(f"Unknown failure mode '{failure_mode}', expected one of {FAILURE_MODES}")
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.model_latency_ms = model_latency_ms or {}
+        self.fail_rate = fail_rate
+        self.failure_mode = failure_mode
+        self.tokens_per_sec = tokens_per_sec
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+        # (model, system) pairs already "loaded", to mimic prompt-prefix caching
+        self._warm = set()
+        self._server = None
+        self._thread = None
+        self.app = Starlette(routes=[Route("/api/generate", self.generate, methods=["POST"])])
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _latency(self, model: str) -> float:
+        base = self.model_latency_ms.get(model, self.latency_ms)
+        return max(0.0, base + self.random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def _usage(self, body: dict, seconds: float) -> dict:
+        system = body.get("system", "")
+        key = (body.get("model"), system)
+        cached_prefix = key in self._warm
+        self._warm.add(key)
+        eval_count = len(ANSWER) // 4
+        return {
+            "prompt_eval_count": (0 if cached_prefix else len(system) // 4) + len(body.get("prompt", "")) // 4,
+            "eval_count": eval_count,
+            "eval_duration": int(eval_count / self.tokens_per_sec * 1e9),
+            "total_duration": int(seconds * 1e9)
+        }
+
+    async def generate(self, request):
+        body = await request.json()
+        self.calls += 1
+        delay = self._latency(body.get("model", ""))
+        fail = self.random.random() < self.fail_rate
+        if fail:
+            self.failures += 1
+
+        if fail and self.failure_mode == "timeout":
+            # Hang well past any client timeout
+            await asyncio.sleep(max(60.0, delay))
+        if fail and self.failure_mode == "http_500":
+            await asyncio.sleep(delay / 4)
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+
+        if body.get("stream"):
+            return StreamingResponse(self._stream(body, delay, fail), media_type="application/x-ndjson")
+
+        await asyncio.sleep(delay)
+        return JSONResponse({"model": body.get("model"), "response": ANSWER, "done": True, **self._usage(body, delay)})
+
+    async def _stream(self, body: dict, delay: float, fail: bool):
+        words = ANSWER.split(" ")
+        step = delay / len(words)
+        for index, word in enumerate(words):
+            await asyncio.sleep(step)
+            if fail and index == len(words) // 2:
+                yield json.dumps({"error": "injected failure"}) + "\n"
+                return
+            yield json.dumps({"model": body.get("model"), "response": word + " ", "done": False}) + "\n"
+        yield json.dumps({"model": body.get("model"), "response": "", "done": True, **self._usage(body, delay)}) + "\n"
+
+    def start(self):
+        """Serve on a background thread; returns once the port accepts requests"""
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Fake Ollama did not start on port {self.port}")
+            time.sleep(0.05)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "injected_failures": self.failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Ollama server for SUPA chat benchmarks")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--failure-mode", choices=FAILURE_MODES, default="http_500")
+    parser.add_argument("--tokens-per-sec", type=float, default=40.0)
+    args = parser.parse_args()
+
+    fake = FakeOllama(
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        fail_rate=args.fail_rate,
+        failure_mode=args.failure_mode,
+        tokens_per_sec=args.tokens_per_sec
+    )
+    uvicorn.run(fake.app, host="127.0.0.1", port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Rebuild the onboarding_stats snapshot from the raw tables and report drift.
+
+The snapshot is kept in step by the app's own writes; anything that changes
+employees, tasks or feedback behind its back (other scripts, manual SQL)
+makes it drift. Run this after such changes, or on a schedule:
+
+    python scripts/reconcile_onboarding_stats.py           # report drift and rebuild
+    python scripts/reconcile_onboarding_stats.py --check   # report only; exit 1 on drift
+"""
+import argparse
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, SessionLocal, engine
+from app.mcp_tools.onboarding_stats import reconcile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile the onboarding_stats snapshot")
+    parser.add_argument("--check", action="store_true", help="only report drift, don't rebuild")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        report = reconcile(db, fix=not args.check)
+    finally:
+        db.close()
+
+    if not report["built"]:
+        print("⚠️  Snapshot had not been built yet")
+    if report["drift"]:
+        print(f"🔍 {len(report['drift'])} counters drifted:")
+        for row in report["drift"]:
+            where = f"{row['scope']}/{row['department']}/{row['key']}" if row["department"] else f"{row['scope']}/{row['key']}"
+            print(f"   {where}: snapshot {row['snapshot']} → actual {row['actual']}")
+    else:
+        print(f"✅ No drift across {report['counters']} counters")
+
+    if report["rebuilt"]:
+        print("🔄 Snapshot rebuilt from raw tables")
+    elif report["drift"] or not report["built"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Refresh the daily onboarding rollups behind /hr/analytics/cohorts.
+
+Run it from cron (the app's background refresh is off unless
+ONBOARDING_ROLLUP_INTERVAL_SECONDS is set on one worker, and runs must not
+overlap), or with --full to rebuild every day after editing onboarding_events
+by hand:
+
+    */15 * * * * cd /path/to/backend && flock -n /tmp/onboarding_rollups.lock python scripts/refresh_onboarding_rollups.py
+
+    python scripts/refresh_onboarding_rollups.py                    # from the last day rolled up
+    python scripts/refresh_onboarding_rollups.py --since 2025-01-01
+    python scripts/refresh_onboarding_rollups.py --full
+"""
+import argparse
+import sys
+import os
+from datetime import date
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, SessionLocal, engine
+from app.models import OnboardingRollup
+from app.mcp_tools.onboarding_rollups import refresh_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the daily onboarding rollups")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--since", type=date.fromisoformat, help="recompute from this day (YYYY-MM-DD)")
+    group.add_argument("--full", action="store_true", help="drop every rollup and rebuild from the first event")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.full:
+            # With no rollups left, the refresh starts at the first event
+            db.query(OnboardingRollup).delete(synchronize_session=False)
+            db.commit()
+        result = refresh_rollups(db, args.since)
+    finally:
+        db.close()
+
+    if not result["days"]:
+        print("⚠️  No onboarding events to roll up yet")
+        return
+    print(f"✅ Rolled up {result['days']} days ({result['from']} → {result['through']}): {result['rows']} rows")
+
+
+if __name__ == "__main__":
+    main()
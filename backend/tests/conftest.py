@@ -0,0 +1,27 @@
+"""
+Shared test setup: a throwaway SQLite database (never novabot.db), chosen
+before any app module reads settings.
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="onboarding-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app import models  # noqa: F401,E402  (registers the tables)
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, dropped again afterwards"""
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
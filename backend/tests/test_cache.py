@@ -0,0 +1,88 @@
+import types
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+def test_entry_expires_after_its_ttl(clock):
+    cache = TTLCache("t", ttl_seconds=10)
+    cache.set("a", "1")
+    clock.now += 9.9
+    assert cache.get("a") == "1"
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_per_entry_ttl_overrides_the_default(clock):
+    cache = TTLCache("t", ttl_seconds=10)
+    cache.set("short", "1", ttl=1)
+    cache.set("long", "2")
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.get("long") == "2"
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache("t", max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # b is now the least recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_go_before_live_ones(clock):
+    cache = TTLCache("t", max_entries=2, ttl_seconds=10)
+    cache.set("old", "1", ttl=1)
+    cache.set("b", "2")
+    clock.now += 2
+    cache.set("c", "3")
+    stats = cache.stats()
+    assert (stats["expirations"], stats["evictions"]) == (1, 0)
+    assert cache.get("b") == "2"
+    assert cache.get("c") == "3"
+
+
+def test_memory_cap_evicts_and_skips_oversized_entries(clock):
+    entry = cache_module._sizeof("k0") + cache_module._sizeof("x" * 100)
+    cache = TTLCache("t", max_entries=100, max_bytes=entry * 2)
+    for i in range(3):
+        cache.set(f"k{i}", "x" * 100)
+    assert len(cache) == 2
+    assert cache.get("k0") is None
+    assert cache.stats()["bytes"] <= entry * 2
+
+    cache.set("huge", "x" * (entry * 3))
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test_overwriting_a_key_keeps_the_byte_count_exact(clock):
+    cache = TTLCache("t")
+    cache.set("a", "x" * 10)
+    cache.set("a", "y" * 50)
+    assert cache.stats()["bytes"] == cache_module._sizeof("a") + cache_module._sizeof("y" * 50)
+    cache.delete("a")
+    assert cache.stats()["bytes"] == 0
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app import chat_api
+from app.chat_api import StreamTrimmer, trim_response
+
+ANSWERS = [
+    "- a\n\n- b\n\n- c\n\n- d",
+    "Dear Priya,\n\nYour next task is Training.\nThank you!",
+    "\n\n  Joining day starts at 10 AM.  \n\n\n\nBring your NDA.\n",
+    "1. one\n2. two\n3. three\n4. four\n5. five",
+    "a\n\n\n\n\nb",
+    "- a\n\n\n- b\n   \n- c\nLet me know if you need anything\n- d\n- e",
+    "- Aadhaar card\n\n- PAN card\n\n- Bank proof\n\n- Signed NDA",
+    "Bring your ID card.\n\n\n\n\nArrive by 10 AM.",
+]
+# /chat rejects answers under 20 characters, so only longer ones go through both endpoints
+LONG_ANSWERS = [answer for answer in ANSWERS if len(answer) >= 20]
+
+
+def fragments(text: str, size: int) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+def stream(text: str, size: int) -> tuple:
+    """(what the live display showed, what would be cached) for one chunking of `text`"""
+    trimmer = StreamTrimmer()
+    shown = ""
+    for fragment in fragments(text, size):
+        shown += trimmer.feed(fragment)
+        if trimmer.full:
+            break
+    shown += trimmer.finish()
+    return shown, trimmer.text
+
+
+@pytest.mark.parametrize("answer", ANSWERS)
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_stream_trimmer_matches_trim_response(answer, size):
+    shown, cached = stream(answer, size)
+    assert cached == trim_response(answer)
+    assert shown == cached
+
+
+class FakeOllama:
+    def __init__(self, answer: str):
+        self.answer = answer
+
+    async def generate(self, model, prompt, **kwargs):
+        return self.answer
+
+    async def stream_generate(self, model, prompt, **kwargs):
+        for fragment in fragments(self.answer, 4):
+            yield fragment
+
+
+@pytest.mark.parametrize("answer", LONG_ANSWERS)
+def test_chat_and_stream_produce_the_same_answer(monkeypatch, answer):
+    fake = FakeOllama(answer)
+    monkeypatch.setattr(chat_api.llm_dispatcher, "client", fake)
+    monkeypatch.setattr(chat_api, "ollama_client", fake)
+    parts = {"system": "system", "prompt": "question"}
+
+    async def both():
+        batch_text, _, _ = await chat_api.generate_llm_response(parts)
+        events = [event async for event in chat_api.stream_llm_response(parts)]
+        return batch_text, events
+
+    batch_text, events = asyncio.run(both())
+    kind, (stream_text, model) = events[-1]
+    assert kind == "done"
+    assert stream_text == batch_text
+    assert "".join(text for kind, text in events[:-1]) == batch_text
@@ -0,0 +1,127 @@
+import asyncio
+import types
+
+import httpx
+import pytest
+
+from app.mcp_tools.llm_dispatch import LLMDispatcher
+from app.utils import circuit_breaker as breaker_module
+from app.utils.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(breaker_module, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+def tripped(clock) -> CircuitBreaker:
+    breaker = CircuitBreaker("m", failure_rate_threshold=0.5, min_calls=4, window=10, cooldown_seconds=30)
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_opens_only_once_min_calls_are_in_the_window(clock):
+    breaker = CircuitBreaker("m", failure_rate_threshold=0.5, min_calls=4)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_stays_closed_below_the_failure_rate(clock):
+    breaker = CircuitBreaker("m", failure_rate_threshold=0.5, min_calls=4)
+    for outcome in [True, True, False, True, False, True]:
+        breaker.record_success() if outcome else breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_open_rejects_until_the_cooldown_ends(clock):
+    breaker = tripped(clock)
+    clock.now += 29
+    assert not breaker.allow()
+    assert not breaker.is_available()
+    clock.now += 1
+    assert breaker.is_available()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+
+
+def test_half_open_allows_one_probe_at_a_time(clock):
+    breaker = tripped(clock)
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_successful_probe_closes_with_a_clean_window(clock):
+    breaker = tripped(clock)
+    clock.now += 30
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["failure_rate"] == 0.0
+    # One new failure doesn't re-open it: the old failures were forgotten
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_for_another_cooldown(clock):
+    breaker = tripped(clock)
+    clock.now += 30
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["times_opened"] == 2
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_cancelled_probe_frees_the_slot_without_a_verdict(clock):
+    breaker = tripped(clock)
+    clock.now += 30
+    breaker.allow()
+    breaker.record_cancel()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+class TimingOut:
+    async def generate(self, model, prompt, timeout=None, **kwargs):
+        raise httpx.ReadTimeout("deadline")
+
+
+def dispatch_many(dispatcher: LLMDispatcher, timeout: float, times: int = 6):
+    async def scenario():
+        for _ in range(times):
+            await dispatcher.dispatch("p", ["m"], accept=bool, timeout=timeout)
+    asyncio.run(scenario())
+
+
+def test_short_deadline_timeouts_do_not_trip_the_breaker():
+    dispatcher = LLMDispatcher(client=TimingOut(), breaker_options={"min_calls": 4}, min_breaker_timeout=15)
+    dispatch_many(dispatcher, timeout=6)
+    assert dispatcher.breaker("m").state == CLOSED
+    assert dispatcher.model_stats("m").snapshot()["failures"] == 0
+
+
+def test_full_budget_timeouts_trip_the_breaker():
+    dispatcher = LLMDispatcher(client=TimingOut(), breaker_options={"min_calls": 4}, min_breaker_timeout=15)
+    dispatch_many(dispatcher, timeout=30)
+    assert dispatcher.breaker("m").state == OPEN
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import models
+from app.database import get_db
+from app.routes import employee
+
+DEPARTMENTS = ["Sales", None, "Engineering", None, "HR", "Sales", None, "Engineering"]
+STATUSES = ["pending", "completed", None]
+
+
+@pytest.fixture
+def client(db):
+    for i in range(25):
+        db.add(models.Employee(
+            emp_id=f"E{i:03d}",
+            name=None if i % 7 == 3 else f"Name {i % 5}",  # duplicate and missing names
+            role="Engineer",
+            department=DEPARTMENTS[i % len(DEPARTMENTS)],
+            status=STATUSES[i % len(STATUSES)],
+        ))
+    db.flush()
+    # An explicit None status still gets the column default on insert
+    db.query(models.Employee).filter(models.Employee.emp_id.in_(
+        [f"E{i:03d}" for i in range(25) if STATUSES[i % len(STATUSES)] is None]
+    )).update({models.Employee.status: None}, synchronize_session=False)
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(employee.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def page_through(client, sort: str, limit: int) -> list:
+    items, cursor = [], None
+    while True:
+        params = {"sort": sort, "limit": limit, "fields": "emp_id,name,department,status"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/employees", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        items += body["items"]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return items
+
+
+def expected_order(items: list, field: str, descending: bool) -> list:
+    present = sorted((item for item in items if item[field] is not None),
+                     key=lambda item: (item[field], item["emp_id"]), reverse=descending)
+    missing = sorted((item for item in items if item[field] is None),
+                     key=lambda item: item["emp_id"], reverse=descending)
+    return [item["emp_id"] for item in present + missing]
+
+
+@pytest.mark.parametrize("sort", ["emp_id", "-emp_id", "name", "-name", "department", "-department", "status", "-status"])
+@pytest.mark.parametrize("limit", [1, 4, 7, 100])
+def test_pages_cover_every_row_once_with_nulls_last(client, sort, limit):
+    items = page_through(client, sort, limit)
+    ids = [item["emp_id"] for item in items]
+    assert any(item[sort.lstrip("-")] is None for item in items) or sort.lstrip("-") == "emp_id"
+    assert len(ids) == len(set(ids)) == 25
+    assert ids == expected_order(items, sort.lstrip("-"), sort.startswith("-"))
+
+
+def test_filters_apply_to_every_page(client):
+    response = client.get("/employees", params={"sort": "name", "limit": 2, "status": "pending"})
+    seen = response.json()["items"]
+    while response.json()["next_cursor"]:
+        response = client.get("/employees", params={
+            "sort": "name", "limit": 2, "status": "pending", "cursor": response.json()["next_cursor"]
+        })
+        seen += response.json()["items"]
+    assert {item["status"] for item in seen} == {"pending"}
+    assert len(seen) == 9
+
+
+def test_cursor_from_another_sort_is_rejected(client):
+    cursor = client.get("/employees", params={"sort": "name", "limit": 1}).json()["next_cursor"]
+    response = client.get("/employees", params={"sort": "department", "limit": 1, "cursor": cursor})
+    assert response.status_code == 400
+    assert client.get("/employees", params={"cursor": "not-a-cursor"}).status_code == 400
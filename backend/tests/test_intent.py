@@ -0,0 +1,108 @@
+import random
+import re
+
+import pytest
+
+from app.mcp_tools import intent
+from app.mcp_tools.intent import (
+    KeywordAutomaton, classify_message, detect_policy_topic, extract_search_query,
+    is_hr_query, is_onboarding_related
+)
+
+MESSAGES = [
+    "When is my joining day?",
+    "what documents do i upload for PAN",
+    "how many employees are pending in engineering department",
+    "show me the completion rate breakdown",
+    "search for priya in sales",
+    "find employee rahul",
+    "list completed employees",
+    "is my leave policy the same as the work from home policy",
+    "can I claim travel expenses",
+    "who is my buddy",
+    "tell me a joke",
+    "what's the capital of france",
+    "I was late and absent, what about my salary?",
+    "my laptop VPN is slow",
+    "ship it",  # "ip" inside a word is not the IP policy
+    "hr department stats",
+    "not completed tasks",
+    "are we done",
+    "Performance review and rating cycle",
+    "",
+]
+
+
+# The rules the automaton replaced: plain substring checks, word-bounded policy keywords
+
+def reference_topic(message: str) -> str:
+    msg = message.lower()
+    for topic, keywords in intent.POLICY_TOPIC_KEYWORDS:
+        if any(re.search(rf"\b{kw}\b", msg) for kw in keywords):
+            return topic
+    return intent.DEFAULT_POLICY_TOPIC
+
+
+def reference_search(message: str) -> dict:
+    msg = message.lower()
+    if "search for" in msg:
+        words = msg.split("search for")[1].strip().split()
+        if words:
+            return {"type": "search_employee", "query": words[0]}
+    if "department" in msg:
+        for dept in intent.DEPARTMENT_KEYWORDS:
+            if dept in msg:
+                return {"type": "department_stats", "department": dept.capitalize()}
+    if "pending" in msg or "not completed" in msg:
+        return {"type": "status_filter", "status": "pending"}
+    if "completed" in msg or "done" in msg:
+        return {"type": "status_filter", "status": "completed"}
+    return {"type": "general"}
+
+
+@pytest.mark.parametrize("message", MESSAGES)
+def test_classification_matches_the_original_keyword_rules(message):
+    msg = message.lower()
+    assert is_onboarding_related(message) == any(kw in msg for kw in intent.ONBOARDING_KEYWORDS)
+    assert is_hr_query(message) == any(kw in msg for kw in intent.HR_KEYWORDS)
+    assert detect_policy_topic(message) == reference_topic(message)
+    assert extract_search_query(message) == reference_search(message)
+
+
+def test_policy_keywords_need_word_boundaries():
+    assert detect_policy_topic("ship it") == intent.DEFAULT_POLICY_TOPIC
+    assert detect_policy_topic("who owns the IP?") == "Confidentiality and Intellectual Property"
+    assert detect_policy_topic("translate this") == intent.DEFAULT_POLICY_TOPIC
+
+
+def test_first_topic_in_table_order_wins():
+    # Attendance is listed before Compensation
+    assert detect_policy_topic("late salary") == "Work Hours and Attendance"
+    assert classify_message("late salary")["policy_scores"] == {
+        "Work Hours and Attendance": 1, "Compensation and Benefits": 1
+    }
+
+
+def test_search_for_at_the_end_falls_through():
+    assert extract_search_query("search for") == {"type": "general"}
+
+
+def brute_force(keywords, text) -> list:
+    return sorted(
+        (start, kw) for kw in set(keywords)
+        for start in range(len(text)) if text.startswith(kw, start)
+    )
+
+
+def test_automaton_reports_every_overlapping_match():
+    keywords = ["he", "she", "his", "hers", "her", "s"]
+    assert sorted(KeywordAutomaton(keywords).find_all("ushers")) == brute_force(keywords, "ushers")
+
+
+def test_automaton_agrees_with_brute_force_on_random_text():
+    rng = random.Random(7)
+    keywords = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(12)]
+    automaton = KeywordAutomaton(keywords)
+    for _ in range(200):
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 20)))
+        assert sorted(automaton.find_all(text)) == brute_force(keywords, text)
@@ -0,0 +1,98 @@
+import pytest
+
+from app import models
+from app.database import SessionLocal
+from app.dependencies import change_employee_status, mark_task_completed
+from app.mcp_tools import onboarding_stats, onboarding_events
+
+
+@pytest.fixture
+def seeded(db):
+    db.add(models.Employee(emp_id="E1", name="Asha", role="Engineer", department="Sales", status="pending"))
+    db.add(models.Task(id=1, title="Training", assigned_to_id="E1", status="pending"))
+    db.commit()
+    onboarding_stats.rebuild(db)
+    db.commit()
+    return db
+
+
+@pytest.fixture
+def other_session(seeded):
+    """A second request working from the same (soon stale) reads"""
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def counter(db, scope, key, department=""):
+    return onboarding_stats._stored_counters(db).get((scope, department, key), 0)
+
+
+def events(db, event_type) -> int:
+    return db.query(models.OnboardingEvent).filter(models.OnboardingEvent.event_type == event_type).count()
+
+
+def assert_no_drift(db):
+    assert onboarding_stats.reconcile(db, fix=False)["drift"] == []
+
+
+def test_concurrent_task_completions_count_once(seeded, other_session):
+    first = seeded.get(models.Task, 1)
+    second = other_session.get(models.Task, 1)
+    assert first.status == second.status == "pending"
+
+    assert mark_task_completed(seeded, first, "Sales")
+    seeded.commit()
+    assert not mark_task_completed(other_session, second, "Sales")
+    other_session.commit()
+
+    seeded.expire_all()
+    assert counter(seeded, onboarding_stats.TASK_COMPLETED, "Training") == 1
+    assert counter(seeded, onboarding_stats.DEPARTMENT_TASK_COMPLETED, "Training", "Sales") == 1
+    assert events(seeded, onboarding_events.TASK_COMPLETED) == 1
+    assert_no_drift(seeded)
+
+
+def test_completing_an_already_completed_task_is_a_no_op(seeded):
+    task = seeded.get(models.Task, 1)
+    assert mark_task_completed(seeded, task, "Sales")
+    seeded.commit()
+    assert not mark_task_completed(seeded, task, "Sales")
+    seeded.commit()
+    assert counter(seeded, onboarding_stats.TASK_COMPLETED, "Training") == 1
+    assert_no_drift(seeded)
+
+
+def test_status_change_moves_away_from_the_status_really_replaced(seeded, other_session):
+    first = seeded.get(models.Employee, "E1")
+    second = other_session.get(models.Employee, "E1")
+
+    change_employee_status(seeded, first, "in_progress")
+    seeded.commit()
+    # Still believes the employee is pending; must retry from in_progress
+    change_employee_status(other_session, second, "completed")
+    other_session.commit()
+
+    seeded.expire_all()
+    assert counter(seeded, onboarding_stats.STATUS, "pending") == 0
+    assert counter(seeded, onboarding_stats.STATUS, "in_progress") == 0
+    assert counter(seeded, onboarding_stats.STATUS, "completed") == 1
+    assert counter(seeded, onboarding_stats.DEPARTMENT_STATUS, "completed", "Sales") == 1
+    assert events(seeded, onboarding_events.STATUS_CHANGED) == 2
+    assert_no_drift(seeded)
+
+
+def test_same_status_from_two_requests_is_recorded_once(seeded, other_session):
+    first = seeded.get(models.Employee, "E1")
+    second = other_session.get(models.Employee, "E1")
+
+    change_employee_status(seeded, first, "completed")
+    seeded.commit()
+    change_employee_status(other_session, second, "completed")
+    other_session.commit()
+
+    seeded.expire_all()
+    assert counter(seeded, onboarding_stats.STATUS, "completed") == 1
+    assert counter(seeded, onboarding_stats.STATUS, "pending") == 0
+    assert events(seeded, onboarding_events.STATUS_CHANGED) == 1
+    assert_no_drift(seeded)
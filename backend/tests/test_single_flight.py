@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+class Upstream:
+    """A slow call whose start and cancellation are observable"""
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = False
+        self.release = None
+
+    async def call(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+            return "answer"
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flight, upstream = SingleFlight("t"), Upstream()
+        upstream.release = asyncio.Event()
+        waiters = [asyncio.ensure_future(flight.do("k", upstream.call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*waiters)
+        return flight, upstream, results
+
+    flight, upstream, results = run(scenario())
+    assert results == ["answer"] * 3
+    assert upstream.started == 1
+    assert (flight.calls, flight.coalesced) == (1, 2)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_call_survives_while_any_waiter_remains():
+    async def scenario():
+        flight, upstream = SingleFlight("t"), Upstream()
+        upstream.release = asyncio.Event()
+        first = asyncio.ensure_future(flight.do("k", upstream.call))
+        second = asyncio.ensure_future(flight.do("k", upstream.call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        cancelled_early = upstream.cancelled
+        upstream.release.set()
+        return cancelled_early, await second, first.cancelled()
+
+    cancelled_early, result, first_cancelled = run(scenario())
+    assert not cancelled_early
+    assert result == "answer"
+    assert first_cancelled
+
+
+def test_last_waiter_leaving_cancels_the_call():
+    async def scenario():
+        flight, upstream = SingleFlight("t"), Upstream()
+        upstream.release = asyncio.Event()
+        waiters = [asyncio.ensure_future(flight.do("k", upstream.call)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        return flight, upstream
+
+    flight, upstream = run(scenario())
+    assert upstream.cancelled
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_new_call_after_a_cancelled_one_starts_fresh():
+    async def scenario():
+        flight, upstream = SingleFlight("t"), Upstream()
+        upstream.release = asyncio.Event()
+        waiter = asyncio.ensure_future(flight.do("k", upstream.call))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+        upstream.release.set()
+        return upstream, await flight.do("k", upstream.call)
+
+    upstream, result = run(scenario())
+    assert result == "answer"
+    assert upstream.started == 2
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    async def scenario():
+        flight = SingleFlight("t")
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("model down")
+
+        results = await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+        return flight, calls, results
+
+    flight, calls, results = run(scenario())
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_keys_are_independent():
+    async def scenario():
+        flight = SingleFlight("t")
+
+        async def echo(value):
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(flight.do("a", lambda: echo("a")), flight.do("b", lambda: echo("b")))
+
+    assert run(scenario()) == ["a", "b"]
+
+
+@pytest.mark.parametrize("text", ["", "prompt", "prompt with ünïcode"])
+def test_make_key_is_stable(text):
+    assert SingleFlight.make_key(text) == SingleFlight.make_key(text)
+    assert SingleFlight.make_key(text) != SingleFlight.make_key(text + " ")
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from "react";
 import { BrowserRouter as Router, Routes, Route, useLocation } from "react-router-dom";
 import ReactMarkdown from "react-markdown";
 import { getApiUrl } from "./utils/apiConfig";
+import { streamChat, getChatSessionId } from "./utils/chatStream";
 
 
 // Onboarding Pages
@@ -329,26 +330,35 @@ function App() {
   
     const apiUrl = getApiUrl();
     
-    try {
-      const res = await fetch(`${apiUrl}/chatbot/chat`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          message: trimmed,
-          token: tokenFromURL,
-          page: page
-        }),
+    // Append tokens to a single bot message as the answer streams in
+    let started = false;
+    const appendToBotReply = (text) => {
+      setIsTyping(false);
+      setChatMessages((prev) => {
+        if (!started) {
+          started = true;
+          return [...prev, { from: "bot", text }];
+        }
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, text: last.text + text }];
       });
-  
-      const data = await res.json();
-      const botReply = { from: "bot", text: data.response };
-  
-      setChatMessages((prev) => [...prev, botReply]);
+    };
+
+    try {
+      const done = await streamChat(
+        apiUrl,
+        { message: trimmed, token: tokenFromURL, page: page, session_id: getChatSessionId() },
+        appendToBotReply
+      );
+      if (!started && done.response) appendToBotReply(done.response);
+      if (done.truncated) appendToBotReply("\n\n⚠️ This answer was cut off. Please ask again.");
     } catch (err) {
-      setChatMessages((prev) => [
-        ...prev,
-        { from: "bot", text: "Sorry, something went wrong." },
-      ]);
+      if (!started) {
+        setChatMessages((prev) => [
+          ...prev,
+          { from: "bot", text: "Sorry, something went wrong." },
+        ]);
+      }
     } finally {
       setIsTyping(false);
     }
@@ -6,12 +6,26 @@ import * as XLSX from "xlsx";
 import { saveAs } from "file-saver";
 import SumeruLogo from "../assets/sumeru-logo.png";
 import { getApiUrl } from "../utils/apiConfig";
+import { fetchAllEmployees, fetchEmployeesPage } from "../utils/employeesApi";
+
+// Columns shown in the table and export (no document paths, never the IT password)
+const DETAIL_FIELDS = [
+  "emp_id", "name", "email", "role", "department", "status", "tasks.status",
+  ...["dob", "gender", "mobile", "email", "family1_name", "family1_relation", "family1_mobile",
+    "family2_name", "family2_relation", "family2_mobile", "aadhaar_number", "pan_number",
+    "bank_number", "ifsc_code"].map(column => `personal_info.${column}`),
+  "it_accounts.company_email"
+];
+const PAGE_SIZE = 50;
 
 const EmployeeDetails = () => {
   const navigate = useNavigate();
   const [employees, setEmployees] = useState([]);
   const [filteredEmployees, setFilteredEmployees] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [overview, setOverview] = useState({});
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedDepartment, setSelectedDepartment] = useState("");
   const [selectedRole, setSelectedRole] = useState("");
   const [searchTerm, setSearchTerm] = useState("");
@@ -22,12 +36,17 @@ const EmployeeDetails = () => {
   const token = localStorage.getItem("token");
 
   useEffect(() => {
-    fetchEmployees();
+    fetchOverview();
   }, []);
 
+  // Department is filtered on the server; role and search filter the loaded rows
+  useEffect(() => {
+    fetchEmployees();
+  }, [selectedDepartment]);
+
   useEffect(() => {
     filterEmployees();
-  }, [employees, selectedDepartment, selectedRole, searchTerm]);
+  }, [employees, selectedRole, searchTerm]);
 
   // Fetch files for employees when needed
   const fetchEmployeeFiles = async (employeeId) => {
@@ -195,8 +214,20 @@ const EmployeeDetails = () => {
     }
   };
 
-  const exportEmployeeDetailsToExcel = () => {
-    const wsData = filteredEmployees.map(emp => {
+  const exportEmployeeDetailsToExcel = async () => {
+    // Every employee matching the filters, not only the loaded pages
+    let exportEmployees;
+    try {
+      exportEmployees = applyFilters(await fetchAllEmployees({
+        fields: DETAIL_FIELDS,
+        department: selectedDepartment
+      }));
+    } catch (error) {
+      console.error("Error fetching employees for export:", error);
+      alert("Failed to fetch employees for export");
+      return;
+    }
+    const wsData = exportEmployees.map(emp => {
       const data = formatEmployeeData(emp);
       return {
         "Emp ID": data.empId,
@@ -230,30 +261,42 @@ const EmployeeDetails = () => {
     saveAs(new Blob([wbout], { type: "application/octet-stream" }), `employee_details_${new Date().toISOString().split('T')[0]}.xlsx`);
   };
 
-  const fetchEmployees = async () => {
+  const fetchOverview = async () => {
     try {
-      setLoading(true);
-      const response = await fetch(`${apiUrl}/employees`);
-      if (!response.ok) throw new Error("Failed to fetch employees");
-      const data = await response.json();
-      setEmployees(data);
+      const res = await fetch(`${apiUrl}/hr/employee_overview`);
+      if (res.ok) setOverview(await res.json());
+    } catch (error) {
+      console.error("Error fetching employee overview:", error);
+    }
+  };
+
+  const fetchEmployees = async (cursor = null) => {
+    try {
+      if (cursor) setLoadingMore(true);
+      else setLoading(true);
+      const page = await fetchEmployeesPage({
+        fields: DETAIL_FIELDS,
+        department: selectedDepartment,
+        sort: "name",
+        limit: PAGE_SIZE,
+        cursor
+      });
+      setEmployees(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error("Error fetching employees:", error);
     } finally {
-      setLoading(false);
+      if (cursor) setLoadingMore(false);
+      else setLoading(false);
     }
   };
 
   const filterEmployees = () => {
-    let filtered = [...employees];
+    setFilteredEmployees(applyFilters(employees));
+  };
 
-    // Department filter (normalized comparison)
-    if (selectedDepartment) {
-      filtered = filtered.filter((emp) => {
-        if (!emp.department) return false;
-        return normalizeDepartment(emp.department) === normalizeDepartment(selectedDepartment);
-      });
-    }
+  const applyFilters = (list) => {
+    let filtered = [...list];
 
     // Role filter
     if (selectedRole) {
@@ -280,7 +323,7 @@ const EmployeeDetails = () => {
       });
     }
 
-    setFilteredEmployees(filtered);
+    return filtered;
   };
 
   const normalizeDepartment = (dept) => {
@@ -302,13 +345,11 @@ const EmployeeDetails = () => {
   const getDepartments = () => {
     // Normalize departments to avoid duplicates (HR vs hr, Design vs design, etc.)
     const deptMap = new Map();
-    employees.forEach((emp) => {
-      if (emp.department) {
-        const normalized = normalizeDepartment(emp.department);
-        if (!deptMap.has(normalized)) {
-          // Keep the first occurrence's original format for display
-          deptMap.set(normalized, emp.department);
-        }
+    Object.keys(overview.departments || {}).forEach((dept) => {
+      const normalized = normalizeDepartment(dept);
+      if (!deptMap.has(normalized)) {
+        // Keep the first occurrence's original format for display
+        deptMap.set(normalized, dept);
       }
     });
     return Array.from(deptMap.values()).sort();
@@ -427,7 +468,7 @@ const EmployeeDetails = () => {
               <FaSearch className="absolute left-3 top-1/2 transform -translate-y-1/2 text-gray-400" />
               <input
                 type="text"
-                placeholder="Search by name, email, company mail, mobile, Aadhaar, PAN..."
+                placeholder="Search loaded employees by name, email, company mail, mobile, Aadhaar, PAN..."
                 value={searchTerm}
                 onChange={(e) => setSearchTerm(e.target.value)}
                 className="w-full pl-10 pr-4 py-2 border border-gray-200 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
@@ -472,7 +513,9 @@ const EmployeeDetails = () => {
               <div className="flex items-center gap-2">
                 <FaUserCircle className="text-blue-600" />
                 <span className="text-sm text-gray-600">
-                  Total: <span className="font-semibold text-gray-900">{employees.length}</span>
+                  Total: <span className="font-semibold text-gray-900">
+                    {selectedDepartment ? overview.departments?.[selectedDepartment]?.total ?? employees.length : overview.total ?? employees.length}
+                  </span>
                 </span>
               </div>
               <div className="flex items-center gap-2">
@@ -542,7 +585,7 @@ const EmployeeDetails = () => {
                         key={emp.emp_id}
                         initial={{ opacity: 0, x: -20 }}
                         animate={{ opacity: 1, x: 0 }}
-                        transition={{ delay: index * 0.02 }}
+                        transition={{ delay: (index % PAGE_SIZE) * 0.02 }}
                         className="group hover:bg-blue-50/50 transition-colors"
                       >
                         {columns.map((col) => (
@@ -622,6 +665,17 @@ const EmployeeDetails = () => {
               </table>
             </div>
           )}
+          {!loading && nextCursor && (
+            <div className="p-4 text-center border-t border-gray-100">
+              <button
+                onClick={() => fetchEmployees(nextCursor)}
+                disabled={loadingMore}
+                className="px-4 py-2 bg-blue-600 hover:bg-blue-700 text-white rounded-lg text-sm font-medium transition-colors disabled:opacity-50"
+              >
+                {loadingMore ? "Loading..." : "Load more"}
+              </button>
+            </div>
+          )}
         </motion.div>
       </div>
 
@@ -7,6 +7,11 @@ import * as XLSX from "xlsx";
 import { saveAs } from "file-saver";
 import SumeruLogo from "../assets/sumeru-logo.png";
 import { getApiUrl } from "../utils/apiConfig";
+import { fetchAllEmployees, fetchEmployeesPage } from "../utils/employeesApi";
+
+// Stats come from /hr/employee_overview; the recent joiners table reads these, the export fetches its own columns
+const RECENT_FIELDS = ["emp_id", "name", "email", "role", "department", "status", "tasks.status"];
+const EXPORT_FIELDS = ["emp_id", "name", "email", "role", "department", "status", "personal_info.gender", "personal_info.mobile", "personal_info.dob", "personal_info.pan_number", "personal_info.aadhaar_number"];
 
 const HrDashboard = () => {
   const navigate = useNavigate();
@@ -16,7 +21,6 @@ const HrDashboard = () => {
   const [onboardingData, setOnboardingData] = useState([]);
   const [recentJoinees, setRecentJoinees] = useState([]);
   const [feedbackStats, setFeedbackStats] = useState({ avg: 0, count: 0 });
-  const [allEmployees, setAllEmployees] = useState([]);
   const [allFeedbacks, setAllFeedbacks] = useState([]);
   const [loading, setLoading] = useState(true);
   const [emailAccounts, setEmailAccounts] = useState([]);
@@ -105,32 +109,25 @@ const HrDashboard = () => {
   const fetchAllDashboardData = async () => {
     try {
       setLoading(true);
-      const [empRes, fbRes] = await Promise.all([
-        fetch(`${apiUrl}/employees`),
+      // Counts come from the server; only the five newest employees are listed
+      const [overviewRes, recent, fbRes] = await Promise.all([
+        fetch(`${apiUrl}/hr/employee_overview`),
+        fetchEmployeesPage({ fields: RECENT_FIELDS, sort: "-emp_id", limit: 5 }),
         fetch(`${apiUrl}/feedback`).catch(() => null)
       ]);
 
-      const employees = await empRes.json();
+      const overview = await overviewRes.json();
       const feedbacks = fbRes ? await fbRes.json() : [];
 
-      setAllEmployees(employees);
       setAllFeedbacks(feedbacks);
 
-      // Helper function to check if employee has completed all tasks
-      const hasCompletedAllTasks = (emp) => {
-        const tasks = emp.tasks || [];
-        return tasks.length > 0 && tasks.every(t => t.status === "completed");
-      };
-
       // Employee Stats
-      const total = employees.length;
-      const males = employees.filter(e => e.personal_info?.gender === "Male").length;
-      const females = employees.filter(e => e.personal_info?.gender === "Female").length;
-      // Count employees who completed all tasks OR have status as completed
-      const completed = employees.filter(e => hasCompletedAllTasks(e) || e.status === "completed").length;
-      // Count all employees that are not completed as pending (includes "pending", "personal-details", "active", etc.)
-      // Exclude "disabled" from counts but include everything else as pending
-      const pending = employees.filter(e => !hasCompletedAllTasks(e) && e.status !== "completed" && e.status !== "disabled").length;
+      const total = overview.total || 0;
+      const males = overview.genders?.Male || 0;
+      const females = overview.genders?.Female || 0;
+      const completed = overview.completed || 0;
+      // Everyone not completed and not disabled counts as pending ("pending", "active", ...)
+      const pending = overview.in_progress || 0;
 
       setEmployeeStats({ total, males, females, completed, pending });
 
@@ -152,11 +149,9 @@ const HrDashboard = () => {
       };
       
       const deptMap = {};
-      employees.forEach(emp => {
-        if (emp.department) {
-          const normalized = normalizeDepartment(emp.department);
-          deptMap[normalized] = (deptMap[normalized] || 0) + 1;
-        }
+      Object.entries(overview.departments || {}).forEach(([dept, counts]) => {
+        const normalized = normalizeDepartment(dept);
+        deptMap[normalized] = (deptMap[normalized] || 0) + counts.total;
       });
       setDepartmentData(
         Object.entries(deptMap).map(([name, value]) => ({ name, value })).sort((a, b) => a.name.localeCompare(b.name))
@@ -168,8 +163,8 @@ const HrDashboard = () => {
         { name: "Pending", value: pending }
       ]);
 
-      // Recent Joiners
-      setRecentJoinees(employees.slice(-5).reverse());
+      // Recent Joiners (newest employee IDs first)
+      setRecentJoinees(recent.items);
 
       // Feedback Stats
       const avg = feedbacks.length
@@ -184,7 +179,15 @@ const HrDashboard = () => {
   };
 
   // Export Employee Data to Excel
-  const exportEmployeesToExcel = () => {
+  const exportEmployeesToExcel = async () => {
+    let allEmployees;
+    try {
+      allEmployees = await fetchAllEmployees({ fields: EXPORT_FIELDS });
+    } catch (err) {
+      console.error("Export fetch error:", err);
+      alert("Failed to fetch employees for export.");
+      return;
+    }
     const wsData = allEmployees.map(emp => ({
       "Emp ID": emp.emp_id || "N/A",
       "Name": emp.name || "N/A",
@@ -4,12 +4,16 @@ import { FaSearch, FaEdit, FaPlus } from "react-icons/fa";
 import { motion } from "framer-motion";
 import SumeruLogo from "../assets/sumeru-logo.png";
 import { getApiUrl } from "../utils/apiConfig";
+import { fetchEmployeesPage } from "../utils/employeesApi";
+
+const PAGE_SIZE = 50;
 
 const ITAccountManagement = () => {
   const navigate = useNavigate();
   const [employees, setEmployees] = useState([]);
-  const [filteredEmployees, setFilteredEmployees] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
   const [selectedEmployee, setSelectedEmployee] = useState(null);
   const [showFormModal, setShowFormModal] = useState(false);
@@ -20,17 +24,16 @@ const ITAccountManagement = () => {
   });
   const apiUrl = getApiUrl();
 
+  // Search runs on the server: refetch the first page once typing pauses
   useEffect(() => {
-    fetchEmployees();
-  }, []);
-
-  useEffect(() => {
-    filterEmployees();
-  }, [employees, searchTerm]);
+    const timer = setTimeout(() => fetchEmployees(), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
-  const fetchEmployees = async () => {
+  const fetchEmployees = async (cursor = null) => {
     try {
-      setLoading(true);
+      if (cursor) setLoadingMore(true);
+      else setLoading(true);
       const hrToken = localStorage.getItem("token");
       if (!hrToken) {
         alert("Please login as HR first");
@@ -38,54 +41,30 @@ const ITAccountManagement = () => {
         return;
       }
 
-      const [empRes, itRes] = await Promise.all([
-        fetch(`${apiUrl}/employees`),
-        fetch(`${apiUrl}/it-accounts/`, {
-          headers: { Authorization: `Bearer ${hrToken}` }
-        }).catch(() => ({ ok: false }))
-      ]);
+      const page = await fetchEmployeesPage({
+        fields: ["emp_id", "name", "email", "department", "it_accounts.company_email"],
+        name: searchTerm.trim(),
+        sort: "name",
+        limit: PAGE_SIZE,
+        cursor
+      });
 
-      const employeesData = await empRes.json();
-      let itAccountsData = {};
-      
-      if (itRes.ok) {
-        const accounts = await itRes.json();
-        accounts.forEach(acc => {
-          itAccountsData[acc.employee_id] = acc;
-        });
-      } else if (itRes.status === 401) {
+      // it_accounts comes with the page (HR token); null when the employee has none yet
+      const items = page.items.map(emp => ({ ...emp, it_account: emp.it_accounts || null }));
+      setEmployees(prev => (cursor ? [...prev, ...items] : items));
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      if (error.status === 401) {
         alert("Session expired. Please login again.");
         localStorage.removeItem("token");
         navigate("/hr-login");
         return;
       }
-
-      // Merge IT account data with employees
-      // Note: Backend may already include it_accounts via joinedload, so check both
-      const merged = employeesData.map(emp => ({
-        ...emp,
-        it_account: emp.it_accounts || itAccountsData[emp.emp_id] || null
-      }));
-
-      setEmployees(merged);
-    } catch (error) {
       console.error("Error fetching employees:", error);
     } finally {
-      setLoading(false);
-    }
-  };
-
-  const filterEmployees = () => {
-    let filtered = [...employees];
-    if (searchTerm) {
-      filtered = filtered.filter(
-        (emp) =>
-          emp.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          emp.email?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          emp.department?.toLowerCase().includes(searchTerm.toLowerCase())
-      );
+      if (cursor) setLoadingMore(false);
+      else setLoading(false);
     }
-    setFilteredEmployees(filtered);
   };
 
   const handleCreateAccount = (employee) => {
@@ -195,7 +174,7 @@ const ITAccountManagement = () => {
             <FaSearch className="absolute left-3 top-1/2 transform -translate-y-1/2 text-gray-400" />
             <input
               type="text"
-              placeholder="Search by name, email, or department..."
+              placeholder="Search by name..."
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
               className="w-full pl-10 pr-4 py-2 border border-gray-200 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
@@ -226,7 +205,7 @@ const ITAccountManagement = () => {
                   </tr>
                 </thead>
                 <tbody className="divide-y divide-gray-100">
-                  {filteredEmployees.map((emp) => (
+                  {employees.map((emp) => (
                     <motion.tr
                       key={emp.emp_id}
                       initial={{ opacity: 0, x: -20 }}
@@ -270,6 +249,17 @@ const ITAccountManagement = () => {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="p-4 text-center border-t border-gray-100">
+                  <button
+                    onClick={() => fetchEmployees(nextCursor)}
+                    disabled={loadingMore}
+                    className="px-4 py-2 bg-blue-600 hover:bg-blue-700 text-white rounded-lg text-sm font-medium transition-colors disabled:opacity-50"
+                  >
+                    {loadingMore ? "Loading..." : "Load more"}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </motion.div>
@@ -4,12 +4,20 @@ import { FaSearch, FaFilter, FaEye, FaChartLine } from "react-icons/fa";
 import { motion } from "framer-motion";
 import SumeruLogo from "../assets/sumeru-logo.png";
 import { getApiUrl } from "../utils/apiConfig";
+import { fetchEmployeesPage } from "../utils/employeesApi";
+
+const TRACKING_FIELDS = ["emp_id", "name", "email", "role", "department", "status", "tasks.title", "tasks.status"];
+const PAGE_SIZE = 50;
+// Status filter -> employee statuses ("pending" covers everyone still onboarding)
+const STATUS_PARAMS = { completed: "completed", pending: "pending,active" };
 
 const TrackOnboarding = () => {
   const navigate = useNavigate();
   const [employees, setEmployees] = useState([]);
-  const [filteredEmployees, setFilteredEmployees] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [overview, setOverview] = useState({});
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
   const [statusFilter, setStatusFilter] = useState("all");
   const [departmentFilter, setDepartmentFilter] = useState("all");
@@ -24,62 +32,45 @@ const TrackOnboarding = () => {
   ];
 
   useEffect(() => {
-    fetchEmployees();
+    fetchOverview();
   }, []);
 
+  // Filters run on the server: refetch the first page when they change (search waits for typing to pause)
   useEffect(() => {
-    filterEmployees();
-  }, [employees, searchTerm, statusFilter, departmentFilter]);
+    const timer = setTimeout(() => fetchEmployees(), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, statusFilter, departmentFilter]);
 
-  const fetchEmployees = async () => {
+  const fetchOverview = async () => {
     try {
-      setLoading(true);
-      const response = await fetch(`${apiUrl}/employees`);
-      if (!response.ok) throw new Error("Failed to fetch employees");
-      const data = await response.json();
-      setEmployees(data);
+      const res = await fetch(`${apiUrl}/hr/employee_overview`);
+      if (res.ok) setOverview(await res.json());
     } catch (error) {
-      console.error("Error fetching employees:", error);
-    } finally {
-      setLoading(false);
+      console.error("Error fetching onboarding overview:", error);
     }
   };
 
-  const filterEmployees = () => {
-    let filtered = [...employees];
-
-    // Search filter
-    if (searchTerm) {
-      filtered = filtered.filter(
-        (emp) =>
-          emp.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          emp.email?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          emp.role?.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-    }
-
-    // Status filter (normalize: only completed or pending)
-    // Check task completion first, then fall back to emp.status
-    if (statusFilter !== "all") {
-      filtered = filtered.filter((emp) => {
-        const completion = calculateCompletion(emp.tasks || []);
-        const currentStage = getCurrentStage(emp.tasks || []);
-        const allTasksCompleted = completion === 100 && currentStage === "Completed";
-        const normalizedStatus = allTasksCompleted ? "completed" : (emp.status === "completed" ? "completed" : "pending");
-        if (statusFilter === "completed") return normalizedStatus === "completed";
-        if (statusFilter === "pending") return normalizedStatus === "pending";
-        return true;
+  const fetchEmployees = async (cursor = null) => {
+    try {
+      if (cursor) setLoadingMore(true);
+      else setLoading(true);
+      const page = await fetchEmployeesPage({
+        fields: TRACKING_FIELDS,
+        name: searchTerm.trim(),
+        status: STATUS_PARAMS[statusFilter],
+        department: departmentFilter !== "all" ? departmentFilter : null,
+        sort: "name",
+        limit: PAGE_SIZE,
+        cursor
       });
+      setEmployees(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Error fetching employees:", error);
+    } finally {
+      if (cursor) setLoadingMore(false);
+      else setLoading(false);
     }
-
-    // Department filter
-    if (departmentFilter !== "all") {
-      filtered = filtered.filter(
-        (emp) => emp.department === departmentFilter
-      );
-    }
-
-    setFilteredEmployees(filtered);
   };
 
   const calculateCompletion = (tasks) => {
@@ -101,32 +92,14 @@ const TrackOnboarding = () => {
     return "Completed";
   };
 
-  const getDepartments = () => {
-    const depts = new Set(employees.map((emp) => emp.department).filter(Boolean));
-    return Array.from(depts).sort();
-  };
-
-  // Helper function to check if employee has completed all tasks
-  const hasCompletedAllTasks = (emp) => {
-    const completion = calculateCompletion(emp.tasks || []);
-    const currentStage = getCurrentStage(emp.tasks || []);
-    return completion === 100 && currentStage === "Completed";
-  };
+  const getDepartments = () => Object.keys(overview.departments || {}).sort();
 
   const stats = {
-    total: employees.length,
-    // Count employees who completed all tasks OR have status as completed
-    completed: employees.filter((e) => hasCompletedAllTasks(e) || e.status === "completed").length,
-    // Count all non-completed, non-disabled employees as pending
-    pending: employees.filter((e) => !hasCompletedAllTasks(e) && e.status !== "completed" && e.status !== "disabled").length,
-    avgCompletion: employees.length > 0
-      ? Math.round(
-          employees.reduce(
-            (acc, emp) => acc + calculateCompletion(emp.tasks || []),
-            0
-          ) / employees.length
-        )
-      : 0,
+    total: overview.total || 0,
+    completed: overview.completed || 0,
+    // Everyone not completed and not disabled
+    pending: overview.in_progress || 0,
+    avgCompletion: Math.round(overview.task_completion_rate || 0),
   };
 
   return (
@@ -199,7 +172,7 @@ const TrackOnboarding = () => {
               <FaSearch className="absolute left-3 top-1/2 transform -translate-y-1/2 text-gray-400" />
               <input
                 type="text"
-                placeholder="Search by name, email, or role..."
+                placeholder="Search by name..."
                 value={searchTerm}
                 onChange={(e) => setSearchTerm(e.target.value)}
                 className="w-full pl-10 pr-4 py-2 border border-gray-200 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
@@ -245,7 +218,7 @@ const TrackOnboarding = () => {
               <div className="inline-block animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
               <p className="mt-4 text-gray-600">Loading employees...</p>
             </div>
-          ) : filteredEmployees.length === 0 ? (
+          ) : employees.length === 0 ? (
             <div className="p-12 text-center">
               <p className="text-gray-500 text-lg">No employees found</p>
               <p className="text-gray-400 text-sm mt-2">
@@ -278,7 +251,7 @@ const TrackOnboarding = () => {
                   </tr>
                 </thead>
                 <tbody className="divide-y divide-gray-100">
-                  {filteredEmployees.map((emp, index) => {
+                  {employees.map((emp, index) => {
                     const completion = calculateCompletion(emp.tasks || []);
                     const currentStage = getCurrentStage(emp.tasks || []);
                     // Check if all tasks are completed - if so, show as completed regardless of emp.status
@@ -289,7 +262,7 @@ const TrackOnboarding = () => {
                         key={emp.emp_id}
                         initial={{ opacity: 0, x: -20 }}
                         animate={{ opacity: 1, x: 0 }}
-                        transition={{ delay: index * 0.05 }}
+                        transition={{ delay: (index % PAGE_SIZE) * 0.05 }}
                         className="hover:bg-blue-50/50 transition-colors"
                       >
                         <td className="px-6 py-4 whitespace-nowrap">
@@ -321,7 +294,7 @@ const TrackOnboarding = () => {
                               <motion.div
                                 initial={{ width: 0 }}
                                 animate={{ width: `${completion}%` }}
-                                transition={{ duration: 0.5, delay: index * 0.05 }}
+                                transition={{ duration: 0.5, delay: (index % PAGE_SIZE) * 0.05 }}
                                 className={`h-2.5 rounded-full ${
                                   completion === 100
                                     ? "bg-gradient-to-r from-green-500 to-emerald-500"
@@ -361,6 +334,17 @@ const TrackOnboarding = () => {
                   })}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="p-4 text-center border-t border-gray-100">
+                  <button
+                    onClick={() => fetchEmployees(nextCursor)}
+                    disabled={loadingMore}
+                    className="px-4 py-2 bg-blue-600 hover:bg-blue-700 text-white rounded-lg text-sm font-medium transition-colors disabled:opacity-50"
+                  >
+                    {loadingMore ? "Loading..." : "Load more"}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </motion.div>
@@ -0,0 +1,69 @@
+/**
+ * SUPA chat streaming client
+ * Reads the Server-Sent Events sent by POST /chatbot/chat/stream
+ */
+
+/**
+ * This tab's chat session id (kept in sessionStorage, so each tab is its own conversation)
+ * The backend keys SUPA's conversation memory on it together with the employee token
+ * @returns {string}
+ */
+export function getChatSessionId() {
+  let id = sessionStorage.getItem("supaChatSession");
+  if (!id) {
+    id = crypto.randomUUID
+      ? crypto.randomUUID()
+      : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    sessionStorage.setItem("supaChatSession", id);
+  }
+  return id;
+}
+
+/**
+ * Stream a chat answer from the backend
+ * @param {string} apiUrl - Base API URL
+ * @param {object} payload - { message, token, page, session_id }
+ * @param {(text: string) => void} onToken - Called with each new chunk of answer text
+ * @returns {Promise<object>} The final "done" event payload (model_used, policy_topic, response),
+ *   or the "error" payload ({ truncated: true, ... }) if the model failed partway through the answer
+ */
+export async function streamChat(apiUrl, payload, onToken) {
+  const res = await fetch(`${apiUrl}/chatbot/chat/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify(payload),
+  });
+  if (!res.ok || !res.body) throw new Error(`Chat stream failed: ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let done = null;
+
+  while (true) {
+    const { value, done: finished } = await reader.read();
+    if (finished) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // SSE events are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let eventName = "message";
+      let data = "";
+      for (const line of rawEvent.split("\n")) {
+        if (line.startsWith("event:")) eventName = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (!data) continue;
+
+      const parsed = JSON.parse(data);
+      if (eventName === "token") onToken(parsed.text);
+      else if (eventName === "done" || eventName === "error") done = parsed;
+    }
+  }
+
+  return done || {};
+}
@@ -0,0 +1,48 @@
+import { getApiUrl } from "./apiConfig";
+
+const API_URL = getApiUrl();
+
+/**
+ * Fetch one page of GET /employees
+ * @param {Object} options - fields (array or comma string, e.g. ["emp_id", "name", "tasks.status"]),
+ *   department, status, name (prefix), sort ("name", "-name", ...), limit (max 500), cursor.
+ *   personal_info and it_accounts fields need the HR login token (sent when present)
+ * @returns {Promise<{items: Array, next_cursor: string|null}>}
+ */
+export async function fetchEmployeesPage({ fields, department, status, name, sort, limit, cursor } = {}) {
+  const params = new URLSearchParams();
+  if (fields) params.set("fields", Array.isArray(fields) ? fields.join(",") : fields);
+  if (department) params.set("department", department);
+  if (status) params.set("status", status);
+  if (name) params.set("name", name);
+  if (sort) params.set("sort", sort);
+  if (limit) params.set("limit", limit);
+  if (cursor) params.set("cursor", cursor);
+
+  const token = localStorage.getItem("token");
+  const res = await fetch(`${API_URL}/employees?${params}`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {}
+  });
+  if (!res.ok) {
+    const error = new Error(`Failed to fetch employees: ${res.status}`);
+    error.status = res.status;
+    throw error;
+  }
+  return await res.json();
+}
+
+/**
+ * Fetch every employee matching the options, following next_cursor page by page.
+ * For exports only; list views should show one page and load more on demand
+ * @returns {Promise<Array>}
+ */
+export async function fetchAllEmployees(options = {}) {
+  const employees = [];
+  let cursor = null;
+  do {
+    const page = await fetchEmployeesPage({ limit: 500, ...options, cursor });
+    employees.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return employees;
+}